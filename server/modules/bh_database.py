@@ -3,6 +3,8 @@ import sys
 import time
 import json
 import codecs
+import sqlite3
+import threading
 import couchdb
 import requests
 
@@ -91,11 +93,15 @@ class BirdhouseJSON(BirdhouseDbClass):
         self.db_list = []
         self.get_db_list()
 
+        self.journal_settings = birdhouse_journal
+        self.journal_count = {}
+        self.journal_snapshot = {}
+
         self.logging.info("Connected JSON handler.")
 
     def read(self, filename) -> dict:
         """
-        read json file including check if locked
+        read json file including check if locked, replay journal if exists
 
         Args:
             filename (str): file incl. path to read
@@ -106,6 +112,8 @@ class BirdhouseJSON(BirdhouseDbClass):
             self.wait_if_locked(filename)
             with open(filename) as json_file:
                 data = json.load(json_file)
+            if os.path.exists(filename + ".journal"):
+                self.read_journal(filename, data)
             self.logging.debug("Read JSON file: " + filename)
             self.logging.debug("                " + str(list(data.keys()))[:80])
             return data
@@ -114,6 +122,39 @@ class BirdhouseJSON(BirdhouseDbClass):
             self.raise_error("Could not read JSON file: " + filename + " - " + str(e))
             return {}
 
+    def read_journal(self, filename, data):
+        """
+        replay journal of a json file over the snapshot; an incomplete last line (e.g. after a power loss) is skipped
+
+        Args:
+            filename (str): file incl. path of the snapshot
+            data (dict): snapshot data, will be changed
+        Returns:
+            int: amount of replayed changes
+        """
+        count = 0
+        incomplete = False
+        with open(filename + ".journal", encoding='utf-8') as journal_file:
+            for line in journal_file:
+                try:
+                    change = json.loads(line)
+                except ValueError:
+                    self.logging.warning("Skipped incomplete line in journal: " + filename + ".journal")
+                    incomplete = True
+                    continue
+                if "delete" in change:
+                    if change["key"] in data:
+                        del data[change["key"]]
+                else:
+                    data[change["key"]] = change["entry"]
+                count += 1
+        self.journal_count[filename] = count
+        if incomplete:
+            # force a new snapshot with the next write, so new lines are not appended to the incomplete line
+            self.journal_count[filename] = self.journal_settings["compact_entries"]
+        self.logging.debug("Replayed " + str(count) + " changes from journal: " + filename + ".journal")
+        return count
+
     def write(self, filename, data, create=False):
         """
         write json file including locking mechanism
@@ -134,10 +175,21 @@ class BirdhouseJSON(BirdhouseDbClass):
             elif not os.path.exists(path):
                 os.makedirs(path)
 
+            # write snapshot to a temp file and rename it, the journal is removed only after the snapshot is
+            # complete, so a power loss in between never loses data (replaying the journal again is harmless)
             self.locked[filename] = True
-            with open(filename, 'w', encoding='utf-8') as json_file:
+            filename_temp = filename + ".tmp"
+            journal = os.path.exists(filename + ".journal")
+            with open(filename_temp, 'w', encoding='utf-8') as json_file:
                 json.dump(data, json_file, ensure_ascii=False, sort_keys=self.sort_keys, indent=4)
-                json_file.close()
+                if journal:
+                    json_file.flush()
+                    os.fsync(json_file.fileno())
+            os.replace(filename_temp, filename)
+            if journal:
+                os.remove(filename + ".journal")
+            self.journal_count[filename] = 0
+            self.journal_snapshot[filename] = time.time()
             self.config.set_processing_performance("db_write_file", "write_file", start_write_time)
             self.locked[filename] = False
             self.logging.debug("Write JSON file: " + filename)
@@ -147,6 +199,47 @@ class BirdhouseJSON(BirdhouseDbClass):
             self.locked[filename] = False
             self.raise_error("Could not write JSON file: " + filename + " - " + str(e))
 
+    def write_changes(self, filename, changes, data):
+        """
+        append changed entries to the journal of a json file (write cost depends on the amount of changes only),
+        write a new snapshot instead if no snapshot exists or compaction is due
+
+        Args:
+            filename (str): file incl. path of the snapshot
+            changes (dict): changed entries (key: entry), None as entry for deleted entries
+            data (dict): complete data, used for a new snapshot
+        """
+        if filename not in self.journal_snapshot:
+            self.journal_snapshot[filename] = time.time()
+
+        if (not os.path.exists(filename)
+                or self.journal_count.get(filename, 0) + len(changes) > self.journal_settings["compact_entries"]
+                or self.journal_snapshot[filename] + self.journal_settings["compact_interval"] < time.time()):
+            self.logging.debug("Compact journal: " + filename)
+            self.write(filename, data)
+            return
+
+        self.wait_if_locked(filename)
+        try:
+            start_write_time = time.time()
+            self.locked[filename] = True
+            lines = ""
+            for key in changes:
+                if changes[key] is None:
+                    lines += json.dumps({"key": key, "delete": True}, ensure_ascii=False) + "\n"
+                else:
+                    lines += json.dumps({"key": key, "entry": changes[key]}, ensure_ascii=False) + "\n"
+            with open(filename + ".journal", 'a', encoding='utf-8') as journal_file:
+                journal_file.write(lines)
+            self.journal_count[filename] = self.journal_count.get(filename, 0) + len(changes)
+            self.config.set_processing_performance("db_write_file", "write_journal", start_write_time)
+            self.locked[filename] = False
+            self.logging.debug("Write JSON journal: " + filename + " (" + str(len(changes)) + " changes)")
+
+        except Exception as e:
+            self.locked[filename] = False
+            self.raise_error("Could not write JSON journal: " + filename + " - " + str(e))
+
     def get_db_list(self):
         """
         get list of all json databases in data directory
@@ -178,6 +271,8 @@ class BirdhouseJSON(BirdhouseDbClass):
         Args:
             filename: file to be deleted
         """
+        if os.path.exists(filename + ".journal"):
+            os.remove(filename + ".journal")
         if os.path.exists(filename):
             os.remove(filename)
             self.logging.info("The file "+filename+" has been deleted.")
@@ -204,20 +299,36 @@ class BirdhouseCouchDB(BirdhouseDbClass):
     class to read and write date from CouchDB
     """
 
-    def __init__(self, config, db):
+    def __init__(self, config, db, server=None):
         """
         Constructor to initialize class
 
         Args:
             config (modules.config.BirdhouseConfig): reference to config handler
             db (dict): database configuration (db_usr, db_pwd, db_server, db_port)
+            server (Any): couchdb.Server compatible object to be used instead of connecting to db_server,
+                          e.g., a local stand-in for tests
         """
         BirdhouseDbClass.__init__(self, "COUCH", "DB-couch", config)
         self.locked = {}
         self.changed_data = False
-        self.database = None
+        self.database = server
         self.timeout = 10
 
+        self.write_settings = birdhouse_couchdb_write
+        self.write_lock = threading.Lock()
+        self.write_pending = {}
+        self.write_coalesced = 0
+        self.coalesce = False
+        self.rev_cache = {}
+        self.db_objects = {}
+        self.compact_writes = {}
+        self.compact_last = {}
+
+        self.schema = birdhouse_couchdb_schema
+        self.entry_revs = {}
+        self.entry_views = []
+
         self.basic_directory = db["db_basedir"]
         self.db_url = "http://" + db["db_usr"] + ":" + db["db_pwd"] + "@" + db["db_server"] + \
                       ":" + str(db["db_port"]) + "/"
@@ -241,6 +352,9 @@ class BirdhouseCouchDB(BirdhouseDbClass):
         connects2db = 0
         max_connects = 5
         self.reset_error()
+        if self.database is not None:
+            connects2db = max_connects + 1
+
         while connects2db < max_connects + 1:
 
             if connects2db == 8 or connects2db == 15 or connects2db == 25:
@@ -248,7 +362,7 @@ class BirdhouseCouchDB(BirdhouseDbClass):
 
             try:
                 self.logging.info(" - Try to connect to CouchDB: " + self.db_url)
-                response = requests.get(self.db_url)
+                requests.get(self.db_url)
                 connects2db = max_connects + 1
 
             except requests.exceptions.RequestException as e:
@@ -263,7 +377,8 @@ class BirdhouseCouchDB(BirdhouseDbClass):
                 return False
 
         try:
-            self.database = couchdb.Server(self.db_url)
+            if self.database is None:
+                self.database = couchdb.Server(self.db_url)
         except Exception as e:
             self.raise_error("  -> Could not connect to DB " + self.db_url + "! " + str(e))
             return False
@@ -327,9 +442,18 @@ class BirdhouseCouchDB(BirdhouseDbClass):
         if db_key == "":
             [db_key, date] = self.filename2keys(filename, "couch delete")
             self.logging.debug("-----> DELETE DB: " + db_key + "/" + date + " - " + filename)
+            keys = self.entry_keys(filename)
+            if keys is not None:
+                self.delete_entries(keys[0], keys[1])
         else:
             self.logging.debug("-----> DELETE DB: " + db_key)
 
+        with self.write_lock:
+            if db_key in self.write_pending:
+                del self.write_pending[db_key]
+        self.db_objects.pop(db_key, None)
+        self.rev_cache.pop(db_key, None)
+
         try:
             if db_key in self.database:
                 self.database.delete(db_key)
@@ -384,12 +508,14 @@ class BirdhouseCouchDB(BirdhouseDbClass):
         self.logging.info("   -> DB created: " + db_key + " " + str(time.time()))
         return
 
-    def filename2keys(self, filename, call=""):
+    def filename2keys(self, filename, call="", fold_date=True):
         """
         translate filename to keys
 
         Args:
             filename (str): filename to be translated into database key
+            call (str): calling function for logging
+            fold_date (bool): add date to the database name (one database per date)
         Returns:
             str: db_key
         """
@@ -426,12 +552,28 @@ class BirdhouseCouchDB(BirdhouseDbClass):
                 self.logging.warning("  -> use the following DB name instead: " + database)
 
         # experiment
-        if date != "":
+        if date != "" and fold_date:
             database += "_" + date
             date = ""
 
         return [database, date]
 
+    def entry_keys(self, filename):
+        """
+        check if a database is stored with one document per entry (presets.birdhouse_couchdb_schema)
+
+        Args:
+            filename (str): filename to be translated into database keys
+        Returns:
+            list: [entry database, date, database name] or None if stored in the main document
+        """
+        if self.schema["mode"] != "entries":
+            return None
+        [database, date] = self.filename2keys(filename, "couch entries", fold_date=False)
+        if database in self.schema["databases"] and self.schema["databases"][database]["date"] == (date != ""):
+            return [self.schema["prefix"] + database, date, database]
+        return None
+
     def read(self, filename, retry=True):
         """
         read data from DB
@@ -449,10 +591,44 @@ class BirdhouseCouchDB(BirdhouseDbClass):
         if db_key == "":
             self.raise_error("CouchDB ERROR read, could not get db_key from filename ("+filename+")")
             return {}
+
+        with self.write_lock:
+            if db_key in self.write_pending and self.write_pending[db_key]["date"] == date:
+                return self.write_pending[db_key]["data"]
+
+        keys = self.entry_keys(filename)
+        if keys is None:
+            return self.read_main(filename, db_key, date, retry)
+
+        data = self.read_entries(keys[0], keys[1], keys[2])
+        if data is None:
+            # not migrated yet: read main document and migrate
+            data = {}
+            database = self.get_database(db_key)
+            if database is not None and "main" in database:
+                data = self.read_main(filename, db_key, date, retry)
+                if data != {}:
+                    self.logging.info("Migrate " + db_key + " to entry documents ...")
+                    self.write_entries(keys[0], keys[1], keys[2], data)
+        return data
+
+    def read_main(self, filename, db_key, date, retry=True):
+        """
+        read data from the main document of a database
+
+        Args:
+            filename (str): filename (for logging)
+            db_key (str): database name
+            date (str): date within the main document, usually empty
+            retry (bool): retry after error
+        Returns:
+            dict: data from database
+        """
         try:
-            if db_key in self.database:
-                database = self.database[db_key]
+            database = self.get_database(db_key)
+            if database is not None:
                 doc = database.get("main")
+                self.rev_cache[db_key] = doc["_rev"]
                 doc_data = doc["data"]
                 if date != "":
                     if date in doc_data:
@@ -470,14 +646,30 @@ class BirdhouseCouchDB(BirdhouseDbClass):
             if retry:
                 self.logging.warning("CouchDB ERROR read: " + filename + " - " + db_key + "/" + date +
                                      " - " + str(e) + " -> RETRY")
-                return self.read(filename, retry=False)
+                return self.read_main(filename, db_key, date, retry=False)
             else:
                 self.raise_error("CouchDB ERROR read: " + filename + " - " + db_key + "/" + date + " - " + str(e))
                 return {}
 
+    def get_database(self, db_key):
+        """
+        return database object, cached to avoid a request to the server for each access
+
+        Args:
+            db_key (str): database name
+        Returns:
+            couchdb.Database: database object, None if not exists
+        """
+        if db_key not in self.db_objects:
+            if db_key not in self.database:
+                return None
+            self.db_objects[db_key] = self.database[db_key]
+        return self.db_objects[db_key]
+
     def write(self, filename, data, create=False, retry=True):
         """
-        read data from DB
+        write data to DB; if coalescing is active (set by the DB handler) writes are collected per database
+        and saved by write_flush() after the coalesce window, so only the last version is sent to the server
 
         Args:
             filename (str): filename to be translated into db_key
@@ -489,39 +681,106 @@ class BirdhouseCouchDB(BirdhouseDbClass):
         self.logging.debug("-----> WRITE: " + filename + " (" + self.basic_directory + ")")
         self.logging.debug("-----> WRITE DB: " + db_key + "/" + date)
 
-        if db_key not in self.database and create:
+        if not self.coalesce or self.write_settings["coalesce_window"] <= 0:
+            self.write_data(filename, db_key, date, data, create, retry)
+            return
+
+        with self.write_lock:
+            if db_key in self.write_pending and self.write_pending[db_key]["date"] == date:
+                self.write_pending[db_key]["data"] = data
+                self.write_pending[db_key]["create"] = self.write_pending[db_key]["create"] or create
+                self.write_coalesced += 1
+                return
+            pending = self.write_pending.pop(db_key, None)
+            self.write_pending[db_key] = {"time": time.time(), "filename": filename, "date": date, "data": data,
+                                          "create": create}
+
+        if pending is not None:
+            self.write_data(pending["filename"], db_key, pending["date"], pending["data"], pending["create"])
+
+    def write_flush(self, force=False):
+        """
+        save collected writes older than the coalesce window and compact databases if required
+
+        Args:
+            force (bool): save all collected writes, e.g., on shutdown
+        """
+        with self.write_lock:
+            due = [db_key for db_key in self.write_pending
+                   if force or self.write_pending[db_key]["time"] + self.write_settings["coalesce_window"] < time.time()]
+            pending = [(db_key, self.write_pending.pop(db_key)) for db_key in due]
+
+        for db_key, entry in pending:
+            self.write_data(entry["filename"], db_key, entry["date"], entry["data"], entry["create"])
+
+        for db_key in list(self.compact_writes.keys()):
+            self.compact_check(db_key)
+
+    def write_data(self, filename, db_key, date, data, create=False, retry=True):
+        """
+        write data as entry documents or into the main document depending on the schema
+
+        Args:
+            filename (str): filename to be translated into database keys
+            db_key (str): database name
+            date (str): date within the main document, usually empty
+            data (dict): data to be saved in the database
+            create (bool): create database if not exists
+            retry (bool): retry after error
+        """
+        keys = self.entry_keys(filename)
+        if keys is not None:
+            self.write_entries(keys[0], keys[1], keys[2], data)
+        else:
+            self.write_doc(db_key, date, data, create, retry)
+
+    def write_doc(self, db_key, date, data, create=False, retry=True):
+        """
+        save the main document of a database, uses the cached revision to avoid reading the document first
+
+        Args:
+            db_key (str): database name
+            date (str): date within the database, empty for the complete document
+            data (dict): data to be saved in the database
+            create (bool): create database if not exists
+            retry (bool): retry after error
+        """
+        database = self.get_database(db_key)
+        if database is None and create:
             self.create(db_key)
+            database = self.get_database(db_key)
 
-        if db_key not in self.database:
+        if database is None:
             self.raise_error("CouchDB ERROR save: '" + db_key + "' not found, could not write data.")
             return
 
         try:
-            database = self.database[db_key]
-            doc = database.get("main")
-            doc_data = doc["data"]
-            if date != "":
-                doc_data[date] = data
+            doc = {
+                '_id': 'main',
+                'type': db_key,
+                'time': time.time(),
+                'change': 'save changes',
+                'data': data
+            }
+            if date != "" or db_key not in self.rev_cache:
+                doc_current = database.get("main")
+                if doc_current is None:
+                    doc['change'] = 'new'
+                    if date != "":
+                        doc['data'] = {date: data}
+                else:
+                    doc['_rev'] = doc_current['_rev']
+                    if date != "":
+                        doc['data'] = doc_current['data']
+                        doc['data'][date] = data
             else:
-                doc_data = data
+                doc['_rev'] = self.rev_cache[db_key]
 
-            if doc is None:
-                doc = {
-                    '_id': 'main',
-                    'type': db_key,
-                    'time': time.time(),
-                    'change': 'new',
-                    'data': doc_data
-                }
-            else:
-                doc['data'] = doc_data
-                doc['time'] = time.time()
-                doc['change'] = 'save changes'
         except Exception as e:
             if retry:
                 self.logging.warning("CouchDB ERROR save (prepare data): " + db_key + " " + str(e) + " -> RETRY")
                 time.sleep(self.timeout)
-                self.write(filename, data, create, retry=False)
+                self.write_doc(db_key, date, data, create, retry=False)
                 return
             else:
                 self.logging.error("CouchDB ERROR save (prepare data): " + db_key + " " + str(e))
@@ -529,23 +788,322 @@ class BirdhouseCouchDB(BirdhouseDbClass):
 
         try:
             database.save(doc)
-            database.compact()
+            self.rev_cache[db_key] = doc['_rev']
+            self.compact_writes[db_key] = self.compact_writes.get(db_key, 0) + 1
+
+        except couchdb.http.ResourceConflict as e:
+            self.rev_cache.pop(db_key, None)
+            if retry:
+                self.logging.debug("CouchDB conflict save: " + db_key + " (revision changed) -> RETRY")
+                self.write_doc(db_key, date, data, create, retry=False)
+            else:
+                self.logging.error("CouchDB ERROR save: " + db_key + " " + str(e))
+            return
 
         except Exception as e:
+            self.rev_cache.pop(db_key, None)
             if retry:
                 self.logging.error("CouchDB ERROR save: " + db_key + " " + str(e) + " -> RETRY")
                 time.sleep(self.timeout)
-                self.write(filename, data, create, retry=False)
+                self.write_doc(db_key, date, data, create, retry=False)
             else:
                 self.logging.error("CouchDB ERROR save: " + db_key + " " + str(e))
                 self.logging.error("  -> dict entries: " + str(len(doc["data"])))
                 self.logging.error("  -> dict size: " + str(sys.getsizeof(doc["data"])))
                 self.logging.debug("  -> dict keys: " + str(doc["data"].keys()))
-                return
+            return
 
         self.changed_data = True
         return
 
+    def compact_check(self, db_key):
+        """
+        compact database after a number of writes or an interval, if the file is fragmented enough
+
+        Args:
+            db_key (str): database name
+        """
+        writes = self.compact_writes.get(db_key, 0)
+        if db_key not in self.compact_last:
+            self.compact_last[db_key] = time.time()
+        if writes == 0 or (writes < self.write_settings["compact_writes"] and
+                           self.compact_last[db_key] + self.write_settings["compact_interval"] > time.time()):
+            return
+
+        self.compact_writes[db_key] = 0
+        self.compact_last[db_key] = time.time()
+        try:
+            database = self.get_database(db_key)
+            info = database.info()
+            sizes = info.get("sizes", {})
+            size_file = sizes.get("file", info.get("disk_size", 0))
+            size_active = sizes.get("active", info.get("data_size", 0))
+            if size_active > 0 and size_file < size_active * self.write_settings["compact_ratio"]:
+                return
+            database.compact()
+            self.logging.debug("CouchDB compact: " + db_key + " (" + str(writes) + " writes, " +
+                               str(round(size_file / 1024 / 1024, 1)) + " MB)")
+        except Exception as e:
+            self.logging.warning("CouchDB could not compact " + db_key + ": " + str(e))
+
+    def get_entries_database(self, entry_db, create=True):
+        """
+        return database for entry documents, create incl. design document with views if required
+
+        Args:
+            entry_db (str): database name
+            create (bool): create database if not exists
+        Returns:
+            couchdb.Database: database object, None if not exists
+        """
+        database = self.get_database(entry_db)
+        if database is None and not create:
+            return None
+        if database is None:
+            self.logging.info("   -> create DB " + entry_db + " (entry documents)")
+            database = self.database.create(entry_db)
+            self.db_objects[entry_db] = database
+
+        if entry_db not in self.entry_views:
+            design = database.get("_design/birdhouse")
+            if design is None or design.get("version") != self.schema["views_version"]:
+                doc = {"_id": "_design/birdhouse", "language": "javascript",
+                       "version": self.schema["views_version"], "views": birdhouse_couchdb_views}
+                if design is not None:
+                    doc["_rev"] = design["_rev"]
+                database.save(doc)
+                self.logging.info("   -> views updated: " + entry_db)
+            self.entry_views.append(entry_db)
+        return database
+
+    def read_entries(self, entry_db, date, database_name):
+        """
+        read data of a database / date from entry documents using the view by_date
+
+        Args:
+            entry_db (str): database name with entry documents
+            date (str): date, empty for databases without date
+            database_name (str): database name in the main document schema
+        Returns:
+            dict: data from database, None if not available (not migrated yet)
+        """
+        database = self.get_entries_database(entry_db, create=False)
+        if database is None:
+            return None
+        meta = database.get("meta_" + date)
+        if meta is None:
+            return None
+
+        section = self.schema["databases"][database_name]["section"]
+        data = dict(meta["data"])
+        entries = {}
+        revs = {meta["_id"]: [meta["_rev"], hash(json.dumps(meta["data"], sort_keys=True))]}
+        for row in database.view("birdhouse/by_date", startkey=[date], endkey=[date, {}], include_docs=True):
+            doc = row.doc
+            entries[doc["key"]] = doc["data"]
+            revs[doc["_id"]] = [doc["_rev"], hash(json.dumps(doc["data"], sort_keys=True))]
+
+        if section != "":
+            data[section] = entries
+        else:
+            data.update(entries)
+        self.entry_revs[(entry_db, date)] = revs
+        return data
+
+    def write_entries(self, entry_db, date, database_name, data):
+        """
+        write data of a database / date as entry documents via _bulk_docs, only changed and deleted entries
+        are sent (compared to the cached revisions and checksums)
+
+        Args:
+            entry_db (str): database name with entry documents
+            date (str): date, empty for databases without date
+            database_name (str): database name in the main document schema
+            data (dict): complete data of the database / date
+        """
+        start_time = time.time()
+        database = self.get_entries_database(entry_db)
+        if (entry_db, date) not in self.entry_revs:
+            self.read_entries(entry_db, date, database_name)
+        revs = self.entry_revs.get((entry_db, date), {})
+
+        section = self.schema["databases"][database_name]["section"]
+        if section != "":
+            entries = data.get(section, {})
+            meta = {key: data[key] for key in data if key != section}
+        else:
+            entries = data
+            meta = {}
+
+        docs = []
+        doc_ids = {"meta_" + date: ("", meta)}
+        for key in entries:
+            doc_ids[(date + "_" if date != "" else "") + key] = (key, entries[key])
+
+        for doc_id in doc_ids:
+            key, entry = doc_ids[doc_id]
+            checksum = hash(json.dumps(entry, sort_keys=True))
+            if doc_id in revs and revs[doc_id][1] == checksum:
+                continue
+            if key == "":
+                doc = {"_id": doc_id, "doc_type": "meta", "date": date, "data": entry}
+            else:
+                doc = {"_id": doc_id, "doc_type": "entry", "date": date, "key": key, "data": entry,
+                       "camera": entry.get("camera", "") if isinstance(entry, dict) else ""}
+            if doc_id in revs:
+                doc["_rev"] = revs[doc_id][0]
+            docs.append((doc, checksum))
+
+        for doc_id in list(revs.keys()):
+            if doc_id not in doc_ids:
+                docs.append(({"_id": doc_id, "_rev": revs[doc_id][0], "_deleted": True}, None))
+
+        if len(docs) == 0:
+            return
+
+        failed = 0
+        try:
+            results = database.update([doc for doc, checksum in docs])
+            for [doc, checksum], [success, doc_id, rev] in zip(docs, results):
+                if not success:
+                    failed += 1
+                elif checksum is None:
+                    revs.pop(doc_id, None)
+                else:
+                    revs[doc_id] = [rev, checksum]
+            self.entry_revs[(entry_db, date)] = revs
+        except Exception as e:
+            self.raise_error("CouchDB ERROR bulk save: " + entry_db + "/" + date + " - " + str(e))
+            failed = len(docs)
+
+        if failed > 0:
+            # revisions changed outside (or error), read again with the next write
+            self.entry_revs.pop((entry_db, date), None)
+            self.logging.warning("CouchDB bulk save: " + str(failed) + " of " + str(len(docs)) +
+                                 " documents not saved in " + entry_db + "/" + date)
+
+        self.compact_writes[entry_db] = self.compact_writes.get(entry_db, 0) + 1
+        self.changed_data = True
+        self.config.set_processing_performance("db_write_file", "write_couch_entries", start_time)
+
+    def delete_entries(self, entry_db, date):
+        """
+        delete all entry documents of a database / date
+
+        Args:
+            entry_db (str): database name with entry documents
+            date (str): date, empty for databases without date
+        """
+        database = self.get_entries_database(entry_db, create=False)
+        if database is None:
+            return
+        docs = []
+        for row in database.view("birdhouse/by_date", startkey=[date], endkey=[date, {}], include_docs=True):
+            docs.append({"_id": row.id, "_rev": row.doc["_rev"], "_deleted": True})
+        meta = database.get("meta_" + date)
+        if meta is not None:
+            docs.append({"_id": meta["_id"], "_rev": meta["_rev"], "_deleted": True})
+        if len(docs) > 0:
+            database.update(docs)
+        self.entry_revs.pop((entry_db, date), None)
+        self.logging.info("Deleted " + str(len(docs)) + " entry documents from " + entry_db + "/" + date + ".")
+
+    def query(self, filename, camera=None, favorit=None, to_be_deleted=None, label=None, all_dates=False):
+        """
+        read entries using the views of the entry documents, e.g., all favorites or all detections of a label
+        (only for databases stored as entry documents)
+
+        Args:
+            filename (str): filename to be translated into database keys
+            camera (str): camera id
+            favorit (int): 0 or 1
+            to_be_deleted (int): 0 or 1
+            label (str): object detection label
+            all_dates (bool): search in all dates of the database (e.g. complete archive)
+        Returns:
+            dict: matching entries (key: entry), for all dates the key is DATE_KEY
+        """
+        keys = self.entry_keys(filename)
+        if keys is None:
+            self.raise_warning("CouchDB query requires schema 'entries': " + filename)
+            return {}
+        database = self.get_entries_database(keys[0], create=False)
+        if database is None:
+            return {}
+        date = keys[1]
+
+        if label is not None:
+            view = "birdhouse/labels"
+            start, end = ([label], [label, {}]) if all_dates else ([label, date], [label, date, {}])
+        elif favorit is not None and int(favorit) == 1:
+            view = "birdhouse/favorites"
+            start, end = ([], [{}]) if all_dates else ([date], [date, {}])
+        elif all_dates:
+            view = "birdhouse/by_date"
+            start, end = [], [{}]
+        elif camera is not None:
+            view = "birdhouse/by_date"
+            start, end = [date, camera], [date, camera]
+        else:
+            view = "birdhouse/by_date"
+            start, end = [date], [date, {}]
+
+        result = {}
+        try:
+            for row in database.view(view, startkey=start, endkey=end, include_docs=True):
+                doc = row.doc
+                entry = doc["data"]
+                if camera is not None and doc.get("camera") != camera:
+                    continue
+                if favorit is not None and int(entry.get("favorit", 0) or 0) != int(favorit):
+                    continue
+                if to_be_deleted is not None and int(entry.get("to_be_deleted", 0) or 0) != int(to_be_deleted):
+                    continue
+                if all_dates and doc["date"] != "":
+                    result[doc["date"] + "_" + doc["key"]] = entry
+                else:
+                    result[doc["key"]] = entry
+        except Exception as e:
+            self.raise_error("CouchDB ERROR query: " + keys[0] + " - " + view + " - " + str(e))
+        return result
+
+    def migrate_entries(self, force=False):
+        """
+        migrate databases defined in presets.birdhouse_couchdb_schema from main documents to entry documents;
+        the databases with main documents are kept
+
+        Args:
+            force (bool): migrate again, even if entry documents already exist for a database / date
+        Returns:
+            int: amount of migrated databases
+        """
+        count = 0
+        self.logging.info("Migrate CouchDB to entry documents ...")
+        for db_key in list(self.database):
+            for database_name in self.schema["databases"]:
+                settings = self.schema["databases"][database_name]
+                if settings["date"] and db_key.startswith(database_name + "_") \
+                        and db_key[len(database_name) + 1:].isdigit():
+                    date = db_key[len(database_name) + 1:]
+                elif not settings["date"] and db_key == database_name:
+                    date = ""
+                else:
+                    continue
+
+                entry_db = self.schema["prefix"] + database_name
+                database = self.get_entries_database(entry_db)
+                if not force and "meta_" + date in database:
+                    continue
+                doc = self.get_database(db_key).get("main")
+                if doc is None:
+                    continue
+                self.write_entries(entry_db, date, database_name, doc["data"])
+                self.logging.info(" - " + db_key + " -> " + entry_db + "/" + date)
+                count += 1
+
+        self.logging.info("Migrated " + str(count) + " databases to entry documents.")
+        return count
+
     def exists(self, filename):
         """
         check if db exists
@@ -560,13 +1118,21 @@ class BirdhouseCouchDB(BirdhouseDbClass):
 
         if db_key == "":
             return False
+        with self.write_lock:
+            if db_key in self.write_pending and self.write_pending[db_key]["date"] == date:
+                return True
+
+        keys = self.entry_keys(filename)
+        if keys is not None:
+            database = self.get_entries_database(keys[0], create=False)
+            if database is not None and "meta_" + keys[1] in database:
+                return True
         try:
             if db_key in self.database:
-                #time.sleep(0.01)
-                database = self.database[db_key]
-                #time.sleep(0.01)
+                database = self.get_database(db_key)
+                if date == "":
+                    return "main" in database
                 doc = database.get("main")
-                #time.sleep(0.01)
                 doc_data = doc["data"]
                 if date != "":
                     if date in doc_data:
@@ -581,3 +1147,344 @@ class BirdhouseCouchDB(BirdhouseDbClass):
             self.logging.error("'exists()' - DB connection error: " + str(e))
 
 
+class BirdhouseSQLite(BirdhouseDbClass):
+    """
+    class to read and write data from a local SQLite database: one row per entry with indexed columns
+    (camera, favorit, to_be_deleted, similarity, label) instead of one document per database
+    """
+
+    def __init__(self, config, db):
+        """
+        Constructor to initialize class
+
+        Args:
+            config (modules.config.BirdhouseConfig): reference to config handler
+            db (dict): database configuration (filename, timeout, sections)
+        """
+        BirdhouseDbClass.__init__(self, "SQLITE", "DB-sqlite", config)
+        self.locked = {}
+        self.connection = None
+        self.db_list = []
+        self.db_lock = threading.Lock()
+
+        self.basic_directory = os.path.realpath(birdhouse_main_directories["data"])
+        self.db_file = os.path.join(self.basic_directory, db["filename"])
+        self.timeout = db["timeout"]
+        self.sections = db["sections"]
+        self.database_translation = birdhouse_dir_to_database
+
+        self.connected = self.connect()
+        self.logging.info("Connected SQLite handler (" + self.db_file + ").")
+
+    def connect(self):
+        """
+        open database file and create tables and indexes if not exist
+
+        Returns:
+            bool: connection status
+        """
+        self.reset_error()
+        try:
+            self.connection = sqlite3.connect(self.db_file, timeout=self.timeout, check_same_thread=False)
+            with self.db_lock:
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.execute("PRAGMA synchronous=NORMAL")
+                self.connection.execute("CREATE TABLE IF NOT EXISTS databases ("
+                                        "db TEXT NOT NULL, date TEXT NOT NULL, time REAL, "
+                                        "PRIMARY KEY (db, date))")
+                self.connection.execute("CREATE TABLE IF NOT EXISTS entries ("
+                                        "db TEXT NOT NULL, date TEXT NOT NULL, section TEXT NOT NULL, "
+                                        "key TEXT NOT NULL, data TEXT, camera TEXT, favorit INTEGER, "
+                                        "to_be_deleted INTEGER, similarity REAL, label TEXT, "
+                                        "PRIMARY KEY (db, date, section, key))")
+                self.connection.execute("CREATE INDEX IF NOT EXISTS entries_camera ON entries (db, date, camera)")
+                self.connection.execute("CREATE INDEX IF NOT EXISTS entries_favorit ON entries (db, favorit)")
+                self.connection.execute("CREATE INDEX IF NOT EXISTS entries_delete ON entries (db, to_be_deleted)")
+                self.connection.execute("CREATE INDEX IF NOT EXISTS entries_label ON entries (db, label)")
+                self.connection.commit()
+            self.get_db_list()
+            return True
+
+        except Exception as e:
+            self.raise_error("Could not connect to SQLite database " + self.db_file + ": " + str(e))
+            return False
+
+    def filename2keys(self, filename):
+        """
+        translate filename to database name and date (other than CouchDB the date is kept separately)
+
+        Args:
+            filename (str): filename incl. path to be translated into database key
+        Returns:
+            [str, str]: database name and date
+        """
+        if filename.startswith("/"):
+            relative = os.path.relpath(os.path.realpath(filename), self.basic_directory)
+            if not relative.startswith(".."):
+                filename = relative
+        filename = filename.replace(".json", "")
+        if filename.startswith("/"):
+            filename = filename[1:]
+
+        if filename in self.database_translation:
+            return [self.database_translation[filename], ""]
+
+        parts = filename.split("/")
+        if len(parts) >= 3 and parts[0] + "/<DATE>/" + parts[2] in self.database_translation:
+            return [self.database_translation[parts[0] + "/<DATE>/" + parts[2]], parts[1]]
+
+        self.logging.warning("  -> " + filename + " not found in database_translation, use filename instead.")
+        return [filename.replace("/", "_"), ""]
+
+    @staticmethod
+    def entry2columns(entry):
+        """
+        extract values for the indexed columns from an entry
+
+        Args:
+            entry (Any): entry data
+        Returns:
+            tuple: camera, favorit, to_be_deleted, similarity, label (comma separated, e.g. ",robin,tit,")
+        """
+        if not isinstance(entry, dict):
+            return None, None, None, None, None
+        labels = ""
+        if isinstance(entry.get("detections"), list):
+            for detection in entry["detections"]:
+                if isinstance(detection, dict) and "label" in detection and "," + detection["label"] + "," not in labels:
+                    labels += "," + str(detection["label"])
+            if labels != "":
+                labels += ","
+        try:
+            similarity = float(entry["similarity"]) if "similarity" in entry else None
+        except (TypeError, ValueError):
+            similarity = None
+        return (entry.get("camera"), int(entry.get("favorit", 0) or 0), int(entry.get("to_be_deleted", 0) or 0),
+                similarity, labels if labels != "" else None)
+
+    def data2rows(self, db_key, date, data):
+        """
+        split data into rows, entries of the configured section are stored as single rows
+
+        Args:
+            db_key (str): database name
+            date (str): date of database if required (format: YYYYMMDD)
+            data (dict): complete data of the database
+        Returns:
+            list: rows for the table entries
+        """
+        rows = []
+        section = self.sections.get(db_key, "")
+        for key in data:
+            if key == section and isinstance(data[key], dict):
+                for entry_key in data[key]:
+                    entry = data[key][entry_key]
+                    rows.append((db_key, date, section, entry_key, json.dumps(entry, ensure_ascii=False))
+                                + self.entry2columns(entry))
+            else:
+                rows.append((db_key, date, "", key, json.dumps(data[key], ensure_ascii=False))
+                            + self.entry2columns(data[key]))
+        return rows
+
+    def read(self, filename):
+        """
+        read data from DB
+
+        Args:
+            filename (str): filename to be translated into db_key and date
+        Returns:
+            dict: data from database
+        """
+        [db_key, date] = self.filename2keys(filename)
+        self.logging.debug("-----> READ DB: " + db_key + "/" + date + " - " + filename)
+        data = {}
+        try:
+            with self.db_lock:
+                rows = self.connection.execute("SELECT section, key, data FROM entries WHERE db=? AND date=?",
+                                               (db_key, date)).fetchall()
+            section = self.sections.get(db_key, "")
+            if section != "":
+                data[section] = {}
+            for [row_section, key, value] in rows:
+                if row_section == "":
+                    data[key] = json.loads(value)
+                else:
+                    data.setdefault(row_section, {})[key] = json.loads(value)
+            return data
+
+        except Exception as e:
+            self.raise_error("SQLite ERROR read: " + filename + " - " + db_key + "/" + date + " - " + str(e))
+            return {}
+
+    def query(self, filename, camera=None, favorit=None, to_be_deleted=None, label=None, all_dates=False):
+        """
+        read entries filtered by indexed columns, e.g., all favorites or all detections of a label
+
+        Args:
+            filename (str): filename to be translated into db_key and date
+            camera (str): camera id
+            favorit (int): 0 or 1
+            to_be_deleted (int): 0 or 1
+            label (str): object detection label
+            all_dates (bool): search in all dates of the database (e.g. complete archive)
+        Returns:
+            dict: matching entries (key: entry), for all dates the key is DATE_KEY
+        """
+        [db_key, date] = self.filename2keys(filename)
+        conditions = "db=?"
+        values = [db_key]
+        if not all_dates:
+            conditions += " AND date=?"
+            values.append(date)
+        for column, value in [("camera", camera), ("favorit", favorit), ("to_be_deleted", to_be_deleted)]:
+            if value is not None:
+                conditions += " AND " + column + "=?"
+                values.append(value)
+        if label is not None:
+            conditions += " AND label LIKE ?"
+            values.append("%," + label + ",%")
+
+        result = {}
+        try:
+            with self.db_lock:
+                rows = self.connection.execute("SELECT date, key, data FROM entries WHERE " + conditions +
+                                               " AND section=?", values + [self.sections.get(db_key, "")]).fetchall()
+            for [row_date, key, value] in rows:
+                if all_dates:
+                    key = row_date + "_" + key
+                result[key] = json.loads(value)
+        except Exception as e:
+            self.raise_error("SQLite ERROR query: " + filename + " - " + str(e))
+        return result
+
+    def write(self, filename, data, create=False):
+        """
+        write complete data of a database in one transaction
+
+        Args:
+            filename (str): filename to be translated into db_key and date
+            data (dict): data to be saved in the database
+            create (bool): create database if not exists (always done for SQLite)
+        """
+        [db_key, date] = self.filename2keys(filename)
+        self.logging.debug("-----> WRITE DB: " + db_key + "/" + date + " - " + filename)
+        start_write_time = time.time()
+        try:
+            rows = self.data2rows(db_key, date, data)
+            with self.db_lock:
+                with self.connection:
+                    self.connection.execute("INSERT OR REPLACE INTO databases (db, date, time) VALUES (?, ?, ?)",
+                                            (db_key, date, time.time()))
+                    self.connection.execute("DELETE FROM entries WHERE db=? AND date=?", (db_key, date))
+                    self.connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.config.set_processing_performance("db_write_file", "write_sqlite", start_write_time)
+
+        except Exception as e:
+            self.raise_error("SQLite ERROR write: " + filename + " - " + db_key + "/" + date + " - " + str(e))
+
+    def write_changes(self, filename, changes, data):
+        """
+        write changed entries only (top level keys), complete data if the database doesn't exist yet
+
+        Args:
+            filename (str): filename to be translated into db_key and date
+            changes (dict): changed entries (key: entry), None as entry for deleted entries
+            data (dict): complete data, used if the database doesn't exist yet
+        """
+        if not self.exists(filename):
+            self.write(filename, data)
+            return
+
+        [db_key, date] = self.filename2keys(filename)
+        start_write_time = time.time()
+        try:
+            deleted = [(db_key, date, key) for key in changes if changes[key] is None]
+            rows = [(db_key, date, "", key, json.dumps(changes[key], ensure_ascii=False))
+                    + self.entry2columns(changes[key]) for key in changes if changes[key] is not None]
+            with self.db_lock:
+                with self.connection:
+                    self.connection.executemany("DELETE FROM entries WHERE db=? AND date=? AND section='' AND key=?",
+                                                deleted)
+                    self.connection.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                                rows)
+            self.config.set_processing_performance("db_write_file", "write_sqlite_changes", start_write_time)
+            self.logging.debug("-----> WRITE DB: " + db_key + "/" + date + " (" + str(len(changes)) + " changes)")
+
+        except Exception as e:
+            self.raise_error("SQLite ERROR write changes: " + filename + " - " + db_key + "/" + date + " - " + str(e))
+
+    def exists(self, filename):
+        """
+        check if db exists
+
+        Args:
+            filename (str): filename to be translated into db_key and date
+        Returns:
+            bool: status if database exists
+        """
+        [db_key, date] = self.filename2keys(filename)
+        try:
+            with self.db_lock:
+                row = self.connection.execute("SELECT 1 FROM databases WHERE db=? AND date=?",
+                                              (db_key, date)).fetchone()
+            return row is not None
+        except Exception as e:
+            self.logging.error("'exists()' - SQLite error: " + str(e))
+            return False
+
+    def get_db_list(self):
+        """
+        get list of all databases in the SQLite file
+
+        Returns:
+            list: list of all databases (db_key or db_key_date)
+        """
+        self.logging.debug(" - Get SQLite DB list ... ")
+        db_list = []
+        for [db_key, date] in self.get_db_keys():
+            if date != "":
+                db_list.append(db_key + "_" + date)
+            else:
+                db_list.append(db_key)
+        self.db_list = db_list
+        return db_list
+
+    def get_db_keys(self):
+        """
+        get database names and dates of all databases in the SQLite file
+
+        Returns:
+            list: list of [db_key, date]
+        """
+        with self.db_lock:
+            rows = self.connection.execute("SELECT db, date FROM databases ORDER BY db, date").fetchall()
+        return [list(row) for row in rows]
+
+    def keys2filename(self, db_key, date=""):
+        """
+        translate database name and date back to the filename of the JSON database (e.g. for a migration)
+
+        Args:
+            db_key (str): database name
+            date (str): date of database if required (format: YYYYMMDD)
+        Returns:
+            str: filename incl. path, empty if not found
+        """
+        for path in self.database_translation:
+            if self.database_translation[path] == db_key and ("<DATE>" in path) == (date != ""):
+                return os.path.join(self.basic_directory, path.replace("<DATE>", date) + ".json")
+        return ""
+
+    def delete_db(self, filename):
+        """
+        delete a database incl. all entries
+
+        Args:
+            filename (str): filename to be translated into db_key and date
+        """
+        [db_key, date] = self.filename2keys(filename)
+        with self.db_lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM entries WHERE db=? AND date=?", (db_key, date))
+                self.connection.execute("DELETE FROM databases WHERE db=? AND date=?", (db_key, date))
+        self.logging.info("Database '" + db_key + "/" + date + "' deleted.")
@@ -1,5 +1,7 @@
 import os.path
 import time
+import math
+import functools
 
 import numpy as np
 import cv2
@@ -11,15 +13,158 @@ from datetime import datetime
 
 from modules.presets import *
 from modules.bh_class import BirdhouseCameraClass
-from modules.image import BirdhouseImageProcessing, BirdhouseImageSupport
+from modules.image import BirdhouseImageProcessing, BirdhouseImageSupport, BirdhouseFrameBundle, encode_profile_live
 from modules.video import BirdhouseVideoProcessing
 from modules.object import BirdhouseObjectDetection
+from modules.motion import BirdhouseMotionDetection
+from modules.exposure import BirdhouseExposureControl
+from modules.image_writer import BirdhouseImageWriter
+from modules.schedule import BirdhouseRecordSchedule
 from modules.camera_handler import BirdhousePiCameraHandler, BirdhouseCameraHandler, CameraInformation
 
 
 # https://pyimagesearch.com/2016/01/04/unifying-picamera-and-cv2-videocapture-into-a-single-class-with-opencv/
 
 
+class BirdhouseFrameLease(object):
+    """
+    Lease on a buffer of the frame ring: frames are created from the lease via the array interface, so each array
+    derived from the frame (views, slices, ...) keeps the lease alive; the buffer is released when the last one
+    has been deleted.
+    """
+
+    def __init__(self, ring, generation, index):
+        """
+        Constructor to initialize the lease.
+
+        Args:
+            ring (BirdhouseFrameRing): ring the buffer belongs to
+            generation (int): allocation generation of the ring
+            index (int): buffer position
+        """
+        self.ring = ring
+        self.generation = generation
+        self.index = index
+        self.buffer = ring._buffers[index]
+        self.__array_interface__ = self.buffer.__array_interface__
+
+    def __del__(self):
+        """
+        release buffer when the last array using the lease is deleted
+        """
+        self.ring.release(self.generation, self.index)
+
+
+class BirdhouseFrameRing(object):
+    """
+    Preallocated ring of frame buffers: each frame is written once by the capture thread and shared as read-only
+    view. A buffer is reused only if no consumer holds the frame or an array derived from it anymore (explicit
+    lease counter per buffer, see BirdhouseFrameLease).
+    """
+
+    def __init__(self, size=4):
+        """
+        Constructor to initialize the ring buffer, buffers are allocated with the first frame.
+
+        Args:
+            size (int): amount of preallocated frame buffers
+        """
+        self.size = size
+        self.shape = None
+        self.dtype = None
+        self.allocations = 0
+        self.allocations_fallback = 0
+        self.writes = 0
+
+        self._buffers = []
+        self._leases = []
+        self._generation = 0
+        self._position = -1
+        self._lock = threading.RLock()
+
+    def _allocate(self, shape, dtype):
+        """
+        (re)allocate all buffers, e.g. for the first frame or if the resolution changed; buffers still leased
+        stay valid until released, as the lease holds a reference
+
+        Args:
+            shape (tuple): shape of the frames
+            dtype (numpy.dtype): data type of the frames
+        """
+        self.shape = shape
+        self.dtype = dtype
+        self._buffers = [np.empty(shape, dtype=dtype) for _ in range(self.size)]
+        self._leases = [0] * self.size
+        self._generation += 1
+        self._position = -1
+        self.allocations += self.size
+
+    def _buffer_free(self, index):
+        """
+        check if the buffer is not leased anymore
+
+        Args:
+            index (int): buffer position
+        Returns:
+            bool: True if buffer can be overwritten
+        """
+        return self._leases[index] == 0
+
+    def release(self, generation, index):
+        """
+        release lease on a buffer (called when the last array using the lease is deleted)
+
+        Args:
+            generation (int): allocation generation of the lease
+            index (int): buffer position
+        """
+        with self._lock:
+            if generation == self._generation and self._leases[index] > 0:
+                self._leases[index] -= 1
+
+    def write(self, raw):
+        """
+        copy frame into the next free buffer and return a read-only view on it
+
+        Args:
+            raw (numpy.ndarray): frame from camera
+        Returns:
+            numpy.ndarray: read-only view on the stored frame
+        """
+        with self._lock:
+            if self.shape != raw.shape or self.dtype != raw.dtype:
+                self._allocate(raw.shape, raw.dtype)
+
+            self.writes += 1
+            for step in range(1, self.size + 1):
+                index = (self._position + step) % self.size
+                if self._buffer_free(index):
+                    self._position = index
+                    np.copyto(self._buffers[index], raw)
+                    self._leases[index] += 1
+                    frame = np.asarray(BirdhouseFrameLease(self, self._generation, index))
+                    frame.flags.writeable = False
+                    return frame
+
+            # all buffers are still in use by consumers: use a separate buffer for this frame
+            self.allocations_fallback += 1
+            frame = raw.copy()
+            frame.flags.writeable = False
+            return frame
+
+    def get_statistics(self):
+        """
+        return buffer statistics
+
+        Returns:
+            dict: amount of written frames, preallocated and additionally allocated buffers, leased buffers
+        """
+        with self._lock:
+            leased = len([count for count in self._leases if count > 0])
+        return {"writes": self.writes, "allocations": self.allocations, "fallback": self.allocations_fallback,
+                "leased": leased}
+
+
 class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
     """
     creates a continuous stream while active requests
@@ -62,6 +207,8 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
         self._stream_last = None
         self._stream_last_time = None
         self._stream_image_id = 0
+        self._stream_new_frame = threading.Condition()
+        self._stream_ring = BirdhouseFrameRing(size=4)
         self._timeout = 3
 
         self._last_activity = 0
@@ -72,6 +219,16 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
         self._start_delay_stream = 1
         self._start_image_id = 0
         self._connected = False
+        self._camera_lock = threading.Lock()
+        self._retrieve_last = 0
+        self._still_request = None
+        self._still_image = None
+        self._stream_encoded = None
+        self._stream_decoded = None
+        self._stream_decoded_id = 0
+        self._decode_lock = threading.Lock()
+        self._count_passthrough = 0
+        self._count_decoded = 0
         self.config.set_thread_id(self.class_id, threading.get_ident())
 
     def run(self):
@@ -99,6 +256,11 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
         while self._running:
             self._start_time = time.time()
             self._start_image_id = self._stream_image_id
+            grab_mode = self.if_grab_mode()
+            self.set_passthrough()
+
+            if self._still_request is not None and self.if_ready() and not self.maintenance_mode:
+                self.capture_still()
 
             if self.param["active"] \
                     and not self.maintenance_mode \
@@ -106,16 +268,37 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
                     and self._last_activity > 0 and self._last_activity + self._timeout > time.time():
 
                 try:
-                    raw = self.read_from_camera()
+                    if grab_mode:
+                        raw = self.grab_from_camera()
+                        if raw is None:
+                            self.stream_count()
+                            self.thread_control()
+                            self.stream_framerate_check(sleep=False)
+                            continue
+                    else:
+                        raw = self.read_from_camera()
                     self.logging.debug("RAW - reading images from camera: " + str(len(raw)) + " bytes.")
                     if raw is None or len(raw) == 0:
                         raise Exception("Error with 'read_from_camera()': empty image.")
 
                     self.active = True
-                    self._stream = raw.copy()
-                    self._stream_last = raw.copy()
-                    self._stream_last_time = time.time()
-                    self._stream_image_id += 1
+                    if self.if_encoded(raw):
+                        encoded = raw.tobytes()
+                        frame = None
+                    else:
+                        encoded = None
+                        frame = self._stream_ring.write(raw)
+                    with self._stream_new_frame:
+                        self._stream_image_id += 1
+                        if encoded is not None:
+                            self._stream_encoded = (self._stream_image_id, encoded)
+                            self._count_passthrough += 1
+                        else:
+                            self._stream_encoded = None
+                            self._stream_last = frame
+                        self._stream = frame
+                        self._stream_last_time = time.time()
+                        self._stream_new_frame.notify_all()
                     circle_in_cache = False
                     del raw
 
@@ -124,18 +307,28 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
                     if self._stream_last is not None:
                         if not circle_in_cache:
                             try:
-                                self._stream_last = self.image.draw_warning_bullet_raw(self._stream_last)
+                                self._stream_last = self.image.draw_warning_bullet_raw(self._stream_last.copy())
+                                self._stream_last.flags.writeable = False
                                 circle_in_cache = True
                             except cv2.error as e:
                                 self.raise_warning("Could not mark image as 'from cache due to error'.")
-                        self._stream = self._stream_last.copy()
+                        self._stream = self._stream_last
+                    self._stream_encoded = None
 
             elif self.maintenance_mode:
                 pass
 
             else:
+                if grab_mode and birdhouse_capture["grab_idle"] and self.param["active"] \
+                        and self.camera is not None and self.camera.if_connected():
+                    with self._camera_lock:
+                        if not self.camera.grab():
+                            grab_mode = False
+                else:
+                    grab_mode = False
                 self.active = False
                 self._stream = None
+                self._stream_encoded = None
                 self._stream_last = None
                 self._stream_image_id = 0
                 self._last_activity = 0
@@ -144,10 +337,115 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
 
             self.stream_count()
             self.thread_control()
-            self.stream_framerate_check()
+            self.stream_framerate_check(sleep=not grab_mode or self.error)
 
         self.logging.info("Stopped CAMERA raw stream for '"+self.id+"'.")
 
+    def if_grab_mode(self):
+        """
+        check if the camera supports grabbing frames without decoding (see presets.birdhouse_capture)
+
+        Returns:
+            bool: grab mode
+        """
+        return (birdhouse_capture["grab"] and self.camera is not None
+                and getattr(self.camera, "grab_supported", False))
+
+    def grab_from_camera(self):
+        """
+        grab frame at sensor rate, decode (retrieve) only if the max framerate allows a new image
+
+        Returns:
+            numpy.ndarray: raw image, None if only grabbed
+        """
+        duration_max = self.duration_slow if self.slow_stream else self.duration_max
+        with self._camera_lock:
+            if not self.camera.grab():
+                raise Exception("Error with 'grab()'.")
+            if time.time() - self._retrieve_last < duration_max:
+                return None
+            self._retrieve_last = time.time()
+            raw = self.camera.retrieve("stream_raw")
+        if self.if_encoded(raw):
+            return raw
+        return self.format_from_camera(raw)
+
+    def if_passthrough(self):
+        """
+        check if the JPEG images delivered by the camera are kept (MJPEG passthrough, see presets.birdhouse_capture):
+        requires grab mode, no rotation and no color schema conversion
+
+        Returns:
+            bool: passthrough possible
+        """
+        return (birdhouse_capture["mjpeg_passthrough"] and self.if_grab_mode()
+                and self.param["image"]["rotation"] == 0 and self.param["image"]["color_schema"] != "RGB")
+
+    def set_passthrough(self):
+        """
+        switch camera handler to passthrough mode or back if settings changed
+        """
+        if self.camera is None or not self.camera.if_connected():
+            return
+        passthrough = self.if_passthrough()
+        if passthrough != getattr(self.camera, "passthrough", False):
+            with self._camera_lock:
+                self.camera.set_passthrough(passthrough)
+
+    @staticmethod
+    def if_encoded(raw):
+        """
+        check if the image is an encoded JPEG buffer instead of a decoded image
+
+        Args:
+            raw (numpy.ndarray): image or buffer from camera
+        Returns:
+            bool: JPEG buffer
+        """
+        return (raw is not None and len(raw.shape) < 3 and raw.size > 2 and (len(raw.shape) == 1 or raw.shape[0] == 1)
+                and raw.item(0) == 0xFF and raw.item(1) == 0xD8)
+
+    def decode_stream(self):
+        """
+        return decoded current image, in passthrough mode decode the JPEG buffer only once on first request
+
+        Returns:
+            numpy.ndarray: raw image (read-only)
+        """
+        encoded = self._stream_encoded
+        if encoded is None:
+            return self._stream
+
+        with self._decode_lock:
+            if self._stream_decoded_id != encoded[0]:
+                start_time = time.time()
+                raw = cv2.imdecode(np.frombuffer(encoded[1], dtype=np.uint8), cv2.IMREAD_COLOR)
+                if raw is None:
+                    self.raise_error("Could not decode JPEG image from camera.")
+                    return self._stream_last
+                raw.flags.writeable = False
+                self._stream_decoded = raw
+                self._stream_decoded_id = encoded[0]
+                self._stream_last = raw
+                self._count_decoded += 1
+                self.config.set_processing_performance("camera_decode", self.id, start_time)
+            return self._stream_decoded
+
+    def read_stream_encoded(self, stream_id="default"):
+        """
+        return JPEG image as delivered by the camera (passthrough mode)
+
+        Args:
+            stream_id (str): stream id
+        Returns:
+            (int, bytes): image id and encoded image, None if not in passthrough mode or no image yet
+        """
+        self.set_activity(stream_id)
+        encoded = self._stream_encoded
+        if encoded is None:
+            return self._stream_image_id, None
+        return encoded
+
     def read_from_camera(self):
         """
         extract image from stream (rotated if defined in settings)
@@ -155,8 +453,19 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
         Returns:
             numpy.ndarray: raw image
         """
-        raw = self.camera.read("stream_raw")
+        with self._camera_lock:
+            raw = self.camera.read("stream_raw")
+        return self.format_from_camera(raw)
 
+    def format_from_camera(self, raw):
+        """
+        rotate image and convert color schema if defined in settings
+
+        Args:
+            raw (numpy.ndarray): raw image from camera
+        Returns:
+            numpy.ndarray: raw image
+        """
         if raw is not None and self.param["image"]["rotation"] != 0:
             raw = self.image.rotate_raw(raw, self.param["image"]["rotation"])
 
@@ -164,10 +473,46 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
             raw = cv2.cvtColor(raw, cv2.COLOR_RGB2BGR)
 
         if raw is not None and len(raw) > 0:
-            return raw.copy()
+            return raw
         else:
             self.raise_warning("Could not read image from camera.")
 
+    def request_still(self, width, height):
+        """
+        request an image in a higher resolution, captured by the raw stream thread between two frames,
+        the result can be requested via get_still()
+
+        Args:
+            width (int): image width
+            height (int): image height
+        """
+        self._still_image = None
+        self._still_request = (width, height)
+
+    def capture_still(self):
+        """
+        capture requested still image (called inside the raw stream thread, the only thread using the camera)
+        """
+        width, height = self._still_request
+        self.logging.info("Capture still image for '" + self.id + "' (" + str(width) + "x" + str(height) + ") ...")
+        start_time = time.time()
+        with self._camera_lock:
+            raw = self.camera.capture_still(width, height)
+        self._still_image = (self.format_from_camera(raw), time.time())
+        self._still_request = None
+        self.config.set_processing_performance("camera_capture_still", self.id, start_time)
+
+    def get_still(self):
+        """
+        return captured still image once
+
+        Returns:
+            (numpy.ndarray, float): raw image (None if error) and capture time, None if no (new) image available
+        """
+        still_image = self._still_image
+        self._still_image = None
+        return still_image
+
     def read_image(self):
         """
         read single raw image (extract from stream, if exists)
@@ -176,7 +521,7 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
             numpy.ndarray: raw image from cache or camera
         """
         if self.active:
-            return self._stream
+            return self.decode_stream()
         else:
             return self.read_from_camera()
 
@@ -195,15 +540,27 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
         self._last_activity_per_stream[stream_id] = time.time()
 
         if wait:
-            wait_time = 0
-            while self._stream_image_id == 0 and wait_time <= self._timeout:
-                time.sleep(0.2)
-                wait_time += 0.2
+            self.wait_for_frame(0, self._timeout)
 
         if self._stream_image_id == 0:
             self.raise_error("sRaw: read_stream: got no image from source '" + self.id + "' yet!")
 
-        return self._stream
+        return self.decode_stream()
+
+    def wait_for_frame(self, image_id, timeout):
+        """
+        block until an image with another id than the given one is available or the timeout is reached
+
+        Args:
+            image_id (int): last image id known by the caller
+            timeout (float): max. waiting time in seconds
+        Returns:
+            int: current stream image id
+        """
+        with self._stream_new_frame:
+            self._stream_new_frame.wait_for(lambda: self._stream_image_id != image_id or not self._running,
+                                            timeout=timeout)
+            return self._stream_image_id
 
     def read_stream_image_id(self):
         """
@@ -240,6 +597,30 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
             else:
                 return False
 
+    def set_activity(self, stream_id):
+        """
+        mark stream as requested, keeps the raw stream active without reading an image
+
+        Args:
+            stream_id (int|str): stream id
+        """
+        self._last_activity = time.time()
+        self._last_activity_count += 1
+        self._last_activity_per_stream[stream_id] = time.time()
+
+    def get_buffer_statistics(self):
+        """
+        return statistics of the frame ring buffer
+
+        Returns:
+            dict: amount of written frames, preallocated and additionally allocated buffers, passthrough and
+                  decoded JPEG images
+        """
+        statistics = self._stream_ring.get_statistics()
+        statistics["passthrough"] = self._count_passthrough
+        statistics["decoded"] = self._count_decoded
+        return statistics
+
     def get_framerate(self):
         """
         return rounded framerate
@@ -288,9 +669,12 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
                 del self._last_activity_per_stream[stream_id]
         self._active_streams = len(self._last_activity_per_stream.keys())
 
-    def stream_framerate_check(self):
+    def stream_framerate_check(self, sleep=True):
         """
         calculate framerate and ensure max. framerate
+
+        Args:
+            sleep (bool): wait to ensure max. framerate (not required in grab mode, grab() waits for the sensor)
         """
         duration = time.time() - self._start_time
         duration_max = self.duration_max
@@ -303,7 +687,7 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
         if self.slow_stream:
             duration_max = self.duration_slow
 
-        if duration < duration_max:
+        if sleep and duration < duration_max:
             time.sleep(duration_max - duration)
 
         duration = time.time() - self._start_time
@@ -385,6 +769,107 @@ class BirdhouseCameraStreamRaw(threading.Thread, BirdhouseCameraClass):
         stop basic stream
         """
         self._running = False
+        with self._stream_new_frame:
+            self._stream_new_frame.notify_all()
+
+
+class BirdhouseCameraStreamStages(BirdhouseCameraClass):
+    """
+    Shared edit stages for all edited streams of a camera (normalize -> crop / areas -> text / resize): each stage
+    is computed only once per image id of the raw stream and only if a stream requested it.
+    """
+
+    def __init__(self, camera_id, config):
+        """
+        Constructor to initialize edit stages.
+
+        Args:
+            camera_id (str): camera ID
+            config (modules.config.BirdhouseConfig): reference to main config handler
+        """
+        BirdhouseCameraClass.__init__(self, class_id=camera_id+"-sStage", class_log="cam-stream",
+                                      camera_id=camera_id, config=config)
+        self._cache = {}
+        self._demand = {}
+        self._locks = {}
+        self._locks_create = threading.Lock()
+        self._count_computed = {}
+        self._count_reused = {}
+
+    def get(self, stage, image_id, edit_function, raw):
+        """
+        return result of an edit stage for the given image id, compute only if not available yet
+
+        Args:
+            stage (str): stage name, e.g., 'normalized_hires', 'camera_cropped', 'camera_lowres'
+            image_id (int|None): image id of the raw stream the input is based on (None = don't cache)
+            edit_function (Any): function to create stage result from input image
+            raw (numpy.ndarray): input image (result of previous stage)
+        Returns:
+            numpy.ndarray: edited image (read-only)
+        """
+        if raw is None:
+            return raw
+
+        self._demand[stage] = time.time()
+        if image_id is None or image_id == 0:
+            return edit_function(raw)
+
+        with self._locks_create:
+            if stage not in self._locks:
+                self._locks[stage] = threading.Lock()
+                self._count_computed[stage] = 0
+                self._count_reused[stage] = 0
+
+        with self._locks[stage]:
+            if stage in self._cache and self._cache[stage][0] == image_id:
+                self._count_reused[stage] += 1
+                return self._cache[stage][1]
+
+            start_time = time.time()
+            image = edit_function(raw)
+            if image is not None:
+                image.flags.writeable = False
+                self._cache[stage] = [image_id, image]
+                self._count_computed[stage] += 1
+                self.config.set_processing_performance("camera_stream_stage", self.id + "_" + stage, start_time)
+            return image
+
+    def clean_up(self, timeout):
+        """
+        remove results of stages without requests within the timeout, releases the related frame buffers
+
+        Args:
+            timeout (float): timeout in seconds
+        """
+        for stage in list(self._cache.keys()):
+            if stage not in self._demand or self._demand[stage] + timeout < time.time():
+                with self._locks[stage]:
+                    if stage in self._cache:
+                        del self._cache[stage]
+
+    def get_active_stages(self, timeout):
+        """
+        return stages requested within the timeout
+
+        Args:
+            timeout (float): timeout in seconds
+        Returns:
+            list: stage names
+        """
+        return [stage for stage in self._demand if self._demand[stage] + timeout >= time.time()]
+
+    def get_statistics(self):
+        """
+        return how often stage results have been computed and reused
+
+        Returns:
+            dict: per stage amount of computed and reused results
+        """
+        statistics = {}
+        for stage in self._count_computed:
+            statistics[stage] = {"computed": self._count_computed[stage], "reused": self._count_reused[stage]}
+        return statistics
 
 
 class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
@@ -392,7 +877,7 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
     Class to create a continuous stream with specific format while active requests incl. error handling.
     """
 
-    def __init__(self, camera_id, config, stream_raw, stream_type, stream_resolution):
+    def __init__(self, camera_id, config, stream_raw, stream_type, stream_resolution, stream_stages=None):
         """
         Constructor to initialize camera class.
 
@@ -402,6 +887,7 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
             stream_raw (BirdhouseCameraStreamRaw): reference to raw stream handler
             stream_type (str): options: "raw", "normalized", "camera", "setting"
             stream_resolution (str): options: "lowres", "hires"
+            stream_stages (BirdhouseCameraStreamStages): edit stages shared by all edited streams of the camera
         """
         threading.Thread.__init__(self)
         BirdhouseCameraClass.__init__(self, class_id=camera_id+"-sEdit", class_log="cam-stream",
@@ -425,6 +911,9 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
             return
 
         self.stream_raw = stream_raw
+        self.stream_stages = stream_stages
+        if self.stream_stages is None:
+            self.stream_stages = BirdhouseCameraStreamStages(camera_id=camera_id, config=config)
         self.image = self.stream_raw.image
 
         self.img_error_files = {
@@ -451,6 +940,9 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         self._stream_last_time = 0
         self._stream_id_base = self.type + "_" + self.resolution + "_"
         self._stream_image_id = 0
+        self._stream_raw_image_id = 0
+        self._stream_lock = threading.Lock()
+        self._stream_read = threading.local()
         self._size_lowres = None
         self._start_delay_stream = 2
         self._error_wait = True
@@ -516,7 +1008,8 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
 
     def run(self):
         """
-        start thread for edited streams
+        start thread for edited streams: images are edited on request (see read_stream), the thread only
+        checks active streams and releases unused edit stages
         """
         self.reset_error()
         while not self.stream_raw.if_connected():
@@ -527,44 +1020,19 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         while self._running:
             self._start_time = time.time()
 
-            if self.maintenance_mode:
-                raw = self.read_maintenance_image()
-                self._stream = raw.copy()
-                self._stream_last = raw.copy()
-                self._stream_image_id += 1
-                self._stream_last_time = time.time()
-                time.sleep(1)
-
-            elif self.active and self.stream_raw is not None and self._last_activity > 0 \
-                    and self._last_activity + self._timeout > time.time():
-                try:
-                    raw = self.read_raw_and_edit(stream=True, stream_id=self._stream_id_base,
-                                                 return_error_image=True)
-                    self.logging.debug("EDIT - reading images from camera: " + self.id + "|" + self.type +
-                                       ":" + str(len(raw)) + " bytes.")
-                    if raw is None or len(raw) == 0:
-                        raise Exception("Error with 'read_raw_and_edit()': empty image.")
-
-                    self._stream = raw.copy()
-                    self._stream_last = raw.copy()
-                    self._stream_image_id += 1
-                    self._stream_last_time = time.time()
-                    del raw
-
-                except Exception as e:
-                    self.raise_error("Error reading EDIT stream for '" + self.id + "/" + self.type + "': " + str(e))
-
-            else:
+            if not self.maintenance_mode and (self._last_activity == 0 or
+                                              self._last_activity + self._timeout < time.time()):
                 self._stream = None
                 self._last_activity = 0
                 self._last_activity_count = 0
                 self._last_activity_per_stream = {}
-                self._stream_image_id += 0
                 self._error_wait = True
+                self.fps = 0
 
             self.stream_count()
-            self.stream_framerate_check()
+            self.stream_stages.clean_up(self._timeout)
             self.thread_control()
+            self.thread_wait(wait_time=self._timeout / 3)
 
         self.logging.info("Stopped CAMERA edited stream for '"+self.id+"/"+self.type+"/"+self.resolution+"'.")
 
@@ -586,10 +1054,12 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
             if self.resolution != "lowres":
                 raw = self.edit_add_system_info(raw)
 
-            if raw is not None:
-                return raw.copy()
-            else:
-                return raw
+            return raw
+
+        if stream or self.stream_raw.active:
+            image_id = self.stream_raw.read_stream_image_id()
+        else:
+            image_id = None
 
         if stream:
             raw = self.stream_raw.read_stream(self._stream_id_base + stream_id, self._error_wait)
@@ -602,73 +1072,53 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
 
         if self.type == "raw":
             if self.resolution == "lowres":
-                raw = self.edit_create_lowres(raw)
+                raw = self.stream_stages.get("raw_lowres", image_id, self.edit_create_lowres, raw)
                 raw = self.edit_check_error(raw, "Error reading 'self.stream_raw.edit_create_lowres(raw)' " +
                                             "in read_raw_and_edit()", return_error_image)
-            if raw is not None:
-                return raw.copy()
-            else:
-                return raw
+            return raw
+
+        normalized = self.stream_stages.get("normalized_hires", image_id, self.edit_normalize, raw)
+        normalized = self.edit_check_error(normalized, "Error reading 'self.stream_raw.edit_normalize" +
+                                           "(raw)' in read_raw_and_edit()", return_error_image)
+        del raw
 
-        elif self.type == "normalized":
-            normalized = self.edit_normalize(raw)
-            normalized = self.edit_check_error(normalized, "Error reading 'self.stream_raw.edit_normalize" +
-                                               "(raw)' in read_raw_and_edit()", return_error_image)
+        if self.type == "normalized":
             if self.resolution == "lowres":
-                normalized = self.edit_create_lowres(normalized)
+                normalized = self.stream_stages.get("normalized_lowres", image_id, self.edit_create_lowres,
+                                                    normalized)
                 normalized = self.edit_check_error(normalized, "Error reading 'self.stream_raw.edit_create_lowres" +
                                                    "(normalized)' in read_raw_and_edit()", return_error_image)
-
-            del raw
-            if normalized is not None:
-                return normalized.copy()
-            else:
-                return normalized
+            return normalized
 
         elif self.type == "camera":
-            normalized = self.edit_normalize(raw)
-            normalized = self.edit_check_error(normalized, "Error reading 'self.stream_raw.edit_normalize" +
-                                               "(raw)' in read_raw_and_edit()", return_error_image)
-            camera = self.edit_crop_area(normalized)
+            camera = self.stream_stages.get("camera_cropped", image_id, self.edit_crop_area, normalized)
             camera = self.edit_check_error(camera, "Error reading 'self.stream_raw.edit_crop_area" +
                                            "(camera)' in read_raw_and_edit()", return_error_image)
             if self.resolution != "lowres":
-                camera = self.edit_add_datetime(camera)
-                camera = self.edit_add_framerate(camera)
+                camera = self.stream_stages.get("camera_hires", image_id, self.edit_add_text, camera)
                 camera = self.edit_check_error(camera, "Error reading 'self.stream_raw.edit_add_*text" +
                                                "(camera)' in read_raw_and_edit()", return_error_image)
             if self.resolution == "lowres":
-                camera = self.edit_create_lowres(camera)
+                camera = self.stream_stages.get("camera_lowres", image_id, self.edit_create_lowres, camera)
                 camera = self.edit_check_error(camera, "Error reading 'self.stream_raw.edit_create_lowres" +
                                                "(camera)' in read_raw_and_edit()", return_error_image)
-            del raw, normalized
-            if camera is not None:
-                return camera.copy()
-            else:
-                return camera
+            del normalized
+            return camera
 
         elif self.type == "setting":
-            normalized = self.edit_normalize(raw)
-            normalized = self.edit_check_error(normalized, "Error reading 'self.stream_raw.edit_normalize" +
-                                               "(raw)' in read_raw_and_edit()", return_error_image)
-            setting = self.edit_add_areas(normalized)
+            setting = self.stream_stages.get("setting_areas", image_id, self.edit_add_areas, normalized)
             setting = self.edit_check_error(setting, "Error reading 'self.stream_raw.edit_add_areas" +
                                             "(setting)' in read_raw_and_edit()", return_error_image)
             if self.resolution != "lowres":
-                setting = self.edit_add_datetime(setting)
-                setting = self.edit_add_framerate(setting)
+                setting = self.stream_stages.get("setting_hires", image_id, self.edit_add_text, setting)
                 setting = self.edit_check_error(setting, "Error reading 'self.stream_raw.edit_add_*text" +
                                                 "(setting)' in read_raw_and_edit()", return_error_image)
             if self.resolution == "lowres":
-                setting = self.edit_create_lowres(setting)
+                setting = self.stream_stages.get("setting_lowres", image_id, self.edit_create_lowres, setting)
                 setting = self.edit_check_error(setting, "Error reading 'self.stream_raw.edit_create_lowres" +
                                                 "(setting)' in read_raw_and_edit()", return_error_image)
-
-            del raw, normalized
-            if setting is not None:
-                return setting.copy()
-            else:
-                return setting
+            del normalized
+            return setting
 
     def read_image(self, return_error_image=True):
         """
@@ -679,11 +1129,14 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         Returns:
             numpy.ndarray: single edited image
         """
-        return self.read_raw_and_edit(stream=False, stream_id="default", return_error_image=return_error_image)
+        raw = self.read_raw_and_edit(stream=False, stream_id="default", return_error_image=return_error_image)
+        if raw is not None:
+            raw = self.image.writeable_raw(raw)
+        return raw
 
     def read_stream(self, stream_id, system_info=False, wait=True):
         """
-        read stream image considering the max fps
+        read stream image considering the max fps, edit a new image only if the raw stream delivered a new one
 
         Args:
             stream_id (int): stream id
@@ -695,29 +1148,95 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         if not wait:
             self._error_wait = False
 
-        self._last_activity = time.time()
-        self._last_activity_count += 1
-        self._last_activity_per_stream[stream_id] = time.time()
+        self.set_activity(stream_id)
 
-        if wait:
-            wait_time = 0
-            while self._stream_image_id == 0 and wait_time <= self._timeout:
-                time.sleep(1)
-                wait_time += 1
-            if self._stream_image_id == 0:
-                self.logging.debug("WAIT .... !!!")
+        duration_max = self.duration_max
+        if self.slow_stream:
+            duration_max = self.duration_slow
+
+        with self._stream_lock:
+            if self.maintenance_mode:
+                if self._stream is None or self._stream_last_time + 1 < time.time():
+                    raw = self.read_maintenance_image()
+                    self._stream = raw
+                    self._stream_last = raw
+                    self._stream_image_id += 1
+                    self._stream_last_time = time.time()
+
+            elif self.active and self.stream_raw is not None \
+                    and (self._stream is None or
+                         (self._stream_raw_image_id != self.stream_raw.read_stream_image_id() and
+                          self._stream_last_time + duration_max <= time.time())):
+                try:
+                    self._stream_raw_image_id = self.stream_raw.read_stream_image_id()
+                    raw = self.read_raw_and_edit(stream=True, stream_id=self._stream_id_base,
+                                                 return_error_image=True)
+                    if raw is None or len(raw) == 0:
+                        raise Exception("Error with 'read_raw_and_edit()': empty image.")
+                    self.logging.debug("EDIT - reading images from camera: " + self.id + "|" + self.type +
+                                       ":" + str(len(raw)) + " bytes.")
+
+                    raw.flags.writeable = False
+                    if self._stream_last_time > 0:
+                        self.fps = 1 / max(time.time() - self._stream_last_time, 0.001)
+                    self._stream = raw
+                    self._stream_last = raw
+                    self._stream_image_id += 1
+                    self._stream_last_time = time.time()
+                    del raw
+
+                except Exception as e:
+                    self.raise_error("Error reading EDIT stream for '" + self.id + "/" + self.type + "': " + str(e))
+
+            stream_img = self._stream
+            self._stream_read.image_id = (self._stream_image_id, self._stream_raw_image_id)
 
         if self._stream_image_id == 0:
             self.raise_error("sEdit: read_stream: got no image from raw stream '" + self.id + "' yet!")
 
-        if self._stream is not None and len(self._stream) > 0:
-            stream_img = self._stream.copy()
+        if stream_img is not None and len(stream_img) > 0:
             if system_info:
                 stream_img = self.edit_add_system_info(stream_img)
             return stream_img
         else:
             return
 
+    def if_passthrough(self, system_info=False):
+        """
+        check if the JPEG images of the camera can be streamed without decoding and encoding, i.e., the stream
+        requires no edits or overlays (raw or normalized hires, camera hires without crop, date and framerate)
+
+        Args:
+            system_info (bool): system info shall be added to the image (if currently active)
+        Returns:
+            bool: passthrough possible
+        """
+        image = self.param["image"]
+        if (system_info and self.system_status["active"]) or self.maintenance_mode or self.resolution == "lowres" \
+                or self.stream_raw is None or not self.stream_raw.if_passthrough():
+            return False
+        if self.type == "raw":
+            return True
+        if "black_white" in image and image["black_white"] is True:
+            return False
+        if self.type == "normalized":
+            return True
+        if self.type == "camera":
+            return (list(image["crop"]) == [0, 0, 1, 1] and not image["date_time"]
+                    and not ("show_framerate" in image and image["show_framerate"]))
+        return False
+
+    def set_activity(self, stream_id):
+        """
+        mark stream as requested, keeps the stream active without reading an image
+
+        Args:
+            stream_id (int|str): stream id
+        """
+        self._last_activity = time.time()
+        self._last_activity_count += 1
+        self._last_activity_per_stream[stream_id] = time.time()
+
     def read_stream_image_id(self):
         """
         return current image number
@@ -727,6 +1246,20 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         """
         return self.stream_raw.read_stream_image_id()
 
+    def read_stream_edit_id(self, last_read=False):
+        """
+        return number of the current edited image and the raw image number it has been created from (the edited
+        image is updated max. every duration_max seconds, so it can be older than the current raw image)
+
+        Args:
+            last_read (bool): return numbers of the image returned by the last read_stream() of the calling thread
+        Returns:
+            (int, int): edited image number, raw image number
+        """
+        if last_read:
+            return getattr(self._stream_read, "image_id", (0, 0))
+        return self._stream_image_id, self._stream_raw_image_id
+
     def read_stream_image_time(self):
         """
         return current image creation time
@@ -1002,9 +1535,9 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
             normalized = self.image.convert_to_gray_raw(raw)
             normalized = self.image.convert_from_gray_raw(normalized)
             del raw
-            return normalized.copy()
-        elif raw is not None:
-            return raw.copy()
+            return normalized
+        else:
+            return raw
 
     def edit_crop_area(self, raw, start_zero=False):
         """
@@ -1027,9 +1560,7 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         self.param["image"]["resolution_cropped"] = [area[2] - area[0], area[3] - area[1]]
         if cropped is not None:
             del raw
-            return cropped.copy()
-        elif raw is not None:
-            return raw.copy()
+            return cropped
         else:
             return raw
 
@@ -1050,10 +1581,7 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         lowres = self.image.resize_raw(raw=raw, scale_percent=100, scale_size=self._size_lowres)
 
         del raw
-        if lowres is not None:
-            return lowres.copy()
-        else:
-            return lowres
+        return lowres
 
     def edit_add_areas(self, raw):
         """
@@ -1074,6 +1602,7 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         self.logging.debug("-----------------" + self.id + "------- show area")
         outer_area = self.param["image"]["crop"]
         inner_area = self.param["similarity"]["detection_area"]
+        raw = self.image.writeable_raw(raw)
         area_image = self.image.draw_area_raw(raw=raw, area=outer_area, color=color_crop, thickness=frame_thickness)
 
         w_start = outer_area[0] + ((outer_area[2] - outer_area[0]) * inner_area[0])
@@ -1085,7 +1614,7 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         area_image = self.image.draw_area_raw(raw=area_image, area=inner_area, color=color_detect,
                                               thickness=frame_thickness)
         del raw, inner_area, outer_area
-        return area_image.copy()
+        return area_image
 
     def edit_check_error(self, image, error_message="", return_error_image=True):
         """
@@ -1124,9 +1653,21 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         if self.type == "setting":
             offset = self.param["image"]["crop_area"]
         if self.param["image"]["date_time"] and self.resolution != "lowres":
-            raw = self.image.draw_date_raw(raw, offset=offset)
+            raw = self.image.draw_date_raw(self.image.writeable_raw(raw), offset=offset, cache_key="datetime")
+
+        return raw
 
-        return raw.copy()
+    def edit_add_text(self, raw):
+        """
+        Add date, time and framerate into the image (hires only, see edit_add_datetime and edit_add_framerate)
+
+        Args:
+            raw (numpy.ndarray): input raw image
+        Returns:
+            numpy.ndarray: raw image with date, time and framerate information
+        """
+        raw = self.edit_add_datetime(raw)
+        return self.edit_add_framerate(raw)
 
     def edit_add_framerate(self, raw):
         """
@@ -1154,10 +1695,10 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
             if self.fps and framerate and self.fps < framerate:
                 framerate = self.fps
             if framerate:
-                raw = self.image.draw_text_raw(raw=raw, text=str(round(framerate, 1)) + "fps",
-                                               font=cv2.QT_FONT_NORMAL,
-                                               position=position, scale=0.4, thickness=1)
-        return raw.copy()
+                raw = self.image.draw_text_raw(raw=self.image.writeable_raw(raw),
+                                               text=str(round(framerate, 1)) + "fps", font=cv2.QT_FONT_NORMAL,
+                                               position=position, scale=0.4, thickness=1, cache_key="framerate")
+        return raw
 
     def edit_add_system_info(self, raw):
         """
@@ -1173,7 +1714,10 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
             self.logging.error("edit_add_system_info: empty image")
             return raw
 
-        image = raw.copy()
+        if not self.system_status["active"]:
+            return raw
+
+        image = self.image.writeable_raw(raw)
 
         if self.system_status["active"] and self.resolution == "hires":
             lowres_position = self.config.param["views"]["index"]["lowres_pos_"+self.id]
@@ -1197,10 +1741,10 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
             cv2.rectangle(image, (x1, y1), (x2, y2), (230, 230, 230), 1)
             image = self.image.draw_text_raw(raw=image, text=self.system_status["line1"],
                                              font=cv2.QT_FONT_NORMAL, color=self.system_status["color"],
-                                             position=pos_line1, scale=1, thickness=2)
+                                             position=pos_line1, scale=1, thickness=2, cache_key="system_line1")
             image = self.image.draw_text_raw(raw=image, text=self.system_status["line2"],
                                              font=cv2.QT_FONT_NORMAL, color=self.system_status["color"],
-                                             position=pos_line2, scale=0.4, thickness=1)
+                                             position=pos_line2, scale=0.4, thickness=1, cache_key="system_line2")
         elif self.system_status["active"] and self.resolution == "lowres":
             [x1, y1, x2, y2] = [10, 10, 36, 36]
             pos_line1 = [15, 31]
@@ -1208,10 +1752,10 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
             cv2.rectangle(image, (x1, y1), (x2, y2), self.system_status["color"], 1)
             image = self.image.draw_text_raw(raw=image, text=self.system_status["line1"],
                                              font=cv2.QT_FONT_NORMAL, color=self.system_status["color"],
-                                             position=pos_line1, scale=0.8, thickness=2)
+                                             position=pos_line1, scale=0.8, thickness=2, cache_key="system_lowres")
 
         del raw
-        return image.copy()
+        return image
 
     def stream_count(self):
         """
@@ -1226,25 +1770,6 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
                 del self._last_activity_per_stream[stream_id]
         self._active_streams = len(self._last_activity_per_stream.keys())
 
-    def stream_framerate_check(self):
-        """
-        calculate framerate and ensure max. framerate
-        """
-        duration = time.time() - self._start_time
-        duration_max = self.duration_max
-
-        if self.slow_stream:
-            duration_max = self.duration_slow
-
-        if duration < duration_max:
-            time.sleep(duration_max - duration)
-
-        duration = time.time() - self._start_time
-        if self.active:
-            self.fps = 1 / duration
-        else:
-            self.fps = 0
-
     def get_active_streams(self, stream_id=""):
         """
         return amount of active streams
@@ -1346,6 +1871,282 @@ class BirdhouseCameraStreamEdit(threading.Thread, BirdhouseCameraClass):
         return self._connected
 
 
+class BirdhouseCameraStreamBroadcast(BirdhouseCameraClass):
+    """
+    Encode each new frame of an edited stream only once and share the JPEG bytes with all connected clients.
+    """
+
+    def __init__(self, camera_id, config, camera, stream_type, stream_resolution):
+        """
+        Constructor to initialize broadcaster.
+
+        Args:
+            camera_id (str): camera ID
+            config (modules.config.BirdhouseConfig): reference to main config handler
+            camera (BirdhouseCamera): reference to camera handler providing the edited streams
+            stream_type (str): options: "camera", "setting", "normalized", "raw"
+            stream_resolution (str): options: "lowres", "hires"
+        """
+        BirdhouseCameraClass.__init__(self, class_id=camera_id+"-sCast", class_log="cam-stream",
+                                      camera_id=camera_id, config=config)
+        self.camera = camera
+        self.type = stream_type
+        self.resolution = stream_resolution
+        self.stream = stream_type + "_" + stream_resolution
+
+        self._lock = threading.Lock()
+        self._frame = None
+        self._frame_id = None
+        self._frame_time = 0
+        self._encode_count = 0
+        self._request_count = 0
+        self._passthrough_count = 0
+
+    def read_frame(self, stream_id, system_info=False, wait=True):
+        """
+        return encoded frame for the current image id, encode only if not done by another client before
+
+        Args:
+            stream_id (str): unique stream ID of the requesting client
+            system_info (bool): add system info to the image
+            wait (bool): wait a while for first image (defined in timeout)
+        Returns:
+            (int, bytearray): image id and encoded frame (None if no image available)
+        """
+        self._request_count += 1
+        frame_id = self.camera.get_stream_image_id()
+        edit_stream = self.camera.camera_streams[self.stream]
+        error = self.camera.if_error() or self.camera.camera_stream_raw.if_error() or edit_stream.if_error()
+
+        if not error and edit_stream.if_passthrough(system_info):
+            image_id, frame = self.camera.camera_stream_raw.read_stream_encoded(stream_id=self.stream + "_pass")
+            if frame is not None:
+                edit_stream.set_activity(stream_id)
+                self._passthrough_count += 1
+                return image_id, frame
+
+        with self._lock:
+            # cached frame is keyed by the edited image, valid as long as it has been created from the current raw
+            # image (else the edit stream might create a new one)
+            edit_id = edit_stream.read_stream_edit_id()
+            if (not error and self._frame is not None and self._frame_id == edit_id and edit_id[1] == frame_id
+                    and frame_id != 0 and not edit_stream.maintenance_mode):
+                edit_stream.set_activity(stream_id)
+                return frame_id, self._frame
+
+            start_time = time.time()
+            frame_raw = self.camera.get_stream(stream_id=stream_id, stream_type=self.type,
+                                               stream_resolution=self.resolution, system_info=system_info,
+                                               wait=wait)
+            if frame_raw is None or len(frame_raw) == 0:
+                return frame_id, None
+
+            # no new edited image (limited by duration_max), the cached frame is still up-to-date
+            edit_id = edit_stream.read_stream_edit_id(last_read=True)
+            if not error and self._frame is not None and self._frame_id == edit_id:
+                return frame_id, self._frame
+
+            frame = self.camera.image.convert_from_raw(frame_raw, profile=encode_profile_live(self.resolution))
+            self._encode_count += 1
+            self.config.set_processing_performance("camera_stream_encode", self.id + "_" + self.stream, start_time)
+
+            if error:
+                self._frame = None
+                self._frame_id = None
+            else:
+                self._frame = frame
+                self._frame_id = edit_id
+                self._frame_time = time.time()
+
+            del frame_raw
+            return frame_id, frame
+
+    def get_statistics(self):
+        """
+        return amount of encoded frames compared to delivered frames
+
+        Returns:
+            dict: encode, passthrough and request counter
+        """
+        return {"encoded": self._encode_count, "passthrough": self._passthrough_count,
+                "requested": self._request_count}
+
+    def reset(self):
+        """
+        reset cached frame, e.g. after a reconnect of the camera
+        """
+        with self._lock:
+            self._frame = None
+            self._frame_id = None
+
+
+class BirdhouseCameraStreamPiP(BirdhouseCameraClass):
+    """
+    Picture-in-picture composition of two cameras, created once per frame pair and shared (encoded) by all clients.
+    The inset of the second camera is scaled only when the second camera delivers a new frame.
+    """
+
+    def __init__(self, camera_id, config, camera, camera2, position, stream_type, stream_resolution):
+        """
+        Constructor to initialize PiP stage.
+
+        Args:
+            camera_id (str): camera ID of the main camera
+            config (modules.config.BirdhouseConfig): reference to main config handler
+            camera (BirdhouseCamera): reference to camera handler of the main image
+            camera2 (BirdhouseCamera): reference to camera handler of the inset
+            position (int): position of the inset (1: top left, 2: top right, 3: bottom left, 4: bottom right)
+            stream_type (str): options: "camera", "setting"
+            stream_resolution (str): options: "lowres", "hires"
+        """
+        BirdhouseCameraClass.__init__(self, class_id=camera_id+"-sPiP", class_log="cam-stream",
+                                      camera_id=camera_id, config=config)
+        self.camera = camera
+        self.camera2 = camera2
+        self.position = int(position)
+        self.type = stream_type
+        self.resolution = stream_resolution
+        self.stream = stream_type + "_" + stream_resolution
+
+        self._lock = threading.Lock()
+        self._frame = None
+        self._frame_ids = None
+        self._inset = None
+        self._inset_id = None
+        self._inset_size = None
+        self._inset_stream = stream_type + "_hires"
+        self._distance = 30
+        self._compose_count = 0
+        self._resize_count = 0
+        self._request_count = 0
+
+    def _read_inset_id(self, last_read=False):
+        """
+        return id of the edited image of the second camera, see BirdhouseCameraStreamEdit.read_stream_edit_id()
+
+        Args:
+            last_read (bool): return id of the image returned by the last read of the calling thread
+        Returns:
+            (int, int): edited image number, raw image number
+        """
+        if self._inset_stream not in self.camera2.camera_streams:
+            return 0, 0
+        return self.camera2.camera_streams[self._inset_stream].read_stream_edit_id(last_read=last_read)
+
+    def _update_inset(self, stream_id, main_shape):
+        """
+        scale current image of the second camera to 1/9 of the main image area, only if there is a new edited frame
+
+        Args:
+            stream_id (str): unique stream ID of the requesting client
+            main_shape (tuple): shape of the main image
+        """
+        inset_id = self._read_inset_id()
+        if (self._inset is not None and self._inset_id == inset_id and self._inset_size == main_shape
+                and inset_id[1] == self.camera2.get_stream_image_id()):
+            return
+
+        frame_raw_pip = self.camera2.get_stream(stream_id=stream_id, stream_type=self.type,
+                                                stream_resolution="hires", system_info=False, wait=False)
+        if frame_raw_pip is None or len(frame_raw_pip) == 0:
+            return
+
+        inset_id = self._read_inset_id(last_read=True)
+        if self._inset is not None and self._inset_id == inset_id and self._inset_size == main_shape:
+            return
+
+        total_pixels_cam1 = main_shape[0] * main_shape[1]
+        total_pixels_cam2 = frame_raw_pip.shape[0] * frame_raw_pip.shape[1]
+        desired_total_pixels_cam2 = total_pixels_cam1 / 9
+        scale_factor = math.sqrt(desired_total_pixels_cam2 / total_pixels_cam2) * 100
+        if main_shape[1] > 1000:
+            self._distance = 50
+        else:
+            self._distance = 30
+        self.logging.debug(" PiP ... size %: " + str(scale_factor) + " / distance: " + str(self._distance))
+
+        self._inset = self.camera2.image.resize_raw(frame_raw_pip, scale_factor)
+        self._inset_id = inset_id
+        self._inset_size = main_shape
+        self._resize_count += 1
+
+    def read_frame(self, stream_id, system_info=False, wait=True):
+        """
+        return encoded PiP frame for the current frame pair, compose and encode only if not done before
+
+        Args:
+            stream_id (str): unique stream ID of the requesting client
+            system_info (bool): add system info to the image
+            wait (bool): wait a while for first image (defined in timeout)
+        Returns:
+            (int, bytes): image id of the main camera and encoded frame (None if no image available)
+        """
+        self._request_count += 1
+        frame_id = self.camera.get_stream_image_id()
+        edit_stream = self.camera.camera_streams[self.stream]
+        error = self.camera.if_error() or self.camera.camera_stream_raw.if_error() or edit_stream.if_error()
+        inset_error = self.camera2.if_error()
+
+        with self._lock:
+            # cached frame is keyed by the edited images of both cameras, valid as long as both have been created
+            # from the current raw images (else the edit streams might create new ones)
+            frame_ids = (edit_stream.read_stream_edit_id(), self._read_inset_id())
+            if (not error and not inset_error and self._frame is not None and self._frame_ids == frame_ids
+                    and frame_id != 0 and frame_ids[0][1] == frame_id
+                    and frame_ids[1][1] == self.camera2.get_stream_image_id() and not edit_stream.maintenance_mode):
+                edit_stream.set_activity(stream_id)
+                return frame_id, self._frame
+
+            start_time = time.time()
+            frame_raw = self.camera.get_stream(stream_id=stream_id, stream_type=self.type,
+                                               stream_resolution=self.resolution, system_info=system_info,
+                                               wait=wait)
+            if frame_raw is None or len(frame_raw) == 0:
+                return frame_id, None
+            main_id = edit_stream.read_stream_edit_id(last_read=True)
+
+            if not error and not inset_error:
+                self._update_inset(stream_id, frame_raw.shape)
+
+            # no new edited image of both cameras (limited by duration_max), the cached frame is still up-to-date
+            if inset_error:
+                frame_ids = (main_id, None)
+            else:
+                frame_ids = (main_id, self._inset_id)
+            if not error and self._frame is not None and self._frame_ids == frame_ids:
+                return frame_id, self._frame
+
+            if not error and not inset_error:
+                if self._inset is not None:
+                    frame_raw = self.camera.image.writeable_raw(frame_raw)
+                    frame_raw = self.camera.image.image_in_image_raw(raw=frame_raw, raw2=self._inset,
+                                                                     position=self.position,
+                                                                     distance=self._distance)
+
+            frame = self.camera.image.convert_from_raw(frame_raw, profile=encode_profile_live(self.resolution))
+            self._compose_count += 1
+            self.config.set_processing_performance("camera_stream_pip", self.id + "_" + self.stream, start_time)
+
+            if error:
+                self._frame = None
+                self._frame_ids = None
+            else:
+                self._frame = frame
+                self._frame_ids = frame_ids
+
+            del frame_raw
+            return frame_id, frame
+
+    def get_statistics(self):
+        """
+        return amount of compositions and inset resizes compared to delivered frames
+
+        Returns:
+            dict: compose, resize and request counter
+        """
+        return {"composed": self._compose_count, "resized": self._resize_count, "requested": self._request_count}
+
+
 class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
     """
     Camera handler to control camera, record images, coordinate sensor and microphone and save data to database.
@@ -1383,6 +2184,9 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
         self.video = None
         self.camera = None
         self.object = None
+        self.motion = None
+        self.exposure = None
+        self.writer = None
         self.brightness = 100
 
         self.cam_param = None
@@ -1450,12 +2254,16 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
         self.previous_stamp = "000000"
 
         self.record = self.param["record"]
-        self.record_seconds = []
+        self.record_schedule = BirdhouseRecordSchedule()
         self.record_image_last = time.time()
         self.record_image_last_string = ""
         self.record_image_last_compare = ""
         self.record_image_start = ""
         self.record_image_end = ""
+        self.record_burst_active = False
+        self.record_burst_count = 0
+        self.record_burst_ring = []
+        self.record_burst_stamp = ""
         self.record_image_error = False
         self.record_image_error_msg = []
         self.record_temp_threshold = None
@@ -1467,7 +2275,14 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
         self.record_video_last = 0
 
         self.camera_stream_raw = None
+        self.camera_stream_stages = None
         self.camera_streams = {}
+        self.camera_broadcasts = {}
+        self.camera_broadcasts_lock = threading.Lock()
+        self.camera_pip = {}
+        self.camera_snapshot = {"id": None, "time": 0, "image": None}
+        self.camera_snapshot_compare = {}
+        self.camera_snapshot_lock = threading.Lock()
         self.camera_streams_max = 0
         self.camera_statistics_time = 0
         self.available_devices = {}
@@ -1556,29 +2371,40 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
             if count > 0:
                 time.sleep(1)
 
+        self.camera_stream_stages = BirdhouseCameraStreamStages(camera_id=self.id, config=self.config)
         self.camera_streams = {
             "raw": BirdhouseCameraStreamEdit(camera_id=self.id, config=self.config,
                                              stream_raw=self.camera_stream_raw,
-                                             stream_type="raw", stream_resolution="hires"),
+                                             stream_type="raw", stream_resolution="hires",
+                                             stream_stages=self.camera_stream_stages),
             "normalized_hires": BirdhouseCameraStreamEdit(camera_id=self.id, config=self.config,
                                                           stream_raw=self.camera_stream_raw,
-                                                          stream_type="normalized", stream_resolution="hires"),
+                                                          stream_type="normalized", stream_resolution="hires",
+                                                          stream_stages=self.camera_stream_stages),
             "normalized_lowres": BirdhouseCameraStreamEdit(camera_id=self.id, config=self.config,
                                                            stream_raw=self.camera_stream_raw,
-                                                           stream_type="normalized", stream_resolution="lowres"),
+                                                           stream_type="normalized", stream_resolution="lowres",
+                                                           stream_stages=self.camera_stream_stages),
             "camera_hires": BirdhouseCameraStreamEdit(camera_id=self.id, config=self.config,
                                                       stream_raw=self.camera_stream_raw,
-                                                      stream_type="camera", stream_resolution="hires"),
+                                                      stream_type="camera", stream_resolution="hires",
+                                                      stream_stages=self.camera_stream_stages),
             "camera_lowres": BirdhouseCameraStreamEdit(camera_id=self.id, config=self.config,
                                                        stream_raw=self.camera_stream_raw,
-                                                       stream_type="camera", stream_resolution="lowres"),
+                                                       stream_type="camera", stream_resolution="lowres",
+                                                       stream_stages=self.camera_stream_stages),
             "setting_hires": BirdhouseCameraStreamEdit(camera_id=self.id, config=self.config,
                                                        stream_raw=self.camera_stream_raw,
-                                                       stream_type="setting", stream_resolution="hires"),
+                                                       stream_type="setting", stream_resolution="hires",
+                                                       stream_stages=self.camera_stream_stages),
             "setting_lowres": BirdhouseCameraStreamEdit(camera_id=self.id, config=self.config,
                                                         stream_raw=self.camera_stream_raw,
-                                                        stream_type="setting", stream_resolution="lowres")
+                                                        stream_type="setting", stream_resolution="lowres",
+                                                        stream_stages=self.camera_stream_stages)
         }
+        with self.camera_broadcasts_lock:
+            self.camera_broadcasts = {}
+        self.camera_pip = {}
         for stream in self.camera_streams:
             self.camera_streams[stream].start()
             self.camera_streams[stream].reload_success = self.reload_success
@@ -1779,6 +2605,10 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
             while self.config.camera_capture_active:
                 time.sleep(0.1)
 
+            still_image = self.camera_stream_raw.get_still()
+            if still_image is not None:
+                self.image_recording_max_save(still_image[0], still_image[1])
+
             if not self.video.recording:
                 if self.config.update["camera_" + self.id]:
                     self.logging.info("Camera '" + self.id + "' updated (1): " + str(self.config.update["camera_" + self.id]))
@@ -1825,9 +2655,13 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
                     # Image recording (only while not recording video)
                     elif self.record:
                         start_time_record = time.time()
-                        self.image_recording(current_time, stamp, sensor_last)
+                        if birdhouse_burst["active"] and self.motion and self.motion.active:
+                            self.image_recording_burst(current_time, stamp, sensor_last)
+                        else:
+                            self.image_recording(current_time, stamp, sensor_last)
                         self.config.set_processing_performance("camera_recording_image", self.id, start_time_record)
-                        self.image_recording_auto_light()
+                        if not self.exposure or not self.exposure.active:
+                            self.image_recording_auto_light()
 
                     # Check and record active streams
                     self.measure_usage()
@@ -1897,6 +2731,12 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
         """
         if self.video:
             self.video.stop()
+        if self.motion:
+            self.motion.stop()
+        if self.exposure:
+            self.exposure.stop()
+        if self.writer:
+            self.writer.stop()
 
         self.camera_stream_raw.stop()
         for stream in self.camera_streams:
@@ -1932,6 +2772,12 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
 
         self.object = BirdhouseObjectDetection(self.id, self.config)
         self.object.start()
+        self.motion = BirdhouseMotionDetection(self.id, self.config, self)
+        self.motion.start()
+        self.exposure = BirdhouseExposureControl(self.id, self.config, self)
+        self.exposure.start()
+        self.writer = BirdhouseImageWriter(self.id, self.config, self.image.encoder)
+        self.writer.start()
         self.initialized = True
         self.relay_warning = True
 
@@ -1953,6 +2799,10 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
                 if self.camera is None:
                     self._init_microphone()
                 self.object.reconnect()
+                if self.motion:
+                    self.motion.reset()
+                if self.exposure:
+                    self.exposure.reset()
             self.reload_camera = False
 
         else:
@@ -1985,14 +2835,16 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
 
         else:
             image_id = self.camera_streams["camera_hires"].read_stream_image_id()
+
+            if self.image_last_id != 0 and self.image_last_id == image_id and self.record_video_wait:
+                image_id = self.camera_stream_raw.wait_for_frame(self.image_last_id, self.record_video_min_wait)
+                if image_id == self.image_last_id:
+                    return
+
             image_time = self.camera_streams["camera_hires"].read_stream_image_time()
             image_delay = time.time() - image_time
-
-            if self.image_last_id == 0 or self.image_last_id != image_id or not self.record_video_wait:
-                image = self.camera_streams["camera_hires"].read_stream("record")
-                self.image_last_id = image_id
-            else:
-                return
+            image = self.camera_streams["camera_hires"].read_stream("record")
+            self.image_last_id = image_id
 
             #self.video.image_size = self.image_size
             self.video.save_video_image(image=image, delay=image_delay)
@@ -2026,46 +2878,35 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
 
     def image_recording_max(self):
         """
-        record image in the max resolution
+        request an image in the max resolution: captured by the raw stream thread between two frames and saved by
+        image_recording_max_save() in the next iteration of the camera thread, the live streams continue meanwhile
         """
         if self.error:
             return
 
+        self.logging.info("Recording an image with maximum resolution: max=" + str(self.max_resolution) + " ...")
+        self.camera_stream_raw.request_still(self.max_resolution[0], self.max_resolution[1])
+
+    def image_recording_max_save(self, image_max_res, capture_time):
+        """
+        save image in the max resolution captured by the raw stream thread
+
+        Args:
+            image_max_res (numpy.ndarray): image in max resolution, None if capturing failed
+            capture_time (float): capture time
+        """
         current_time = self.config.local_time()
         stamp = current_time.strftime("%H%M%S")
-        try:
-            self.config.camera_capture_active = True
-            time.sleep(0.5)
-            current_resolution = self.camera.get_resolution()
-            self.logging.info("Recording an image with maximum resolution: max=" + str(self.max_resolution) + "; current=" +str(current_resolution))
-            self.camera.stream.set(cv2.CAP_PROP_FRAME_WIDTH, self.max_resolution[0])
-            self.camera.stream.set(cv2.CAP_PROP_FRAME_HEIGHT, self.max_resolution[1])
-            time.sleep(1)
-            image_max_res = self.camera.read()
-            time.sleep(0.5)
-            image_max_res = self.camera.read()
-            if image_max_res is not None and self.param["image"]["rotation"] != 0:
-                image_max_res = self.image.rotate_raw(image_max_res, self.param["image"]["rotation"])
-            self.camera.stream.set(cv2.CAP_PROP_FRAME_WIDTH, current_resolution[0])
-            self.camera.stream.set(cv2.CAP_PROP_FRAME_HEIGHT, current_resolution[1])
-            time.sleep(0.5)
-            self.config.camera_capture_active = False
-        except Exception as e:
-            self.logging.info("Could not grab a max resolution image: " + str(e))
-            image_max_res = None
-            self.config.camera_capture_active = False
-            return
-
-        self.logging.debug(" ...... check if recording")
         start_time = time.time()
         image_hires = image_max_res
 
         # if no error format and analyze image
-        if image_hires is not None and not self.image.error and image_hires is not None and len(image_hires) > 0:
+        if image_hires is not None and not self.image.error and len(image_hires) > 0:
 
-            image_lowres = self.image.resize_raw(raw=image_hires, scale_percent=self.param["image"]["preview_scale"])
-            self.brightness = self.image.get_brightness_raw(image_hires)
-            height, width, color = image_hires.shape
+            frame = BirdhouseFrameBundle(self.image, image_hires, preview_scale=self.param["image"]["preview_scale"],
+                                         compare_lowres=self.image_compare_lowres)
+            self.brightness = frame.get_brightness()
+            height, width, color = frame.get_shape()
             preview_scale = self.param["image"]["preview_scale"]
 
             similarity = "100"
@@ -2082,34 +2923,40 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
         else:
             self.record_image_error = True
             if image_hires is None:
-                self.record_image_error_msg = ["img_error='empty image from camera, but no camera error' (None)"]
+                self.record_image_error_msg = ["img_error='could not capture image in max resolution' (None)"]
             else:
                 self.record_image_error_msg = ["img_error=" + str(self.image.error) +
                                                "; img_len=" + str(len(image_hires))]
             return
 
-        self.config.queue.entry_add(config="images", date="", key=stamp, entry=image_info)
+        image_info["info"]["duration_1"] = round(time.time() - start_time, 3)
+        image_info["info"]["capture_delay"] = round(time.time() - capture_time, 3)
 
         # if no error save image files
-        if not self.error and not self.image.error and image_hires is not None:
+        if not self.error and not self.image.error:
             path_lowres = os.path.join(self.config.db_handler.directory("images"),
                                        self.img_support.filename("lowres", stamp, self.id))
             path_hires = os.path.join(self.config.db_handler.directory("images"),
                                       self.img_support.filename("hires", stamp, self.id))
             self.logging.debug("WRITE: " + str(path_lowres))
-            self.image.write(filename=path_hires, image=image_hires)
-            self.image.write(filename=path_lowres, image=image_lowres)
 
-            self.record_image_error = False
-            self.record_image_error_msg = []
-            self.record_image_last = time.time()
-            self.record_image_last_string = self.config.local_time().strftime('%d.%m.%Y %H:%M:%S')
+            # add entry only if both files are queued, the frame bundle is bound to the jobs
+            files = [(path_hires, functools.partial(frame.get_encoded, "hires", "archive")),
+                     (path_lowres, functools.partial(frame.get_encoded, "lowres", "archive"))]
+            if self.writer.add_group(files=files):
+                self.config.queue.entry_add(config="images", date="", key=stamp, entry=image_info)
+                self.record_image_error = False
+                self.record_image_error_msg = []
+                self.record_image_last = time.time()
+                self.record_image_last_string = self.config.local_time().strftime('%d.%m.%Y %H:%M:%S')
+            else:
+                self.record_image_error = True
+                self.record_image_error_msg = ["img_error='write queue full, max resolution image dropped'"]
 
-        del image_hires, image_lowres
-        time.sleep(self._interval)
+        del image_hires, frame
         self.previous_stamp = stamp
 
-    def image_recording(self, current_time="", stamp="", sensor_last=""):
+    def image_recording(self, current_time="", stamp="", sensor_last="", image_hires=None, force=False):
         """
         record images as defined in settings
 
@@ -2117,16 +2964,25 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
             current_time (datetime): current time in datetime format
             stamp (str): time stamp of measurement
             sensor_last (str): last time stamp of sensor measurement
+            image_hires (numpy.ndarray): image to be recorded, if None read current image from stream
+            force (bool): record without checking the recording times (used by burst recording)
         """
-        if self.error:
+        if self.error or (stamp == self.previous_stamp and not force):
             return
 
         self.logging.debug(" ...... check if recording")
         start_time = time.time()
-        if self.image_recording_active(current_time=current_time):
+        if force or self.image_recording_active(current_time=current_time):
+
+            if self.writer.if_backpressure():
+                self.record_image_error = True
+                self.record_image_error_msg = ["img_error='write queue full, storage too slow'"]
+                self.previous_stamp = stamp
+                return
 
             self.logging.debug(" ...... record now!")
-            image_hires = self.camera_streams["camera_hires"].read_image()
+            if image_hires is None:
+                image_hires = self.camera_streams["camera_hires"].read_image()
 
             # retry once if image could not be read
             if image_hires is None or self.image.error or len(image_hires) == 0:
@@ -2136,13 +2992,11 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
             # if no error format and analyze image
             if image_hires is not None and not self.image.error and image_hires is not None and len(image_hires) > 0:
 
-                image_lowres = self.image.resize_raw(raw=image_hires, scale_percent=self.param["image"]["preview_scale"])
-                if self.image_compare_lowres:
-                    image_compare = self.image.convert_to_gray_raw(image_lowres)
-                else:
-                    image_compare = self.image.convert_to_gray_raw(image_hires)
-                self.brightness = self.image.get_brightness_raw(image_hires)
-                height, width, color = image_hires.shape
+                frame = BirdhouseFrameBundle(self.image, image_hires, preview_scale=self.param["image"]["preview_scale"],
+                                             compare_lowres=self.image_compare_lowres)
+                image_compare = frame.get_gray()
+                self.brightness = frame.get_brightness()
+                height, width, color = frame.get_shape()
                 preview_scale = self.param["image"]["preview_scale"]
 
                 if self.previous_image is not None:
@@ -2194,7 +3048,6 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
 
             sensor_stamp = current_time.strftime("%H%M") + "00"
             image_info["info"]["duration_1"] = round(time.time() - start_time, 3)
-            self.config.queue.entry_add(config="images", date="", key=stamp, entry=image_info)
 
             if int(self.config.local_time().strftime("%M")) % 5 == 0 and sensor_stamp != sensor_last and sensor_last != "":
                 self.logging.debug("Write sensor data to file ...")
@@ -2207,168 +3060,149 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
                 path_hires = os.path.join(self.config.db_handler.directory("images"),
                                           self.img_support.filename("hires", stamp, self.id))
                 self.logging.debug("WRITE: " + str(path_lowres))
-                self.image.write(filename=path_hires, image=image_hires)
-                self.image.write(filename=path_lowres, image=image_lowres)
-
-                # add to object detection queue, if active
-                if (self.detect_active and self.detect_settings["active"]
-                        and image_hires is not None and os.path.exists(path_hires)):
-                    self.logging.debug("Add image to object detection queue ("+str(self.detect_settings)+" | similarity="+str(similarity)+") ...")
-                    if not "similarity" in self.detect_settings or self.detect_settings["similarity"] is False:
-                        self.object.add2queue_analyze_image(stamp, path_hires, image_hires, image_info)
-                    elif float(similarity) <= float(self.param["similarity"]["threshold"]):
-                        self.object.add2queue_analyze_image(stamp, path_hires, image_hires, image_info)
 
-                self.record_image_error = False
-                self.record_image_error_msg = []
-                self.record_image_last = time.time()
-                self.record_image_last_string = self.config.local_time().strftime('%d.%m.%Y %H:%M:%S')
+                # add to object detection queue once the file exists, if active
+                detect_callback = None
+                if self.detect_active and self.detect_settings["active"]:
+                    if ("similarity" not in self.detect_settings or self.detect_settings["similarity"] is False
+                            or float(similarity) <= float(self.param["similarity"]["threshold"])):
+                        self.logging.debug("Add image to object detection queue (" + str(self.detect_settings) +
+                                           " | similarity=" + str(similarity) + ") ...")
+                        detect_callback = functools.partial(self.object.add2queue_analyze_image, stamp,
+                                                            image_hires=frame, image_info=image_info)
+
+                # add entry only if both files are queued, else report the dropped image; the frame bundle is
+                # bound to the jobs, they are encoded after this method returned
+                files = [(path_hires, functools.partial(frame.get_encoded, "hires", "archive")),
+                         (path_lowres, functools.partial(frame.get_encoded, "lowres", "archive"))]
+                if self.writer.add_group(files=files, callback=detect_callback):
+                    self.config.queue.entry_add(config="images", date="", key=stamp, entry=image_info)
+                    self.record_image_error = False
+                    self.record_image_error_msg = []
+                    self.record_image_last = time.time()
+                    self.record_image_last_string = self.config.local_time().strftime('%d.%m.%Y %H:%M:%S')
+                else:
+                    self.record_image_error = True
+                    self.record_image_error_msg = ["img_error='write queue full, image dropped'"]
 
-            del image_hires, image_lowres, image_compare
-            time.sleep(self._interval)
+            del image_hires, image_compare, frame
             self.previous_stamp = stamp
 
+    def image_recording_burst(self, current_time, stamp, sensor_last=""):
+        """
+        record images triggered by motion: keep the last images in a pre-trigger ring, record them and a burst of
+        images while motion is detected, in quiet periods record with a sparse rhythm (see birdhouse_burst)
+
+        Args:
+            current_time (datetime): current time in datetime format
+            stamp (str): time stamp of measurement
+            sensor_last (str): last time stamp of sensor measurement
+        """
+        settings = birdhouse_burst
+        if self.error or stamp == self.record_burst_stamp:
+            return
+        self.record_burst_stamp = stamp
+
+        if not self.image_recording_active(current_time=current_time, check_in_general=True):
+            self.record_burst_ring = []
+            self.record_burst_active = False
+            return
+
+        if self.motion.if_motion(within=settings["post_trigger"]):
+            if not self.record_burst_active:
+                self.record_burst_active = True
+                self.record_burst_count += 1
+                self.logging.info("Motion detected, start burst recording for '" + self.id + "' (" +
+                                  str(len(self.record_burst_ring)) + " pre-trigger images) ...")
+                for ring_time, ring_stamp, ring_image in self.record_burst_ring:
+                    self.image_recording(ring_time, ring_stamp, sensor_last, image_hires=ring_image, force=True)
+                self.record_burst_ring = []
+
+            if time.time() - self.record_image_last >= settings["interval"]:
+                self.image_recording(current_time, stamp, sensor_last, force=True)
+            return
+
+        if self.record_burst_active:
+            self.record_burst_active = False
+            self.logging.info("No motion anymore, stop burst recording for '" + self.id + "'.")
+
+        if time.time() - self.record_image_last >= settings["sparse_rhythm"]:
+            self.image_recording(current_time, stamp, sensor_last, force=True)
+
+        elif settings["pre_trigger"] > 0:
+            image_hires = self.camera_streams["camera_hires"].read_image(return_error_image=False)
+            if image_hires is not None and len(image_hires) > 0:
+                self.record_burst_ring.append((current_time, stamp, image_hires))
+                if len(self.record_burst_ring) > settings["pre_trigger"]:
+                    self.record_burst_ring.pop(0)
+
+    def image_recording_schedule(self, current_time):
+        """
+        compile recording schedule if the date, the settings or sunrise and sunset have changed
+
+        Args:
+            current_time (datetime): current time
+        """
+        if self.config.weather:
+            self.weather_sunrise = self.config.weather.get_sunrise()
+            self.weather_sunset = self.config.weather.get_sunset()
+        elif "last_sunrise" in self.param["weather"]:
+            self.weather_sunrise = self.param["weather"]["last_sunrise"]
+            self.weather_sunset = self.param["weather"]["last_sunset"]
+        else:
+            self.weather_sunrise = "00:00"
+            self.weather_sunset = "23:59"
+
+        if self.record_schedule.update(image_save=self.param["image_save"], date=current_time.date(),
+                                       sunrise=self.weather_sunrise, sunset=self.weather_sunset,
+                                       weather_active=self.weather_active):
+            self.logging.info("Compiled recording schedule for '" + self.id + "': " +
+                              str(len(self.record_schedule.times)) + " images (" + self.record_schedule.mode +
+                              ", window=" + str(self.record_schedule.window) + ", sunrise=" +
+                              str(self.weather_sunrise) + ", sunset=" + str(self.weather_sunset) + ")")
+
     def image_recording_active(self, current_time=-1, check_in_general=False):
         """
-        check if image recording is currently active depending on settings (start and end time incl. sunset or sunrise)
+        check if image recording is currently active depending on settings (start and end time incl. sunset or sunrise),
+        uses the schedule compiled by image_recording_schedule()
 
         Args:
             current_time (datetime|int): current time, if not set get time fresh from the system
-            check_in_general (bool): create recording time information for API
+            check_in_general (bool): check recording window independent of rhythm and create information for API
+        Returns:
+            bool: recording active
         """
         is_active = False
-        if check_in_general:
-            self.record_image_last_compare = ""
-
         if current_time == -1:
             current_time = self.config.local_time()
-        second = current_time.strftime('%S')
-        minute = current_time.strftime('%M')
-        hour = current_time.strftime('%H')
-        current_time_string = current_time.strftime("%Y-%m-%d_%H:%M:%S")
-
-        self.logging.debug("Check if record ... " + str(hour) + "/" + str(minute) + "/" + str(second) + " ...")
-
-        record_from_hour = -1
-        record_from_minute = -1
-        record_to_hour = -1
-        record_to_minute = -1
-        record_to_hour_compare = -1
-        record_to_minute_compare = -1
+        seconds_of_day = current_time.hour * 3600 + current_time.minute * 60 + current_time.second
 
         if self.record and not self.error:
-            # old detection
-            if "record_from" not in self.param["image_save"] or "record_to" not in self.param["image_save"]:
-                if (second in self.param["image_save"]["seconds"]) and (hour in self.param["image_save"]["hours"]):
-                    self.logging.info(
-                        " -> RECORD TRUE "+self.id+" (" + str(record_from_hour) + ":" + str(record_from_minute) + "-" +
-                        str(record_to_hour) + ":" + str(record_to_minute) + ") " +
-                        str(hour) + "/" + str(minute) + "/" + str(second))
-                    if check_in_general:
-                        self.record_image_last_compare = "OLD|"
-                    is_active = True
-
-            # new detection
-            elif "record_from" in self.param["image_save"] and "record_to" in self.param["image_save"]:
-
-                if self.config.weather:
-                    self.weather_sunrise = self.config.weather.get_sunrise()
-                    self.weather_sunset = self.config.weather.get_sunset()
-                elif "last_sunrise" in self.param["weather"]:
-                    self.weather_sunrise = self.param["weather"]["last_sunrise"]
-                    self.weather_sunset = self.param["weather"]["last_sunset"]
-                else:
-                    self.weather_sunrise = "00:00"
-                    self.weather_sunset = "23:59"
-
-                record_from = self.param["image_save"]["record_from"]
-                record_to = self.param["image_save"]["record_to"]
-                record_rhythm = self.param["image_save"]["rhythm"]
-                record_rhythm_offset = self.param["image_save"]["rhythm_offset"]
-
-                self.logging.debug(" -> RECORD TIMES: from=" + record_from + "; to=" + record_to +
-                                   "; sunrise=" + str(self.weather_sunrise) + "; sunset=" + str(self.weather_sunset) +
-                                   "; weather_active=" + str(self.weather_active))
-
-                start = int(record_rhythm_offset)
-                while start < 60:
-                    if start not in self.record_seconds:
-                        self.record_seconds.append(start)  # !!! gets longer and longer! reset?
-                    start += int(record_rhythm)
-
-                if "sun" in record_from and self.weather_active and self.weather_sunrise is not None:
-                    if "sunrise-1" in record_from:
-                        record_from_hour = int(self.weather_sunrise.split(":")[0]) - 1
-                        record_from_minute = int(self.weather_sunrise.split(":")[1])
-                    elif record_from == "sunrise-0" or "sunrise+0" or "sunrise":
-                        record_from_hour = int(self.weather_sunrise.split(":")[0])
-                        record_from_minute = int(self.weather_sunrise.split(":")[1])
-                    elif "sunrise+1" in record_from:
-                        record_from_hour = int(self.weather_sunrise.split(":")[0]) + 1
-                        record_from_minute = int(self.weather_sunrise.split(":")[1])
-                elif "sun" in record_from:
-                    record_from_hour = 8
-                    record_from_minute = 0
-                else:
-                    record_from_hour = record_from
-                    record_from_minute = 0
-
-                if "sun" in record_to and self.weather_active and self.weather_sunrise is not None:
-                    if "sunset-1" in record_to:
-                        record_to_hour = int(self.weather_sunset.split(":")[0]) - 1
-                        record_to_minute = self.weather_sunset.split(":")[1]
-                    elif "sunset+0" in record_to:
-                        record_to_hour = int(self.weather_sunset.split(":")[0])
-                        record_to_minute = self.weather_sunset.split(":")[1]
-                    elif "sunset+1" in record_to:
-                        record_to_hour = int(self.weather_sunset.split(":")[0]) + 1
-                        record_to_minute = self.weather_sunset.split(":")[1]
-                elif "sun" in record_to:
-                    record_to_hour = 20
-                    record_to_minute = 0
-                else:
-                    record_to_hour = record_to
-                    record_to_minute = 0
-
-                record_to_minute_compare = record_to_minute
-                record_to_hour_compare = record_to_hour
-                if int(record_to_minute) == 0:
-                    record_to_minute_compare = "59"
-                    record_to_hour_compare = str(int(record_to_hour_compare) - 1).zfill(2)
-
-                self.logging.debug(" -> RECORD check " + self.id + "  (" + str(record_from_hour) + ":" +
-                                   str(record_from_minute) + "|" + str(record_to_hour_compare) + ":" +
-                                   str(record_to_minute_compare) + ") " + str(int(hour)) + "/" +
-                                   str(int(minute)) + "/" +
-                                   str(int(second)) + " ... " + str(self.record_seconds))
-
-                if int(second) in self.record_seconds or check_in_general:
-                    if ((int(record_from_hour)*60)+int(record_from_minute)) <= ((int(hour)*60)+int(minute)) <= \
-                            ((int(record_to_hour_compare)*60)+int(record_to_minute_compare)):
-                        self.logging.debug(
-                            " -> RECORD TRUE "+self.id+"  (" + str(record_from_hour) + ":" +
-                            str(record_from_minute) + "-" +
-                            str(record_to_hour_compare) + ":" + str(record_to_minute_compare) + ") " +
-                            str(hour) + "/" + str(minute) + "/" + str(second) + "  < -----")
-                        is_active = True
-
-        self.logging.debug(" -> RECORD FALSE "+self.id+" (" + str(record_from_hour) + ":" + str(record_from_minute) +
-                           "-" + str(record_to_hour_compare) + ":" + str(record_to_minute_compare) + ")")
+            self.image_recording_schedule(current_time)
+            if check_in_general:
+                is_active = self.record_schedule.in_window(seconds_of_day)
+            else:
+                is_active = self.record_schedule.is_active(seconds_of_day)
 
         if check_in_general:
-            self.record_image_last_compare += "[" + str(is_active) + " | " + current_time_string + "] [from " + \
-                                              str(int(record_from_hour)) + ":" + str(int(record_from_minute)) + \
-                                              " | to " + str(int(record_to_hour)) + ":" + str(int(record_to_minute)) + \
-                                              "]"
-            self.record_image_start = str(int(record_from_hour)).zfill(2) + ":" + str(int(record_from_minute)).zfill(2)
-            self.record_image_end = str(int(record_to_hour)).zfill(2) + ":" + str(int(record_to_minute)).zfill(2)
+            from_hour, from_minute, to_hour, to_minute = self.record_schedule.window
+            self.record_image_last_compare = ""
+            if self.record_schedule.mode == "list":
+                self.record_image_last_compare = "OLD|"
+            self.record_image_last_compare += "[" + str(is_active) + " | " + \
+                                              current_time.strftime("%Y-%m-%d_%H:%M:%S") + "] [from " + \
+                                              str(from_hour) + ":" + str(from_minute) + \
+                                              " | to " + str(to_hour) + ":" + str(to_minute) + "]"
+            self.record_image_start = str(from_hour).zfill(2) + ":" + str(from_minute).zfill(2)
+            self.record_image_end = str(to_hour).zfill(2) + ":" + str(to_minute).zfill(2)
 
         return is_active
 
     def image_recording_auto_light(self):
         """
         check brightness, sunset, and sunrise to decide whether to switch on or off the light;
-        requires a weather connection and the connected relay set to mode 'auto'
+        requires a weather connection and the connected relay set to mode 'auto' or the exposure control
+        and the connected relay set to mode 'brightness' (called at stream rate by the exposure control if active)
         """
         sunrise = -1
         sunset = -1
@@ -2443,6 +3277,24 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
                 self.logging.info("image_recording_auto_light: Switch " + light_relay + " off  (mode=auto).")
                 self.relays[light_relay].switch_off()
 
+        elif self.camera_light_mode == "brightness":
+            if not self.exposure or not self.exposure.active:
+                self.logging.warning("image_recording_auto_light: Mode 'brightness' requires the exposure control " +
+                                     "(see presets.birdhouse_exposure), use mode 'auto'.")
+                self.camera_light_mode = "auto"
+                return
+
+            switch = self.exposure.light_decision(self.param["camera_light"]["threshold"],
+                                                  self.relays[light_relay].is_on())
+            if switch == "on" and self.relays[light_relay].is_off():
+                self.logging.info("image_recording_auto_light: Switch " + light_relay + " on  (mode=brightness, " +
+                                  "brightness=" + str(self.exposure.get_brightness()) + ").")
+                self.relays[light_relay].switch_on()
+            elif switch == "off" and self.relays[light_relay].is_on():
+                self.logging.info("image_recording_auto_light: Switch " + light_relay + " off  (mode=brightness, " +
+                                  "brightness=" + str(self.exposure.get_brightness()) + ").")
+                self.relays[light_relay].switch_off()
+
         elif self.camera_light_mode == "inactive" or self.camera_light_mode == "off" or self.camera_light_mode == "on":
             return
 
@@ -2460,10 +3312,17 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
             self.statistics.register(self.id.lower() + "_streams", "Streams " + self.id.upper())
             self.statistics.register(self.id.lower() + "_streams_max", "Max Streams " + self.id.upper())
             self.statistics.register(self.id.lower() + "_framerate", "Framerate " + self.id.upper() + " [fps]")
+            self.statistics.register(self.id.lower() + "_client_fps_min", "Min Client Framerate " + self.id.upper() + " [fps]")
             self.statistics.register("config_img_record_"+self.id.lower(), "Record Image " + self.id.upper() + " [s]")
             if birdhouse_env["statistics_error"]:
                 self.statistics.register(self.id.lower() + "_error", "Camera Error " + self.id.upper())
                 self.statistics.register(self.id.lower() + "_raw_error", "Stream Error " + self.id.upper())
+            if birdhouse_motion["active"]:
+                self.statistics.register(self.id.lower() + "_motion", "Motion " + self.id.upper() + " [%]")
+            if birdhouse_exposure["active"]:
+                self.statistics.register(self.id.lower() + "_brightness", "Brightness " + self.id.upper() + " [%]")
+            self.statistics.register(self.id.lower() + "_write_queue", "Write Queue " + self.id.upper())
+            self.statistics.register(self.id.lower() + "_write_latency", "Write Latency " + self.id.upper() + " [s]")
             if self.object:
                 self.statistics.register("config_queue_" + self.id.lower() + "_object", "Object Queue " + self.id.upper())
                 self.statistics.register("config_img_detect", "Detect Image [s]")
@@ -2484,6 +3343,13 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
             self.statistics.set(self.id.lower() + "_streams", count)
             self.statistics.set(self.id.lower() + "_streams_max", self.camera_streams_max, value_type="max")
             self.statistics.set(self.id.lower() + "_framerate", self.camera_stream_raw.get_framerate())
+            if self.motion and self.motion.active:
+                self.statistics.set(self.id.lower() + "_motion", self.motion.get_activity(), value_type="max")
+            if self.exposure and self.exposure.active:
+                self.statistics.set(self.id.lower() + "_brightness", self.exposure.get_brightness())
+            if self.writer:
+                self.statistics.set(self.id.lower() + "_write_queue", self.writer.get_queue_size(), value_type="max")
+                self.statistics.set(self.id.lower() + "_write_latency", self.writer.get_latency(), value_type="max")
             if birdhouse_env["statistics_error"]:
                 self.statistics.set(self.id.lower() + "_error", self.if_error())
                 self.statistics.set(self.id.lower() + "_raw_error", self.camera_stream_raw.if_error())
@@ -2559,6 +3425,132 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
 
         return image
 
+    def get_stream_encoded(self, stream_id, stream_type, stream_resolution="", system_info=False, wait=True):
+        """
+        get encoded image for video stream, each frame is encoded only once and shared by all clients
+
+        Args:
+            stream_id (str): unique stream ID give from app
+            stream_type (str): stream type: camera, normalized, setting
+            stream_resolution (str): resolution: hires, lowres
+            system_info (bool): add system info to the image
+            wait (bool): wait a while for first image (defined in timeout)
+        Returns:
+            (int, bytearray): image id and encoded image for stream
+        """
+        stream = stream_type
+        if stream_resolution != "":
+            stream += "_" + stream_resolution
+
+        if stream not in self.camera_streams:
+            self.raise_error("Stream '" + stream + "' does not exist.")
+            return self.get_stream_image_id(), None
+
+        with self.camera_broadcasts_lock:
+            if stream not in self.camera_broadcasts:
+                self.camera_broadcasts[stream] = BirdhouseCameraStreamBroadcast(camera_id=self.id,
+                                                                                config=self.config, camera=self,
+                                                                                stream_type=stream_type,
+                                                                                stream_resolution=stream_resolution)
+            broadcast = self.camera_broadcasts[stream]
+        return broadcast.read_frame(stream_id, system_info, wait)
+
+    def get_stream_pip(self, stream_id, camera2, position, stream_type, stream_resolution="", system_info=False,
+                       wait=True):
+        """
+        get encoded picture-in-picture image, each frame pair is composed and encoded only once for all clients
+
+        Args:
+            stream_id (str): unique stream ID give from app
+            camera2 (BirdhouseCamera): camera handler of the camera to be shown as inset
+            position (int): position of the inset (1: top left, 2: top right, 3: bottom left, 4: bottom right)
+            stream_type (str): stream type: camera, setting
+            stream_resolution (str): resolution: hires, lowres
+            system_info (bool): add system info to the image
+            wait (bool): wait a while for first image (defined in timeout)
+        Returns:
+            (int, bytes): image id and encoded image for stream
+        """
+        stream = stream_type
+        if stream_resolution != "":
+            stream += "_" + stream_resolution
+
+        if stream not in self.camera_streams:
+            self.raise_error("Stream '" + stream + "' does not exist.")
+            return self.get_stream_image_id(), None
+
+        pip_key = camera2.id + "_" + str(position) + "_" + stream
+        if pip_key not in self.camera_pip:
+            self.camera_pip[pip_key] = BirdhouseCameraStreamPiP(camera_id=self.id, config=self.config, camera=self,
+                                                                camera2=camera2, position=position,
+                                                                stream_type=stream_type,
+                                                                stream_resolution=stream_resolution)
+        return self.camera_pip[pip_key].read_frame(stream_id, system_info, wait)
+
+    def get_image_snapshot(self):
+        """
+        get current hires image as JPEG without writing it to disk, encoded only once per image id
+
+        Returns:
+            bytes: encoded image (empty if no image available)
+        """
+        frame_id = self.get_stream_image_id()
+        with self.camera_snapshot_lock:
+            if (self.camera_snapshot["image"] is not None and self.camera_snapshot["id"] == frame_id
+                    and self.camera_snapshot["time"] + birdhouse_snapshot_cache["max_age"] > time.time()):
+                return self.camera_snapshot["image"]
+
+            raw = self.get_stream(stream_id="file", stream_type="camera", stream_resolution="hires")
+            if raw is None or len(raw) == 0:
+                return b""
+
+            image = self.image.convert_from_raw(raw, profile="snapshot")
+            if not isinstance(image, bytes):
+                return b""
+            self.camera_snapshot = {"id": frame_id, "time": time.time(), "image": image}
+            return image
+
+    def get_image_compare(self, stamp_1st, stamp_2nd, label):
+        """
+        get JPEG that shows the differences between two saved images without writing it to disk (cached a short time)
+
+        Args:
+            stamp_1st (str): time stamp of the first image
+            stamp_2nd (str): time stamp of the second image
+            label (str): additional text to be shown in the image
+        Returns:
+            bytes: encoded image (empty if images not available)
+        """
+        key = stamp_1st + ":" + stamp_2nd + ":" + label
+        with self.camera_snapshot_lock:
+            for cached_key in list(self.camera_snapshot_compare.keys()):
+                if self.camera_snapshot_compare[cached_key]["time"] + birdhouse_snapshot_cache["max_age"] < time.time():
+                    del self.camera_snapshot_compare[cached_key]
+            if key in self.camera_snapshot_compare:
+                return self.camera_snapshot_compare[key]["image"]
+
+        path_1st = os.path.join(self.config.db_handler.directory("images"),
+                                "image_" + self.id + "_big_" + stamp_1st + ".jpeg")
+        path_2nd = os.path.join(self.config.db_handler.directory("images"),
+                                "image_" + self.id + "_big_" + stamp_2nd + ".jpeg")
+        image_1st = self.image.read(path_1st)
+        image_2nd = self.image.read(path_2nd)
+        if image_1st is None or len(image_1st) == 0 or image_2nd is None or len(image_2nd) == 0:
+            return b""
+
+        image_diff = self.image.compare_raw_show(image_1st, image_2nd)
+        image_diff = self.image.draw_text_raw(image_diff, "-> " + key, position=(10, 20), scale=0.5, thickness=1)
+        image = self.image.convert_from_raw(image_diff, profile="snapshot")
+        if not isinstance(image, bytes):
+            return b""
+
+        with self.camera_snapshot_lock:
+            if len(self.camera_snapshot_compare) >= birdhouse_snapshot_cache["compare_entries"]:
+                oldest = min(self.camera_snapshot_compare, key=lambda k: self.camera_snapshot_compare[k]["time"])
+                del self.camera_snapshot_compare[oldest]
+            self.camera_snapshot_compare[key] = {"time": time.time(), "image": image}
+        return image
+
     def get_stream_object_detection(self, stream_id, stream_type, stream_resolution="", system_info=False, wait=True):
         """
         get image with rendered labels of detected objects
@@ -2585,6 +3577,8 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
             return self.detect_frame_last
 
         image = self.get_stream(stream_id, stream_type, stream_resolution, system_info, wait)
+        if image is not None:
+            image = self.image.writeable_raw(image)
         self.detect_frame_last = image
         self.detect_frame_id_last = self.get_stream_image_id()
 
@@ -2592,7 +3586,8 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
             path_hires = str(os.path.join(self.config.db_handler.directory("images"),
                                           "_temp_"+str(self.id)+"_"+str(stream_id)+".jpg"))
             try:
-                self.image.write(path_hires, image, scale_percent=self.image_size_object_detection)
+                self.image.write(path_hires, image, scale_percent=self.image_size_object_detection,
+                                 profile="detection_temp")
                 img, detect_info = self.object.detect_objects.analyze(path_hires, self.detect_settings["threshold"],
                                                                       False)
                 img = self.object.detect_visualize.render_detection(image, detect_info, 1,
@@ -2623,6 +3618,18 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
         """
         return self.camera_stream_raw.read_stream_image_id()
 
+    def wait_for_stream_image_id(self, image_id, timeout):
+        """
+        block until stream raw delivers a new image or timeout is reached
+
+        Args:
+            image_id (int): last image id known by the caller
+            timeout (float): max. waiting time in seconds
+        Returns:
+            int: current image id
+        """
+        return self.camera_stream_raw.wait_for_frame(image_id, timeout)
+
     def get_stream_count(self):
         """
         identify amount of currently running streams
@@ -2719,6 +3726,14 @@ class BirdhouseCamera(threading.Thread, BirdhouseCameraClass):
             "record_image_start": self.record_image_start,
             "record_image_end": self.record_image_end,
             "stream_raw_fps": self.camera_stream_raw.get_framerate(),
+            "stream_raw_buffer": self.camera_stream_raw.get_buffer_statistics(),
+            "stream_stages": self.camera_stream_stages.get_statistics() if self.camera_stream_stages else {},
+            "stream_pip": dict((key, self.camera_pip[key].get_statistics()) for key in self.camera_pip),
+            "motion": self.motion.get_status() if self.motion else {},
+            "exposure": self.exposure.get_status() if self.exposure else {},
+            "image_writer": self.writer.get_status() if self.writer else {},
+            "record_burst": {"active": self.record_burst_active, "count": self.record_burst_count,
+                             "pre_trigger": len(self.record_burst_ring)},
             "stream_object_fps": self.detect_fps,
 
             "properties": {},
@@ -349,6 +349,8 @@ class BirdhousePiCameraHandler(BirdhouseCameraClass):
         self.picamera_awb_modes = ["off", "auto", "sunlight", "cloudy", "incandescent", "fluorescent", "flash", "horizon"]
 
         self.camera_info = CameraInformation()
+        self.grab_supported = False
+        self.passthrough = False
         self.logging.info("Starting PiCamera2 support for '"+self.id+":"+source+"' ...")
 
     def connect(self):
@@ -449,6 +451,48 @@ class BirdhousePiCameraHandler(BirdhouseCameraClass):
                              "' by stream '" + stream + "': " + str(err))
             return
 
+    def grab(self):
+        """
+        grab next frame without decoding; PiCamera2 delivers decoded arrays only, so retrieve() captures the image
+
+        Returns:
+            bool: True
+        """
+        return True
+
+    def retrieve(self, stream="not set"):
+        """
+        return current image (see grab())
+
+        Args:
+            stream (str): stream name
+        Returns:
+            numpy.ndarray: raw image
+        """
+        return self.read(stream)
+
+    def capture_still(self, width, height):
+        """
+        capture a single image with a higher resolution using a separate still configuration, PiCamera2 switches
+        back to the stream configuration afterward
+
+        Args:
+            width (int): image width
+            height (int): image height
+        Returns:
+            numpy.ndarray: raw image, None if error
+        """
+        try:
+            still_configuration = self.stream.create_still_configuration(main={"size": (int(width), int(height))},
+                                                                         lores=None, raw=None)
+            raw = self.stream.switch_mode_and_capture_array(still_configuration, "main")
+            if raw is None or len(raw) == 0:
+                raise Exception("Returned empty image.")
+            return raw
+        except Exception as err:
+            self.raise_warning("Could not capture still image from PiCamera2 '" + self.source + "': " + str(err))
+            return
+
     def set_properties_init(self):
         """
         set properties based on configuration file
@@ -1082,6 +1126,8 @@ class BirdhouseCameraHandler(BirdhouseCameraClass):
         self.camera_info = CameraInformation()
         self.create_test_images = True
         self.camera_controls = {}
+        self.grab_supported = True
+        self.passthrough = False
 
         self.logging.info("Starting CAMERA support for '"+self.id+":"+source+"' ...")
 
@@ -1136,6 +1182,8 @@ class BirdhouseCameraHandler(BirdhouseCameraClass):
             check = str(type(raw))
             if "NoneType" in check or len(raw) == 0:
                 raise Exception("Returned empty image.")
+            if self.passthrough:
+                self.set_passthrough(True)
             return True
         except Exception as err:
             self.raise_warning("- Error reading first image from camera '"+self.source+"': " + str(err))
@@ -1194,8 +1242,35 @@ class BirdhouseCameraHandler(BirdhouseCameraClass):
             numpy.ndarray: raw image
         """
         self.logging.debug("Read image from '" + self.id + "' ...")
+        if self.grab():
+            return self.decode(self.retrieve(stream))
+
+    def grab(self):
+        """
+        grab next frame from camera without decoding it (blocks until the sensor delivers the next frame)
+
+        Returns:
+            bool: status
+        """
         try:
-            ref, raw = self.stream.read()
+            if not self.stream.grab():
+                raise Exception("Error grabbing image.")
+            return True
+        except Exception as err:
+            self.raise_error("- Error grabbing image from camera '" + self.source + "': " + str(err))
+            return False
+
+    def retrieve(self, stream="not set"):
+        """
+        decode the last grabbed frame
+
+        Args:
+            stream (str): stream name
+        Returns:
+            numpy.ndarray: raw image
+        """
+        try:
+            ref, raw = self.stream.retrieve()
             check = str(type(raw))
             if not ref:
                 raise Exception("Error reading image.")
@@ -1209,6 +1284,77 @@ class BirdhouseCameraHandler(BirdhouseCameraClass):
                              "' by stream '" + stream + "': " + str(err))
             return
 
+    def set_passthrough(self, active):
+        """
+        keep the JPEG images of cameras delivering MJPG (no conversion to BGR by OpenCV), retrieve() then returns
+        the encoded image as one-dimensional buffer
+
+        Args:
+            active (bool): activate or deactivate passthrough
+        Returns:
+            bool: status
+        """
+        try:
+            self.stream.set(cv2.CAP_PROP_CONVERT_RGB, 0 if active else 1)
+            self.passthrough = active
+            self.logging.info("MJPEG passthrough for '" + self.id + "': " + str(active))
+            return True
+        except cv2.error as err:
+            self.raise_warning("Could not set MJPEG passthrough: " + str(err))
+            self.passthrough = False
+            return False
+
+    def decode(self, raw):
+        """
+        decode image if retrieved as JPEG buffer (passthrough mode)
+
+        Args:
+            raw (numpy.ndarray): image or JPEG buffer
+        Returns:
+            numpy.ndarray: decoded image
+        """
+        if raw is not None and len(raw.shape) < 3 and self.passthrough:
+            return cv2.imdecode(raw, cv2.IMREAD_COLOR)
+        return raw
+
+    def capture_still(self, width, height):
+        """
+        capture a single image with a higher resolution: switch resolution, grab until the camera delivers frames
+        in the new size (instead of fixed waiting times), skip some frames for exposure, and switch back
+
+        Args:
+            width (int): image width
+            height (int): image height
+        Returns:
+            numpy.ndarray: raw image, None if error
+        """
+        current_resolution = self.get_resolution()
+        raw = None
+        try:
+            self.set_resolution(width, height)
+            width, height = self.get_resolution()
+            skip_frames = birdhouse_capture["still_skip_frames"]
+            start_time = time.time()
+            while time.time() - start_time < birdhouse_capture["still_timeout"]:
+                if not self.stream.grab():
+                    continue
+                if skip_frames > 0:
+                    skip_frames -= 1
+                    continue
+                ref, raw = self.stream.retrieve()
+                raw = self.decode(raw)
+                if ref and raw is not None and raw.shape[1] == int(width) and raw.shape[0] == int(height):
+                    break
+                raw = None
+            if raw is None:
+                raise Exception("Timeout waiting for an image with " + str(width) + "x" + str(height) + ".")
+        except Exception as err:
+            self.raise_warning("Could not capture still image from camera '" + self.source + "': " + str(err))
+            raw = None
+
+        self.set_resolution(current_resolution[0], current_resolution[1])
+        return raw
+
     def set_properties(self, key, value=""):
         """
         set camera parameter ...
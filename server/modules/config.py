@@ -3,14 +3,14 @@ import sys
 import time
 import json
 import threading
-from pympler import asizeof
 
 from datetime import datetime, timezone, timedelta
 from shutil import which
 
 from modules.presets import *
 from modules.weather import BirdhouseWeather
-from modules.bh_database import BirdhouseCouchDB, BirdhouseJSON, BirdhouseTEXT
+from modules.bh_database import BirdhouseCouchDB, BirdhouseJSON, BirdhouseTEXT, BirdhouseSQLite
+from modules.db_cache import BirdhouseDbCache
 from modules.bh_class import BirdhouseClass
 from modules.image import BirdhouseImageSupport
 
@@ -26,7 +26,7 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
 
         Args:
              config (modules.config.BirdhouseConfig): reference to main configuration handler
-             db_type (str): database type (json, couch, both)
+             db_type (str): database type (json, couch, both, sqlite)
              main_directory (str): root directory of the server
         """
         threading.Thread.__init__(self)
@@ -42,6 +42,7 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
 
         self.json = None
         self.couch = None
+        self.sqlite = None
         self.db_type = None
         self.db_status_cache = {}
         self.db_status_interval = 15
@@ -49,11 +50,7 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
 
         self.cache_active = birdhouse_env["database_cache"]
         self.cache_archive_active = birdhouse_env["database_cache_archive"]
-        self.config_cache = {}
-        self.config_cache_changed = {}
-        self.config_cache_size = {"all": 0.0, "images": 0.0}
-        self.config_cache_size_max = 20 * 1024 * 1024
-        self.config_cache_size_update = time.time()
+        self.config_cache = BirdhouseDbCache(birdhouse_db_cache)
 
     def run(self):
         """
@@ -63,9 +60,17 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
         time_cache_update = time.time()
 
         self.logging.info("Starting DB handler (" + self.db_type + "|" + self.main_directory + ") ...")
+        if self.couch is not None:
+            self.couch.coalesce = True
+
         while self._running:
 
-            if self.db_type == "couch" and time_cache2json + self.backup_interval < time.time():
+            if self.couch is not None and self.couch.connected:
+                self.couch.write_flush()
+
+            # changed entries left from couch mode are saved as well after the db_type changed
+            if ((self.db_type == "couch" or len(self.config_cache.get_changed()) > 0)
+                    and time_cache2json + self.backup_interval < time.time()):
                 self.logging.info("Write cache to JSON ... " + str(self.backup_interval))
                 time_cache2json = time.time()
                 self.write_cache_to_json()
@@ -74,13 +79,12 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
                 time_cache_update = time.time()
                 self.get_db_status(cache=False)
 
-            if self.config_cache_size["all"] > self.config_cache_size_max:
-                self.logging.info("Clean up cache ...")
-                self.clean_up_cache("all")
-
             self.thread_control()
             self.thread_wait()
 
+        if self.couch is not None:
+            self.couch.coalesce = False
+            self.couch.write_flush(force=True)
         self.logging.info("Stopped DB handler (" + self.db_type + ").")
 
     def connect(self, db_type=None):
@@ -88,7 +92,7 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
         (re)connect database
 
         Args:
-            db_type (str): database type (json, couch, both)
+            db_type (str): database type (json, couch, both, sqlite)
         """
         if db_type is None:
             db_type = self.db_type
@@ -99,35 +103,26 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
 
     def get_cache_size(self, part="all"):
         """
-        get size of cache in Byte (updated every 20 seconds)
+        get estimated size of cache in Byte (estimated per entry when written to the cache)
 
+        Args:
+            part (str): database name or "all"
         Returns:
             float: size of cache in Byte
         """
-        if self.config_cache_size_update + 20 < time.time():
-            self.config_cache_size["all"] = asizeof.asizeof(self.config_cache)
-
-            if "images" in self.config_cache:
-                self.config_cache_size["images"] = asizeof.asizeof(self.config_cache["images"])
-            if "backup" in self.config_cache:
-                self.config_cache_size["backup"] = asizeof.asizeof(self.config_cache["backup"])
-            self.config_cache_size_update = time.time()
-
-        self.logging.debug("Cache keys: " + str(self.config_cache.keys()))
-
-        if part in self.config_cache_size:
-            return self.config_cache_size[part]
+        if part == "all":
+            return self.config_cache.get_size()
         else:
-            return 0.0
+            return self.config_cache.get_size(part)
 
     def get_db_list(self):
         """
         get list of available databases
 
         Returns:
-            list: list of available databases (json, couch - depending on db type)
+            list: list of available databases (json, couch, sqlite - depending on db type)
         """
-        db_list = {"json": [], "couch": []}
+        db_list = {"json": [], "couch": [], "sqlite": []}
         if self.db_type == "json":
             db_list["json"] = self.json.get_db_list()
         elif self.db_type == "couch":
@@ -136,14 +131,17 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
         elif self.db_type == "both":
             db_list["json"] = self.json.get_db_list()
             db_list["couch"] = self.couch.get_db_list()
+        elif self.db_type == "sqlite":
+            db_list["json"] = self.json.get_db_list()
+            db_list["sqlite"] = self.sqlite.get_db_list()
         return db_list
 
     def set_db_type(self, db_type):
         """
-        set DB type: JSON, CouchDB, BOTH
+        set DB type: JSON, CouchDB, BOTH, SQLite
 
         Args:
-            db_type (str): database type (json, couch, both)
+            db_type (str): database type (json, couch, both, sqlite)
         """
         self.logging.info("  -> database handler set database type (" + db_type + ")")
         self.db_type = db_type
@@ -154,15 +152,45 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
             return True
         elif self.db_type == "couch" or self.db_type == "both":
             if self.couch is None or not self.couch.connected or self.couch.error:
+                write_pending = {}
+                if self.couch is not None:
+                    write_pending = self.couch.write_pending
                 self.couch = BirdhouseCouchDB(self.config, self.db)
+                self.couch.write_pending.update(write_pending)
+                self.couch.coalesce = self._running and self.is_alive()
             if not self.couch.connected:
                 self.db_type = "json"
             self.logging.info("  -> database handler - db_type=" + self.db_type + ".")
             return True
+        elif self.db_type == "sqlite":
+            if self.sqlite is None or not self.sqlite.connected or self.sqlite.error:
+                self.sqlite = BirdhouseSQLite(self.config, birdhouse_sqlite)
+            if not self.sqlite.connected:
+                self.db_type = "json"
+            self.logging.info("  -> database handler - db_type=" + self.db_type + ".")
+            return True
         else:
             self.logging.error("  -> Unknown DB type (" + str(self.db_type) + ")")
             return False
 
+    def get_db_type(self, db_type=""):
+        """
+        return the database type to be used for a request, falls back to json if the requested type is not available
+
+        Args:
+            db_type (str): requested database type, current settings if empty (couch, json, both, sqlite)
+        Returns:
+            str: database type
+        """
+        if db_type == "":
+            db_type = self.db_type
+        if self.db_type == "sqlite" and db_type in ["couch", "both"]:
+            db_type = "sqlite"
+        if (self.couch is None and db_type in ["couch", "both"]) or (self.sqlite is None and db_type == "sqlite"):
+            self.logging.debug("DB type '" + db_type + "' is currently not available, switch to 'json'.")
+            db_type = "json"
+        return db_type
+
     def get_db_status(self, cache=True):
         """
         return db status
@@ -186,6 +214,7 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
                     "db_error_msg": self.json.error_msg,
                     "db_locked_json": self.json.amount_locked(),
                     "db_waiting_json": self.json.waiting_time,
+                    "db_journal_json": sum(self.json.journal_count.values()),
                     "handler_error": self.error,
                     "handler_error_msg": self.error_msg
                 }
@@ -198,6 +227,9 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
                     "db_connected": self.couch.connected,
                     "db_error": self.couch.error,
                     "db_error_msg": self.couch.error_msg,
+                    "db_schema": self.couch.schema["mode"],
+                    "db_write_pending": len(self.couch.write_pending),
+                    "db_write_coalesced": self.couch.write_coalesced,
                     "handler_error": self.error,
                     "handler_error_msg": self.error_msg
                 }
@@ -213,11 +245,26 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
                     "db_connected_couch": self.couch.connected,
                     "db_connected_json": self.json.connected,
                     "db_locked_json": self.json.amount_locked(),
+                    "db_journal_json": sum(self.json.journal_count.values()),
                     "db_error": "couch=" + str(self.couch.error) + " / json=" + str(self.json.error),
                     "db_error_msg": [self.couch.error_msg, self.json.error_msg],
                     "handler_error": self.error,
                     "handler_error_msg": self.error_msg
                 }
+            elif self.db_type == "sqlite":
+                db_info = {
+                    "type": self.db_type,
+                    "cache_size": self.get_cache_size(),
+                    "cache_active": self.cache_active,
+                    "cache_archive_active": self.cache_archive_active,
+                    "db_connected": self.sqlite.connected,
+                    "db_error": self.sqlite.error,
+                    "db_error_msg": self.sqlite.error_msg,
+                    "db_file": self.sqlite.db_file,
+                    "handler_error": self.error,
+                    "handler_error_msg": self.error_msg
+                }
+            db_info["cache_status"] = self.config_cache.get_status()
             self.db_status_cache = db_info.copy()
             self.config.set_processing_performance("config", "db_status", update_start)
             return db_info
@@ -345,19 +392,14 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
         Args:
             config (str): database name
             date (str): date of database if required (format: YYYYMMDD)
-            db_type (str): type of database if not current settings (couch, json, both)
+            db_type (str): type of database if not current settings (couch, json, both, sqlite)
         Returns:
             bool: status if database exists
         """
         if_exists = False
         filename = self.file_path(config, date)
         self.logging.debug("-----> Check DB exists: " + filename)
-
-        if db_type == "":
-            db_type = self.db_type
-        if self.couch is None and db_type != "json":
-            self.logging.debug("DB type '" + db_type + "' is currently not available, switch to 'json'.")
-            db_type = "json"
+        db_type = self.get_db_type(db_type)
 
         if db_type == "json":
             if_exists = os.path.isfile(filename)
@@ -367,6 +409,10 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
             if_exists = self.couch.exists(filename)
             if not if_exists:
                 if_exists = os.path.isfile(filename)
+        elif db_type == "sqlite":
+            if_exists = self.sqlite.exists(filename)
+            if not if_exists:
+                if_exists = os.path.isfile(filename)
 
         self.logging.debug("-----> Check DB exists: " + str(if_exists) + " (" + db_type + " | " + filename + ")")
         return if_exists
@@ -381,12 +427,7 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
         Returns:
             bool: status if database is available in the cache already
         """
-        if config in self.config_cache:
-            if date == "":
-                return True
-            if date in self.config_cache[config]:
-                return True
-        return False
+        return self.config_cache.contains(config, date)
 
     def read(self, config="", date="", filename="", write_other=True, db_type=""):
         """
@@ -396,17 +437,13 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
             config (str): database name
             date (str): date of database if required (format: YYYYMMDD)
             filename (str): filename of database file (if not specified, use config name)
-            write_other (bool): write other data to other DB type if type is couch or both
-            db_type (str): type of database if not current settings (couch, json, both)
+            write_other (bool): write other data to other DB type if type is couch, both or sqlite
+            db_type (str): type of database if not current settings (couch, json, both, sqlite)
         Returns:
             dict: complete data from database
         """
         result = {}
-        if db_type == "":
-            db_type = self.db_type
-        if self.couch is None and db_type != "json":
-            self.logging.debug("DB type '" + db_type + "' is currently not available, switch to 'json'.")
-            db_type = "json"
+        db_type = self.get_db_type(db_type)
 
         if filename == "" and config != "":
             self.logging.debug("Reading data from database " + config + " / " + date + " (config) ...")
@@ -423,6 +460,13 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
         elif "config.json" in filename:
             result = self.json.read(filename)
 
+        elif db_type == "sqlite":
+            if write_other and not self.sqlite.exists(filename) and self.json.exists(filename):
+                result = self.json.read(filename)
+                self.sqlite.write(filename, result, create=True)
+            else:
+                result = self.sqlite.read(filename)
+
         elif write_other and db_type == "couch" or db_type == "both":
 
             if not self.couch.exists(filename) and self.json.exists(filename):
@@ -463,25 +507,14 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
         elif not self.cache_active and date != "" and config == "images":
             return self.read(config, date)
 
-        if config not in self.config_cache and date == "":
-            self.config_cache[config] = self.read(config=config, date="")
-            self.config_cache_changed[config] = False
-
-        elif config not in self.config_cache and date != "":
-            self.config_cache[config] = {}
-            self.config_cache[config][date] = self.read(config=config, date=date)
-            self.config_cache_changed[config + "_" + date] = False
+        data = self.config_cache.get(config, date)
+        if data is None:
+            data = self.read(config=config, date=date)
+            self.config_cache.put(config, date, data)
 
-        elif date not in self.config_cache[config] and date != "":
-            self.config_cache[config][date] = self.read(config=config, date=date)
-            self.config_cache_changed[config + "_" + date] = False
+        return data.copy()
 
-        if date == "":
-            return self.config_cache[config].copy()
-        else:
-            return self.config_cache[config][date].copy()
-
-    def write(self, config, date="", data=None, create=False, save_json=False, no_cache=False):
+    def write(self, config, date="", data=None, create=False, save_json=False, no_cache=False, changes=None):
         """
         write data to database (for all types)
 
@@ -492,6 +525,9 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
             create (bool): if true create database if doesn't exists
             save_json (bool): if true write data into JSON database (even if type is couch)
             no_cache (bool): if true don't update data in the cache
+            changes (dict): changed entries (key: entry, None if deleted); if given, JSON databases defined in
+                            presets.birdhouse_journal only append the changes to their journal, SQLite
+                            only updates the changed rows
         """
         filename = ""
         try:
@@ -503,7 +539,12 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
             if create:
                 self.directory(config, date)
             filename = self.file_path(config, date)
-            if self.db_type == "json":
+            journal = (changes is not None and date == "" and birdhouse_journal["active"]
+                       and config in birdhouse_journal["configs"])
+            if self.db_type == "json" and journal:
+                self.json.write_changes(filename, changes, data)
+                self.logging.debug("   -> write2json (journal): " + config + " | " + filename)
+            elif self.db_type == "json":
                 self.json.write(filename, data, create)
                 self.logging.debug("   -> write2json: " + config + " | " + filename)
             elif self.db_type == "couch" and "config.json" in filename:
@@ -515,16 +556,31 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
                 self.logging.debug("   -> write2couch: " + config + " | " + filename)
                 if save_json:
                     self.json.write(filename, data, create)
+            elif self.db_type == "sqlite" and "config.json" in filename:
+                self.json.write(filename, data, create)
+                self.logging.debug("   -> write2json: " + config + " | " + filename)
+            elif self.db_type == "sqlite":
+                if changes is not None and date == "":
+                    self.sqlite.write_changes(filename, changes, data)
+                else:
+                    self.sqlite.write(filename, data, create)
+                self.logging.debug("   -> write2sqlite: " + config + " | " + filename)
+                if save_json:
+                    self.json.write(filename, data, create)
             elif self.db_type == "both":
                 self.couch.write(filename, data, create)
-                self.json.write(filename, data, create)
+                if journal:
+                    self.json.write_changes(filename, changes, data)
+                else:
+                    self.json.write(filename, data, create)
                 self.logging.debug("   -> write2both: " + config + " | " + filename)
             else:
                 self.raise_error("Unknown DB type (" + str(self.db_type) + ")")
 
             if birdhouse_cache and ((no_cache and self.exists_in_cache(config, date)) or not no_cache):
                 self.logging.debug("Write to cache: " + config + " / " + date + " / " + self.db_type)
-                self.write_cache(config, date, data)
+                json_written = self.db_type != "couch" or save_json or "config.json" in filename
+                self.write_cache(config, date, data, changed=not json_written)
 
         except Exception as e:
             self.logging.error("Error writing file " + filename + " - " + str(e))
@@ -543,7 +599,7 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
             content = self.read(config_file)
             self.write(config_file + "." + add, content)
 
-    def write_cache(self, config, date="", data=None):
+    def write_cache(self, config, date="", data=None, changed=None):
         """
         add / update date in cache
 
@@ -551,19 +607,14 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
             config (str): database name
             date (str): date of database if required (format: YYYYMMDD)
             data (dict): complete data for database
+            changed (bool): data not yet in the JSON files, i.e., to be saved by write_cache_to_json();
+                            None = True if db_type is couch (cache is the source of the JSON backup)
         """
         if data is None or not self.cache_active:
             return
-        if date == "":
-            self.config_cache[config] = data
-            self.config_cache_changed[config] = True
-        elif config in self.config_cache:
-            self.config_cache[config][date] = data
-            self.config_cache_changed[config + "_" + date] = True
-        else:
-            self.config_cache[config] = {}
-            self.config_cache[config][date] = data
-            self.config_cache_changed[config + "_" + date] = True
+        if changed is None:
+            changed = self.db_type == "couch"
+        self.config_cache.put(config, date, data, changed=changed)
 
     def write_cache_to_json(self):
         """
@@ -575,22 +626,16 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
         count = 0
         start_time = time.time()
         self.logging.debug("Create backup from cached data ...")
-        for config in self.config_cache:
+        for [config, date] in self.config_cache.get_changed():
+            data = self.config_cache.get(config, date, count=False)
+            if data is None:
+                continue
             count += 1
-            if config != "backup" and config in self.config_cache_changed:
-                filename = self.file_path(config=config, date="")
-                self.json.write(filename=filename, data=self.config_cache[config])
-                self.logging.debug("   -> backup2json: " + config + " (" + str(round(time.time() - start_time, 1)) + "s)")
-                self.config_cache_changed[config] = False
-            elif config in self.config_cache_changed:
-                for date in self.config_cache[config]:
-                    if config + "_" + date in self.config_cache_changed \
-                            and self.config_cache_changed[config + "_" + date]:
-                        filename = self.file_path(config=config, date=date)
-                        self.json.write(filename=filename, data=self.config_cache[config][date])
-                        self.logging.debug("   -> backup2json: " + config + " / " + date +
-                                          " (" + str(round(time.time() - start_time, 1)) + "s)")
-                        self.config_cache_changed[config + "_" + date] = False
+            filename = self.file_path(config=config, date=date)
+            self.json.write(filename=filename, data=data)
+            self.logging.debug("   -> backup2json: " + config + " / " + date +
+                               " (" + str(round(time.time() - start_time, 1)) + "s)")
+            self.config_cache.set_changed(config, date, False)
         self.logging.info(f"Wrote {count} databases as backup to JSON files.")
         self._processing = False
 
@@ -652,15 +697,11 @@ class BirdhouseConfigDBHandler(threading.Thread, BirdhouseClass):
         self.logging.debug("Clean up cache for " + config + " " + date)
         if config != "" and config != "all":
             if date != "":
-                del self.config_cache[config][date]
+                self.config_cache.remove(config, date)
             else:
-                del self.config_cache[config]
+                self.config_cache.remove(config)
         elif config == "all":
-            for key in self.config_cache_size:
-                self.config_cache_size[key] = 0
-            self.config_cache = {}
-            self.config_cache_changed = {}
-            self.config_cache_size_update = time.time()
+            self.config_cache.clear()
             self.logging.info("Removed all data from cache.")
 
     def lock(self, config, date=""):
@@ -940,6 +981,7 @@ class BirdhouseConfigQueue(threading.Thread, BirdhouseClass):
 
                 count_files += 1
                 count_edit = 0
+                changes = {}
 
                 entries_in_queue = len(self.edit_queue[config_file]) > 0
                 while entries_in_queue:
@@ -950,11 +992,14 @@ class BirdhouseConfigQueue(threading.Thread, BirdhouseClass):
                         count_entries += 1
                         if command == "add" or command == "edit":
                             entries[key] = entry
+                            changes[key] = entry
                             count_edit += 1
                         elif command == "delete" and key in entries:
                             del entries[key]
+                            changes[key] = None
                             count_edit += 1
                         elif command == "keep_data":
+                            changes[key] = entries[key]
                             entries[key]["type"] = "data"
                             if "hires" in entries[key]:
                                 del entries[key]["hires"]
@@ -970,7 +1015,7 @@ class BirdhouseConfigQueue(threading.Thread, BirdhouseClass):
                                 del entries[key]["to_be_deleted"]
 
                 self.db_handler.unlock(config_file)
-                self.db_handler.write(config_file, "", entries)
+                self.db_handler.write(config_file, "", entries, changes=changes)
                 self.config.set_processing_performance("config_queue_write", config_file, start_time)
 
             # EDIT QUEUE: backup (with date)
@@ -1076,6 +1121,7 @@ class BirdhouseConfigQueue(threading.Thread, BirdhouseClass):
                 self.db_handler.lock(config_file)
 
                 count_files += 1
+                changes = {}
                 entries_in_queue = len(self.status_queue[config_file]) > 0
                 while entries_in_queue:
                     entries_in_queue = len(self.status_queue[config_file]) > 0
@@ -1092,9 +1138,10 @@ class BirdhouseConfigQueue(threading.Thread, BirdhouseClass):
                             self.config.async_answers.append(["OBJECT_DETECTION_DONE"])
                         elif key in entries:
                             entries[key][change_status] = status
+                            changes[key] = entries[key]
 
                 self.db_handler.unlock(config_file)
-                self.db_handler.write(config_file, "", entries)
+                self.db_handler.write(config_file, "", entries, changes=changes)
 
             # STATUS QUEUE: backup (with date)
             elif config_file == "backup":
@@ -2065,6 +2112,12 @@ class BirdhouseConfig(threading.Thread, BirdhouseClass):
         - initially connect to couch (as usually not yet loaded)
         - check if JSON DB exists rewrite, if not create from couch
         - keep JSON file (as usually they are used as backup)
+
+        JSON/BOTH/COUCH -> SQLITE
+        - for each DB in json migrate to sqlite (json files are kept)
+
+        SQLITE -> JSON
+        - for each DB in sqlite (re)write json file
         """
         backup_date = self.local_time().strftime("%Y%m%d-%H%M%S")
         line = "-.-.-.-.-.-.-.-.-.-.-.-.-.-.-.-.-.-.-.-.-.-."
@@ -2126,6 +2179,29 @@ class BirdhouseConfig(threading.Thread, BirdhouseClass):
                                 self.db_handler.json.write(filename=filename, data=data, create=True)
 
                 self.logging.warning("NOT FULLY IMPLEMENTED YET: change from " + str(self.last_db_type) + " to " + str(self.db_type))
+
+            elif self.db_type == "sqlite" and self.db_handler.sqlite is not None:
+                available_databases = self.db_handler.get_db_list()
+                self.logging.info("Migrate all "+str(len(available_databases["json"]))+" json databases to sqlite ...")
+                for database in available_databases["json"]:
+                    if os.path.basename(database) == birdhouse_files["main"]:
+                        continue
+                    path_to_db = self.directories_main["data"] + database
+                    self.logging.info("Migrate from JSON to SQLite: " + database)
+                    data = self.db_handler.json.read(path_to_db)
+                    self.db_handler.sqlite.write(filename=path_to_db, data=data, create=True)
+                self.logging.info(line)
+
+            elif self.last_db_type == "sqlite" and self.db_type == "json":
+                sqlite_handler = BirdhouseSQLite(self, birdhouse_sqlite)
+                for [database, date] in sqlite_handler.get_db_keys():
+                    filename = sqlite_handler.keys2filename(database, date)
+                    if filename != "":
+                        self.logging.info("(Re)write JSON DB: " + database + "/" + date + " -> " + filename)
+                        data = sqlite_handler.read(filename)
+                        self.db_handler.json.write(filename=filename, data=data, create=True)
+                self.logging.info(line)
+
             else:
                 self.logging.debug("No migration required.")
 
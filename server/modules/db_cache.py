@@ -0,0 +1,239 @@
+import json
+import threading
+from collections import OrderedDict
+
+
+def estimate_size(data, sample=20, factor=3.0):
+    """
+    estimate memory size of database content from the size of its JSON representation; for large dicts only
+    a sample of the values is serialized and extrapolated (fast compared to a complete walk of all objects)
+
+    Args:
+        data (Any): database content
+        sample (int): amount of values to be serialized for large dicts
+        factor (float): ratio of python object size to JSON size
+    Returns:
+        int: estimated size in Byte
+    """
+    try:
+        if isinstance(data, dict) and len(data) > sample * 2:
+            keys = list(data.keys())
+            step = len(keys) // sample
+            sample_keys = keys[::step][:sample]
+            sample_size = sum(len(key) + len(json.dumps(data[key], default=str)) for key in sample_keys)
+            return int(sample_size * len(keys) / len(sample_keys) * factor)
+        return int(len(json.dumps(data, default=str)) * factor)
+    except Exception:
+        return 0
+
+
+class BirdhouseDbCache(object):
+    """
+    Memory bounded cache for database content per (config, date): the size of an entry is estimated when it is
+    written, if the limit is exceeded the least recently used archive entries are removed (entries used often
+    get a second chance). Data without date (today, videos, favorites, ...) is pinned and never removed.
+    """
+
+    def __init__(self, settings):
+        """
+        Constructor method for initializing the class.
+
+        Args:
+            settings (dict): cache settings (see presets.birdhouse_db_cache)
+        """
+        self.settings = settings
+        self.size_max = settings["size_max"]
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.usage = {}
+        self.changed = {}
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def if_pinned(key):
+        """
+        check if an entry is pinned (data without date, e.g., today)
+
+        Args:
+            key (tuple): (config, date)
+        Returns:
+            bool: pinned status
+        """
+        return key[1] == ""
+
+    def contains(self, config, date=""):
+        """
+        check if data are available in the cache
+
+        Args:
+            config (str): database name
+            date (str): date of database if required (format: YYYYMMDD), "" for data without date
+        Returns:
+            bool: status if available
+        """
+        with self._lock:
+            return (config, date) in self.entries
+
+    def get(self, config, date="", count=True):
+        """
+        return data from the cache and mark as recently used
+
+        Args:
+            config (str): database name
+            date (str): date of database if required (format: YYYYMMDD)
+            count (bool): count hit or miss and update usage (False for internal access, e.g., backups)
+        Returns:
+            dict: cached data, None if not available
+        """
+        key = (config, date)
+        with self._lock:
+            if key not in self.entries:
+                if count:
+                    self.misses += 1
+                return None
+            if count:
+                self.hits += 1
+                self.usage[key] += 1
+                self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, config, date="", data=None, changed=False):
+        """
+        add or update data in the cache, estimate size and remove other entries if the limit is exceeded
+
+        Args:
+            config (str): database name
+            date (str): date of database if required (format: YYYYMMDD)
+            data (dict): complete data of the database
+            changed (bool): data not yet saved to JSON (backup of the cache), such entries are not removed
+        """
+        key = (config, date)
+        size = estimate_size(data, self.settings["sample"], self.settings["size_factor"])
+        with self._lock:
+            self.size += size - self.sizes.get(key, 0)
+            self.entries[key] = data
+            self.entries.move_to_end(key)
+            self.sizes[key] = size
+            self.usage[key] = self.usage.get(key, 0) + 1
+            self.changed[key] = changed
+            self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """
+        remove least recently used entries that are not pinned and not changed (i.e., not yet written) until the
+        size is below the limit; entries that have been used more often than lfu_protect are moved to the end once
+        (with halved usage counter)
+
+        Args:
+            keep (tuple): key of the entry that has just been added
+        """
+        with self._lock:
+            checked = 0
+            while self.size > self.size_max and checked < len(self.entries) * 2:
+                candidate = None
+                for key in self.entries:
+                    if key != keep and not self.if_pinned(key) and not self.changed.get(key, False):
+                        candidate = key
+                        break
+                if candidate is None:
+                    return
+
+                checked += 1
+                if self.usage[candidate] > self.settings["lfu_protect"]:
+                    self.usage[candidate] = self.usage[candidate] // 2
+                    self.entries.move_to_end(candidate)
+                    continue
+
+                self.remove(candidate[0], candidate[1])
+                self.evictions += 1
+
+    def remove(self, config, date=None):
+        """
+        remove data from the cache
+
+        Args:
+            config (str): database name
+            date (str): date of database, None to remove all dates of the database
+        """
+        with self._lock:
+            keys = [key for key in self.entries if key[0] == config and (date is None or key[1] == date)]
+            for key in keys:
+                self.size -= self.sizes.pop(key, 0)
+                del self.entries[key]
+                self.usage.pop(key, None)
+                self.changed.pop(key, None)
+
+    def clear(self):
+        """
+        remove all data from the cache
+        """
+        with self._lock:
+            self.entries.clear()
+            self.sizes = {}
+            self.usage = {}
+            self.changed = {}
+            self.size = 0
+
+    def get_changed(self):
+        """
+        return keys of changed entries
+
+        Returns:
+            list: list of (config, date)
+        """
+        with self._lock:
+            return [key for key in self.changed if self.changed[key]]
+
+    def set_changed(self, config, date="", changed=False):
+        """
+        set or reset change status of an entry, entries written to the database can be removed again
+
+        Args:
+            config (str): database name
+            date (str): date of database if required (format: YYYYMMDD)
+            changed (bool): change status
+        """
+        with self._lock:
+            if (config, date) in self.changed:
+                self.changed[(config, date)] = changed
+            if not changed:
+                self.evict()
+
+    def get_size(self, config=None):
+        """
+        return estimated size of the cache
+
+        Args:
+            config (str): database name, None for the complete cache
+        Returns:
+            int: estimated size in Byte
+        """
+        with self._lock:
+            if config is None:
+                return self.size
+            return sum(self.sizes[key] for key in self.sizes if key[0] == config)
+
+    def get_status(self):
+        """
+        return status information for the API
+
+        Returns:
+            dict: size, limit, entries and counters
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": self.size,
+                "size_max": self.size_max,
+                "entries": len(self.entries),
+                "pinned": len([key for key in self.entries if self.if_pinned(key)]),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits * 100 / requests, 1) if requests > 0 else 0,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,275 @@
+import time
+import threading
+
+import numpy as np
+
+from modules.presets import *
+from modules.bh_class import BirdhouseCameraClass
+
+
+def exposure_statistics(raw, stride=8, clip_low=5, clip_high=250):
+    """
+    calculate luminance statistics on a strided subsample of an image (vectorized, no full frame copy)
+
+    Args:
+        raw (numpy.ndarray): raw image (BGR or gray scale)
+        stride (int): use every n-th pixel in both dimensions
+        clip_low (int): luminance values up to this value count as clipped dark (0..255)
+        clip_high (int): luminance values from this value count as clipped bright (0..255)
+    Returns:
+        dict: mean (0..100), histogram (256 values), clipped_low and clipped_high in percent
+    """
+    sample = raw[::stride, ::stride]
+    if len(sample.shape) == 3:
+        luma = np.dot(sample[..., :3], np.array([0.114, 0.587, 0.299], dtype=np.float32)).astype(np.uint8)
+    else:
+        luma = sample
+
+    histogram = np.bincount(luma.ravel(), minlength=256)
+    count = max(luma.size, 1)
+    return {
+        "mean": round(float(luma.mean()) / 255 * 100, 2),
+        "histogram": histogram,
+        "clipped_low": round(float(histogram[:clip_low + 1].sum()) * 100 / count, 2),
+        "clipped_high": round(float(histogram[clip_high:].sum()) * 100 / count, 2)
+    }
+
+
+class BirdhouseLightController(object):
+    """
+    PID style controller for a light relay: compares the ambient brightness (measured brightness minus the learned
+    contribution of the light) with a target value and decides with hysteresis when to switch on or off
+    """
+
+    def __init__(self, settings):
+        """
+        Constructor method for initializing the class.
+
+        Args:
+            settings (dict): controller settings (see presets.birdhouse_exposure)
+        """
+        self.settings = settings
+        self.integral = 0
+        self.error_last = None
+        self.update_last = None
+        self.output = 0
+        self.light_offset = 0
+        self.switch_last = 0
+        self.switch_pending = None
+
+    def reset(self):
+        """
+        reset controller state
+        """
+        self.integral = 0
+        self.error_last = None
+        self.update_last = None
+        self.output = 0
+        self.switch_pending = None
+
+    def update(self, brightness, target, light_on):
+        """
+        update controller with a new measurement
+
+        Args:
+            brightness (float): measured brightness (0..100)
+            target (float): minimum ambient brightness (0..100)
+            light_on (bool): current state of the light
+        Returns:
+            float: controller output, positive if too dark
+        """
+        now = time.time()
+
+        # learn how much the light adds to the measured brightness after switching
+        if self.switch_pending is not None and now - self.switch_last >= self.settings["settle_time"]:
+            brightness_before, switched_on = self.switch_pending
+            offset = brightness - brightness_before if switched_on else brightness_before - brightness
+            if offset > 0:
+                self.light_offset = round(0.5 * self.light_offset + 0.5 * offset, 2)
+            self.switch_pending = None
+
+        ambient = brightness - self.light_offset if light_on else brightness
+        error = target - ambient
+
+        if self.update_last is not None:
+            dt = max(now - self.update_last, 0.001)
+            limit = self.settings["integral_max"]
+            self.integral = min(max(self.integral + error * dt, -limit), limit)
+            derivative = (error - self.error_last) / dt
+        else:
+            derivative = 0
+
+        self.output = (self.settings["kp"] * error + self.settings["ki"] * self.integral +
+                       self.settings["kd"] * derivative)
+        self.error_last = error
+        self.update_last = now
+        return self.output
+
+    def decision(self, brightness, light_on):
+        """
+        decide if the light shall be switched based on the last output
+
+        Args:
+            brightness (float): current measured brightness, stored to learn the light offset
+            light_on (bool): current state of the light
+        Returns:
+            str: "on", "off" or "" if nothing to change
+        """
+        if time.time() - self.switch_last < self.settings["min_switch_interval"]:
+            return ""
+
+        switch = ""
+        if not light_on and self.output > self.settings["hysteresis"]:
+            switch = "on"
+        elif light_on and self.output < -self.settings["hysteresis"]:
+            switch = "off"
+
+        if switch != "":
+            self.switch_last = time.time()
+            self.switch_pending = (brightness, switch == "on")
+            self.integral = 0
+        return switch
+
+
+class BirdhouseExposureControl(threading.Thread, BirdhouseCameraClass):
+    """
+    Brightness and exposure statistics per camera calculated on a subsample of the raw stream at a low framerate;
+    controls the camera light in mode 'brightness' and triggers the light control at stream rate
+    """
+
+    def __init__(self, camera_id, config, camera):
+        """
+        Constructor method for initializing the class.
+
+        Args:
+            camera_id (str): id string to identify the camera from which this class is embedded
+            config (modules.config.BirdhouseConfig): reference to main config object
+            camera (modules.camera.BirdhouseCamera): reference to camera handler providing the raw stream
+        """
+        threading.Thread.__init__(self)
+        BirdhouseCameraClass.__init__(self, class_id=camera_id + "-expo", class_log="cam-expo",
+                                      camera_id=camera_id, config=config)
+
+        self.camera = camera
+        self.settings = birdhouse_exposure
+        self.active = self.settings["active"]
+        self.controller = BirdhouseLightController(self.settings)
+
+        self.statistics = None
+        self.brightness = -1
+        self._image_id = None
+        self._lock = threading.Lock()
+
+    def run(self):
+        """
+        update statistics with the current image of the raw stream at the configured framerate
+        """
+        if not self.active:
+            self.logging.info("Do not start EXPOSURE CONTROL for '" + self.id + "', can be changed in presets.")
+            return
+
+        self.logging.info("Starting EXPOSURE CONTROL for '" + self.id + "' ...")
+        while self._running:
+            start_time = time.time()
+            stream_raw = self.camera.camera_stream_raw
+
+            if (not self._paused and self.camera.active and not self.camera.error
+                    and stream_raw is not None and stream_raw.if_connected()):
+                stream_raw.set_activity("exposure")
+                image_id = stream_raw.read_stream_image_id()
+                if image_id != 0 and image_id != self._image_id:
+                    raw = stream_raw.read_stream(stream_id="exposure", wait=False)
+                    if raw is not None and len(raw) > 0:
+                        self._image_id = image_id
+                        try:
+                            self.update(raw)
+                            self.config.set_processing_performance("camera_exposure", self.id, start_time)
+                        except Exception as e:
+                            self.raise_error("Error calculating exposure statistics: " + str(e))
+                    del raw
+
+                try:
+                    self.camera.image_recording_auto_light()
+                except Exception as e:
+                    self.raise_error("Error in light control: " + str(e))
+
+            self.thread_control()
+            self.thread_wait(wait_time=max(1 / self.settings["fps"] - (time.time() - start_time), 0.01))
+
+        self.logging.info("Stopped EXPOSURE CONTROL for '" + self.id + "'.")
+
+    def update(self, raw):
+        """
+        calculate statistics for a new image
+
+        Args:
+            raw (numpy.ndarray): raw image (read-only is OK)
+        """
+        statistics = exposure_statistics(raw, stride=self.settings["stride"],
+                                         clip_low=self.settings["clip_low"], clip_high=self.settings["clip_high"])
+        with self._lock:
+            self.statistics = statistics
+            self.brightness = statistics["mean"]
+
+    def light_decision(self, target, light_on):
+        """
+        update light controller with the current brightness and decide whether to switch the light
+
+        Args:
+            target (float): minimum ambient brightness in percent (camera_light:threshold)
+            light_on (bool): current state of the light
+        Returns:
+            str: "on", "off" or "" if nothing to change
+        """
+        if self.brightness < 0:
+            return ""
+        self.controller.update(self.brightness, float(target), light_on)
+        return self.controller.decision(self.brightness, light_on)
+
+    def reset(self):
+        """
+        reset statistics and controller, e.g. after a reconnect
+        """
+        with self._lock:
+            self.statistics = None
+            self.brightness = -1
+        self.controller.reset()
+
+    def get_brightness(self):
+        """
+        return current brightness
+
+        Returns:
+            float: mean luminance in percent, -1 if not available yet
+        """
+        return self.brightness
+
+    def get_histogram(self):
+        """
+        return luminance histogram of the last image
+
+        Returns:
+            list: 256 values, empty if not available
+        """
+        with self._lock:
+            if self.statistics is None:
+                return []
+            return self.statistics["histogram"].tolist()
+
+    def get_status(self):
+        """
+        return status information for the API
+
+        Returns:
+            dict: exposure statistics and controller state
+        """
+        with self._lock:
+            statistics = self.statistics
+        return {
+            "active": self.active,
+            "brightness": self.brightness,
+            "clipped_low": statistics["clipped_low"] if statistics else 0,
+            "clipped_high": statistics["clipped_high"] if statistics else 0,
+            "light_offset": self.controller.light_offset,
+            "controller_output": round(self.controller.output, 2)
+        }
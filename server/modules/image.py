@@ -1,10 +1,44 @@
 import numpy as np
 import cv2
 import os
+import time
+import threading
 
-from skimage.metrics import structural_similarity as ssim
+from modules.presets import *
 from modules.bh_class import BirdhouseCameraClass, BirdhouseClass
 
+try:
+    from skimage.metrics import structural_similarity as ssim
+    ssim_skimage_available = True
+except ImportError:
+    ssim_skimage_available = False
+
+try:
+    import simplejpeg
+    encode_simplejpeg_available = True
+except ImportError:
+    encode_simplejpeg_available = False
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_GRAY, TJSAMP_GRAY, TJSAMP_444, TJSAMP_422, TJSAMP_420
+    encode_turbojpeg_available = True
+except ImportError:
+    encode_turbojpeg_available = False
+
+
+def encode_profile_live(resolution):
+    """
+    return encode profile for live streams, streams without resolution (e.g., raw) deliver full size images
+
+    Args:
+        resolution (str): stream resolution: hires, lowres or ""
+    Returns:
+        str: name of encode profile (see presets.birdhouse_encode_profiles)
+    """
+    if resolution == "lowres":
+        return "lowres_live"
+    return "hires_live"
+
 
 class BirdhouseImageSupport(BirdhouseCameraClass):
     """
@@ -190,6 +224,164 @@ class BirdhouseImageSupport(BirdhouseCameraClass):
         return info
 
 
+class BirdhouseImageEncoder(BirdhouseClass):
+    """
+    Class to encode raw images as JPEG using the fastest available library (simplejpeg, turbojpeg, OpenCV) and
+    encode profiles with quality, chroma subsampling and optimize settings (see presets.birdhouse_encode_profiles)
+    """
+
+    def __init__(self, config, backend=""):
+        """
+        Constructor to initialize class.
+
+        Args:
+            config (modules.config.BirdhouseConfig): reference to main config handler
+            backend (str): encoder to be used: auto, simplejpeg, turbojpeg, opencv (default from .env or auto)
+        """
+        BirdhouseClass.__init__(self, class_id="img-encode", class_log="image", config=config)
+
+        self.backends = {"opencv": self.encode_opencv}
+        self.backends_optimize = ["opencv"]
+        self.backend = "opencv"
+        self.profiles = birdhouse_encode_profiles
+        self._profiles_unknown = []
+        self._turbojpeg = None
+
+        if encode_simplejpeg_available:
+            self.backends["simplejpeg"] = self.encode_simplejpeg
+        if encode_turbojpeg_available:
+            try:
+                self._turbojpeg = TurboJPEG()
+                self.backends["turbojpeg"] = self.encode_turbojpeg
+            except Exception as e:
+                self.logging.warning("Could not load turbojpeg library: " + str(e))
+
+        if backend == "":
+            backend = birdhouse_env["jpeg_encoder"]
+        self.set_backend(backend)
+
+    def set_backend(self, backend="auto"):
+        """
+        select encoder library, fallback is OpenCV
+
+        Args:
+            backend (str): auto, simplejpeg, turbojpeg, opencv
+        Returns:
+            str: selected encoder
+        """
+        if backend is None or backend == "" or backend == "auto":
+            for available in ["simplejpeg", "turbojpeg", "opencv"]:
+                if available in self.backends:
+                    backend = available
+                    break
+
+        if backend not in self.backends:
+            self.logging.warning("JPEG encoder '" + str(backend) + "' not available, use OpenCV instead.")
+            backend = "opencv"
+
+        self.backend = backend
+        self.logging.info("Use JPEG encoder '" + self.backend + "' (available: " + str(list(self.backends.keys())) + ")")
+        return self.backend
+
+    def encode(self, raw, profile="default"):
+        """
+        encode raw image as JPEG using the given profile, measure encoding time per profile
+
+        Args:
+            raw (numpy.ndarray): input raw image (BGR or gray scale)
+            profile (str): encode profile: default, hires_live, lowres_live, archive, detection_temp, snapshot
+        Returns:
+            bytes: encoded image
+        """
+        if profile not in self.profiles:
+            if profile not in self._profiles_unknown:
+                self._profiles_unknown.append(profile)
+                self.raise_warning("Unknown encode profile '" + str(profile) + "', use 'default' instead.")
+            profile = "default"
+        settings = self.profiles[profile]
+
+        # Huffman table optimization is only supported by OpenCV, so profiles that require it are always encoded there
+        backend = self.backend
+        if settings["optimize"] and backend not in self.backends_optimize:
+            backend = "opencv"
+
+        start_time = time.time()
+        try:
+            image = self.backends[backend](raw, settings)
+        except Exception as e:
+            if backend == "opencv":
+                raise e
+            self.logging.debug("Encoding with '" + backend + "' failed, use OpenCV: " + str(e))
+            image = self.encode_opencv(raw, settings)
+
+        self.config.set_processing_performance("image_encode", profile, start_time)
+        return image
+
+    def encode_opencv(self, raw, settings):
+        """
+        encode using OpenCV
+
+        Args:
+            raw (numpy.ndarray): input raw image
+            settings (dict): profile settings (quality, subsampling, optimize)
+        Returns:
+            bytes: encoded image
+        """
+        encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), int(settings["quality"])]
+        if settings["optimize"]:
+            encode_param += [int(cv2.IMWRITE_JPEG_OPTIMIZE), 1]
+        subsampling = {"444": "IMWRITE_JPEG_SAMPLING_FACTOR_444", "422": "IMWRITE_JPEG_SAMPLING_FACTOR_422",
+                       "420": "IMWRITE_JPEG_SAMPLING_FACTOR_420"}
+        if settings["subsampling"] in subsampling and hasattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR"):
+            encode_param += [int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR),
+                             int(getattr(cv2, subsampling[settings["subsampling"]]))]
+
+        r, buf = cv2.imencode(".jpg", raw, encode_param)
+        if not r:
+            raise Exception("cv2.imencode() returned an error.")
+        return buf.tobytes()
+
+    def encode_simplejpeg(self, raw, settings):
+        """
+        encode using simplejpeg (libjpeg-turbo)
+
+        Args:
+            raw (numpy.ndarray): input raw image
+            settings (dict): profile settings (quality, subsampling; optimize is not supported)
+        Returns:
+            bytes: encoded image
+        """
+        subsampling = settings["subsampling"]
+        if subsampling is None:
+            subsampling = "420"
+
+        if len(raw.shape) == 2:
+            return simplejpeg.encode_jpeg(np.ascontiguousarray(raw[:, :, np.newaxis]),
+                                          quality=int(settings["quality"]), colorspace="GRAY",
+                                          colorsubsampling="Gray")
+        return simplejpeg.encode_jpeg(np.ascontiguousarray(raw), quality=int(settings["quality"]),
+                                      colorspace="BGR", colorsubsampling=subsampling)
+
+    def encode_turbojpeg(self, raw, settings):
+        """
+        encode using PyTurboJPEG (libjpeg-turbo)
+
+        Args:
+            raw (numpy.ndarray): input raw image
+            settings (dict): profile settings (quality, subsampling; optimize is not supported)
+        Returns:
+            bytes: encoded image
+        """
+        subsampling = {"444": TJSAMP_444, "422": TJSAMP_422, "420": TJSAMP_420}
+        if len(raw.shape) == 2:
+            return self._turbojpeg.encode(raw[:, :, np.newaxis], quality=int(settings["quality"]),
+                                          pixel_format=TJPF_GRAY, jpeg_subsample=TJSAMP_GRAY)
+        if settings["subsampling"] in subsampling:
+            return self._turbojpeg.encode(raw, quality=int(settings["quality"]),
+                                          jpeg_subsample=subsampling[settings["subsampling"]])
+        return self._turbojpeg.encode(raw, quality=int(settings["quality"]))
+
+
 class BirdhouseImageProcessing(BirdhouseCameraClass):
     """
     Class to modify encoded and raw images
@@ -222,6 +414,10 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
         self.error_camera = False
         self.error_image = {}
         self.color_schema = "BGR"
+        self.encoder = BirdhouseImageEncoder(config=config)
+        self.text_tiles = {}
+        self.text_tiles_rendered = 0
+        self.text_tiles_blended = 0
 
         self.logging.info("Connected IMAGE processing (" + self.id + ") ...")
 
@@ -260,7 +456,9 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
 
     def compare_raw(self, image_1st, image_2nd, detection_area=None):
         """
-        Calculate structural similarity index (SSIM) of two images
+        Calculate structural similarity index (SSIM) of two images, uses the engine defined in
+        birdhouse_similarity: 'fast' skips the SSIM for identical images, 'opencv' always calculates the SSIM,
+        'skimage' uses scikit-image
 
         Args:
             image_1st (numpy.ndarray): first image to be compared (raw format)
@@ -288,9 +486,18 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
             area = [0, 0, 1, 1]
 
         try:
+            start_time = time.time()
             self.logging.debug(self.id + "/compare 1: " + str(detection_area) + " / " + str(image_1st.shape))
             self.logging.debug(self.id + "/compare 2: " + str(area) + " / " + str(image_1st.shape))
-            (score, diff) = ssim(image_1st, image_2nd, full=True)
+            engine = birdhouse_similarity["engine"]
+            if engine == "skimage" and ssim_skimage_available:
+                score = ssim(image_1st, image_2nd)
+            elif engine == "fast":
+                score, engine = self.compare_raw_fast(image_1st, image_2nd)
+            else:
+                engine = "opencv"
+                score = self.ssim_raw(image_1st, image_2nd)
+            self.config.set_processing_performance("image_compare", engine, start_time)
 
         except Exception as e:
             self.raise_warning("Error comparing images (" + str(e) + ")")
@@ -299,6 +506,75 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
         del image_1st, image_2nd
         return round(score * 100, 1)
 
+    def compare_raw_fast(self, image_1st, image_2nd):
+        """
+        Compare images and skip the SSIM calculation if the images are identical: the mean absolute difference of
+        the grayscale images is cheap compared to the SSIM. Both are calculated in full resolution, as downsampling
+        averages out sensor noise and would return a higher similarity than the full SSIM.
+
+        Args:
+            image_1st (numpy.ndarray): first image to be compared (raw format)
+            image_2nd (numpy.ndarray): second image to be compared (raw format)
+        Returns:
+            (float, str): SSIM (0..1) and step that decided: identical, full
+        """
+        settings = birdhouse_similarity
+        if image_1st.shape != image_2nd.shape:
+            raise ValueError("Input images must have the same dimensions: " +
+                             str(image_1st.shape) + " / " + str(image_2nd.shape))
+
+        gray_1st = self.convert_to_gray_raw(image_1st)
+        gray_2nd = self.convert_to_gray_raw(image_2nd)
+        if float(cv2.norm(gray_1st, gray_2nd, cv2.NORM_L1)) / gray_1st.size <= settings["identical_mad"]:
+            return 1.0, "identical"
+
+        return self.ssim_raw(gray_1st, gray_2nd), "full"
+
+    def ssim_raw(self, image_1st, image_2nd, full=False):
+        """
+        Vectorized structural similarity index (SSIM) with OpenCV box filters, same parameters as the default of
+        skimage.metrics.structural_similarity (7x7 window, K1=0.01, K2=0.03, sample covariance)
+
+        Args:
+            image_1st (numpy.ndarray): first image (gray scale or color, color is converted to gray scale)
+            image_2nd (numpy.ndarray): second image with the same size
+            full (bool): return the SSIM map in addition to the score
+        Returns:
+            float|(float, numpy.ndarray): mean SSIM (0..1), if full=True in addition the SSIM map
+        """
+        win_size = 7
+        data_range = 255
+        if image_1st.shape != image_2nd.shape:
+            raise ValueError("Input images must have the same dimensions: " +
+                             str(image_1st.shape) + " / " + str(image_2nd.shape))
+
+        x = self.convert_to_gray_raw(image_1st).astype(np.float32)
+        y = self.convert_to_gray_raw(image_2nd).astype(np.float32)
+        if min(x.shape[:2]) < win_size:
+            raise ValueError("Images are too small for SSIM (min. " + str(win_size) + "px): " + str(x.shape))
+
+        window = (win_size, win_size)
+        ux = cv2.boxFilter(x, -1, window, normalize=True, borderType=cv2.BORDER_REFLECT)
+        uy = cv2.boxFilter(y, -1, window, normalize=True, borderType=cv2.BORDER_REFLECT)
+        uxx = cv2.boxFilter(x * x, -1, window, normalize=True, borderType=cv2.BORDER_REFLECT)
+        uyy = cv2.boxFilter(y * y, -1, window, normalize=True, borderType=cv2.BORDER_REFLECT)
+        uxy = cv2.boxFilter(x * y, -1, window, normalize=True, borderType=cv2.BORDER_REFLECT)
+
+        cov_norm = win_size * win_size / (win_size * win_size - 1)
+        vx = cov_norm * (uxx - ux * ux)
+        vy = cov_norm * (uyy - uy * uy)
+        vxy = cov_norm * (uxy - ux * uy)
+
+        c1 = (0.01 * data_range) ** 2
+        c2 = (0.03 * data_range) ** 2
+        ssim_map = ((2 * ux * uy + c1) * (2 * vxy + c2)) / ((ux * ux + uy * uy + c1) * (vx + vy + c2))
+
+        pad = (win_size - 1) // 2
+        score = float(ssim_map[pad:-pad, pad:-pad].mean(dtype=np.float64))
+        if full:
+            return score, ssim_map
+        return score
+
     def compare_raw_show(self, image_1st, image_2nd):
         """
         Show in an image where the differences are (colors: black, red; the images have to have the same size)
@@ -322,20 +598,18 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
         del image_1st, image_2nd
         return image_diff
 
-    def convert_from_raw(self, raw):
+    def convert_from_raw(self, raw, profile="default"):
         """
         convert from raw image to image
 
         Args:
             raw (numpy.ndarray): input raw image
+            profile (str): encode profile: default, hires_live, lowres_live, archive, detection_temp, snapshot
         Returns:
-            bytearray: encoded image
+            bytes: encoded image
         """
         try:
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 100]
-            r, buf = cv2.imencode(".jpg", raw, encode_param)
-            size = len(buf)
-            image = bytearray(buf)
+            image = self.encoder.encode(raw, profile)
             del raw
             return image
         except Exception as e:
@@ -525,7 +799,7 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
         del raw
         return image
 
-    def draw_text_raw(self, raw, text, position=None, font=None, scale=None, color=None, thickness=0):
+    def draw_text_raw(self, raw, text, position=None, font=None, scale=None, color=None, thickness=0, cache_key=""):
         """
         Add text on raw image with a wide range of possible settings
 
@@ -537,6 +811,7 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
             scale (float|None): size of font (0..1)
             color (tuple of int|None): text color in (R, G, B)
             thickness (float|None): font thickness in pixel
+            cache_key (str): if set, render the text into a cached tile (see draw_text_tile_raw), e.g., for streams
         Returns:
             numpy.ndarray: image with text
         """
@@ -570,14 +845,61 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
             color) + ", " + str(thickness)
         self.logging.debug("draw_text_raw: " + param)
         try:
-            raw = cv2.putText(raw, text, tuple(position), font, scale, color, thickness, cv2.LINE_AA)
+            if cache_key != "" and len(raw.shape) == 3:
+                raw = self.draw_text_tile_raw(raw, cache_key, text, tuple(position), font, scale, color, thickness)
+            else:
+                raw = cv2.putText(raw, text, tuple(position), font, scale, color, thickness, cv2.LINE_AA)
         except Exception as e:
             self.raise_error("Could not draw text into image (" + str(e) + ")")
             self.logging.warning(" ... " + param)
 
         return raw
 
-    def draw_date_raw(self, raw, overwrite_color=None, overwrite_position=None, offset=None):
+    def draw_text_tile_raw(self, raw, cache_key, text, position, font, scale, color, thickness):
+        """
+        Add text using a cached tile: the text is rendered into a small tile (color and alpha channel) only if
+        text or style changed, and alpha-blended into the image region in place
+
+        Args:
+            raw (numpy.ndarray): input raw image (writeable, 3 channels)
+            cache_key (str): key of the tile, e.g., 'datetime' or 'framerate'
+            text (str): string to be added
+            position (int, int): text position (x, y) of the baseline as used by cv2.putText
+            font (int): font type (see open-cv documentation)
+            scale (float): size of font (0..1)
+            color (tuple of int): text color
+            thickness (int): font thickness in pixel
+        Returns:
+            numpy.ndarray: image with text
+        """
+        signature = (text, font, scale, tuple(color), thickness)
+        if cache_key not in self.text_tiles or self.text_tiles[cache_key][0] != signature:
+            (width, height), baseline = cv2.getTextSize(text, font, scale, thickness)
+            padding = thickness + 2
+            alpha = np.zeros((height + baseline + 2 * padding, width + 2 * padding), dtype=np.uint8)
+            cv2.putText(alpha, text, (padding, padding + height), font, scale, 255, thickness, cv2.LINE_AA)
+            alpha = alpha.astype(np.uint16)[:, :, np.newaxis]
+            tile_color = alpha * np.array(color[:3], dtype=np.uint16)
+            self.text_tiles[cache_key] = (signature, tile_color, 255 - alpha, padding + height, padding)
+            self.text_tiles_rendered += 1
+
+        signature, tile_color, tile_alpha_inverse, offset_y, offset_x = self.text_tiles[cache_key]
+        x1 = int(position[0]) - offset_x
+        y1 = int(position[1]) - offset_y
+        x2 = min(x1 + tile_color.shape[1], raw.shape[1])
+        y2 = min(y1 + tile_color.shape[0], raw.shape[0])
+        tx1, ty1 = max(-x1, 0), max(-y1, 0)
+        x1, y1 = max(x1, 0), max(y1, 0)
+        if x2 <= x1 or y2 <= y1:
+            return raw
+
+        region = raw[y1:y2, x1:x2]
+        tile_slice = (slice(ty1, ty1 + y2 - y1), slice(tx1, tx1 + x2 - x1))
+        region[:] = ((region * tile_alpha_inverse[tile_slice] + tile_color[tile_slice]) // 255).astype(np.uint8)
+        self.text_tiles_blended += 1
+        return raw
+
+    def draw_date_raw(self, raw, overwrite_color=None, overwrite_position=None, offset=None, cache_key=""):
         """
         write date into image
 
@@ -586,6 +908,7 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
             overwrite_color (tuple of int|None): color as (R, G, B) if not default defined in settings
             overwrite_position (int, int|None): position (1-4) if not default defined in settings
             offset (int|None): offset from position in pixel
+            cache_key (str): if set, use a cached text tile (see draw_text_tile_raw)
         Returns:
             numpy.ndarray: image with current date and time
         """
@@ -614,7 +937,7 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
         if overwrite_position is not None:
             position = overwrite_position
             thickness = 1
-        raw = self.draw_text_raw(raw, date_information, position, font, scale, color, thickness)
+        raw = self.draw_text_raw(raw, date_information, position, font, scale, color, thickness, cache_key)
         return raw
 
     def draw_area_raw(self, raw, area=(0, 0, 1, 1), color=(0, 0, 255), thickness=2):
@@ -671,6 +994,19 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
         else:
             return raw
 
+    def writeable_raw(self, raw):
+        """
+        return an image that can be edited, copy only if the given image is a read-only view of a stream frame
+
+        Args:
+            raw (numpy.ndarray): input raw image
+        Returns:
+            numpy.ndarray: writeable raw image
+        """
+        if raw is not None and not raw.flags.writeable:
+            return raw.copy()
+        return raw
+
     def image_in_image_raw(self, raw, raw2, position=4, distance=10):
         """
         add a smaller image in a larger image
@@ -817,7 +1153,7 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
         del raw
         return normalized_brightness
 
-    def write(self, filename, image, scale_percent=100):
+    def write(self, filename, image, scale_percent=100, profile=""):
         """
         Scale image and write to file
 
@@ -825,6 +1161,7 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
             filename (str): relative path and filename starting from server directory
             image (numpy.ndarray): raw image data as list of lists
             scale_percent (int): target size of image in percent
+            profile (str): encode profile for JPEG files (see convert_from_raw), if empty use cv2.imwrite defaults
         Returns:
             bool/str: status if successfully
         """
@@ -836,6 +1173,10 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
                 width = int(image.shape[1] * float(scale_percent) / 100)
                 height = int(image.shape[0] * float(scale_percent) / 100)
                 image = cv2.resize(image, (width, height))
+            if profile != "" and image_path.lower().endswith((".jpg", ".jpeg")):
+                with open(image_path, "wb") as image_file:
+                    image_file.write(self.encoder.encode(image, profile))
+                return True
             return cv2.imwrite(image_path, image)
 
         except Exception as e:
@@ -864,3 +1205,133 @@ class BirdhouseImageProcessing(BirdhouseCameraClass):
             error_msg = "Can't read image '" + image_path + "': " + str(e)
             self.raise_error(error_msg)
             return ""
+
+
+class BirdhouseFrameBundle(object):
+    """
+    Derived forms of a single captured frame (lowres, gray scale, brightness, detection size, encoded JPEG),
+    computed once on first request and cached, so recording, comparison, writing and object detection share them
+    """
+
+    def __init__(self, image, raw, preview_scale=100, compare_lowres=True):
+        """
+        Constructor to initialize class.
+
+        Args:
+            image (BirdhouseImageProcessing): image processing handler used to derive the forms
+            raw (numpy.ndarray): hires image, must not be changed afterward
+            preview_scale (int): size of the lowres image in percent
+            compare_lowres (bool): use gray scale version of the lowres image for comparisons (else hires)
+        """
+        self.image = image
+        self.raw = raw
+        self.preview_scale = preview_scale
+        self.compare_lowres = compare_lowres
+
+        self._lowres = None
+        self._gray = None
+        self._brightness = None
+        self._detection = {}
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def get_hires(self):
+        """
+        return hires image
+
+        Returns:
+            numpy.ndarray: hires image
+        """
+        return self.raw
+
+    def get_lowres(self):
+        """
+        return lowres image (preview scale)
+
+        Returns:
+            numpy.ndarray: lowres image
+        """
+        with self._lock:
+            if self._lowres is None:
+                self._lowres = self.image.resize_raw(raw=self.raw, scale_percent=self.preview_scale)
+            return self._lowres
+
+    def get_gray(self):
+        """
+        return gray scale image for comparisons (lowres or hires depending on compare_lowres)
+
+        Returns:
+            numpy.ndarray: gray scale image
+        """
+        if self.compare_lowres:
+            source = self.get_lowres()
+        else:
+            source = self.raw
+        with self._lock:
+            if self._gray is None:
+                self._gray = self.image.convert_to_gray_raw(source)
+            return self._gray
+
+    def get_brightness(self):
+        """
+        return normalized brightness, calculated from the gray scale image (the mean is nearly independent of
+        the image size)
+
+        Returns:
+            float: normalized brightness (0..100)
+        """
+        gray = self.get_gray()
+        with self._lock:
+            if self._brightness is None:
+                self._brightness = float(np.mean(gray)) / 255 * 100
+            return self._brightness
+
+    def get_detection(self, scale_percent=100):
+        """
+        return image resized for object detection
+
+        Args:
+            scale_percent (int): size in percent of the hires image
+        Returns:
+            numpy.ndarray: resized image
+        """
+        if scale_percent == self.preview_scale:
+            return self.get_lowres()
+        with self._lock:
+            if scale_percent not in self._detection:
+                self._detection[scale_percent] = self.image.resize_raw(raw=self.raw, scale_percent=scale_percent)
+            return self._detection[scale_percent]
+
+    def get_encoded(self, image_type="hires", profile="archive", scale_percent=100):
+        """
+        return encoded JPEG of the given image type
+
+        Args:
+            image_type (str): hires, lowres, detection
+            profile (str): encode profile (see presets.birdhouse_encode_profiles)
+            scale_percent (int): size in percent for image_type 'detection'
+        Returns:
+            bytes: encoded image
+        """
+        if image_type == "lowres":
+            raw = self.get_lowres()
+        elif image_type == "detection":
+            raw = self.get_detection(scale_percent)
+            image_type += str(scale_percent)
+        else:
+            raw = self.raw
+
+        key = image_type + "_" + profile
+        with self._lock:
+            if key not in self._encoded:
+                self._encoded[key] = self.image.encoder.encode(raw, profile)
+            return self._encoded[key]
+
+    def get_shape(self):
+        """
+        return shape of hires image
+
+        Returns:
+            tuple: (height, width, channels)
+        """
+        return self.raw.shape
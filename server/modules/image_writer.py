@@ -0,0 +1,232 @@
+import os
+import time
+import queue
+import threading
+
+from modules.presets import *
+from modules.bh_class import BirdhouseCameraClass
+
+
+class BirdhouseImageWriter(BirdhouseCameraClass):
+    """
+    Pool of worker threads per camera to encode and write recorded images with a bounded queue, so the camera
+    control loop never blocks on storage I/O: files are written to a temporary file and renamed atomically,
+    if the queue runs full (slow storage) new images are rejected (backpressure).
+    """
+
+    def __init__(self, camera_id, config, encoder):
+        """
+        Constructor method for initializing the class.
+
+        Args:
+            camera_id (str): id string to identify the camera from which this class is embedded
+            config (modules.config.BirdhouseConfig): reference to main config object
+            encoder (modules.image.BirdhouseImageEncoder): reference to JPEG encoder
+        """
+        BirdhouseCameraClass.__init__(self, class_id=camera_id + "-write", class_log="img-write",
+                                      camera_id=camera_id, config=config)
+
+        self.encoder = encoder
+        self.settings = birdhouse_image_writer
+        self.queue = queue.Queue(maxsize=max(int(self.settings["queue_size"]), 1))
+        self.workers = []
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.latency = []
+        self.latency_max = 0
+
+        self._lock = threading.Lock()
+        self._backpressure = False
+
+    def start(self):
+        """
+        start worker threads
+        """
+        self.logging.info("Starting IMAGE WRITER for '" + self.id + "' (" + str(self.settings["workers"]) +
+                          " workers, queue size " + str(self.queue.maxsize) + ") ...")
+        for i in range(max(int(self.settings["workers"]), 1)):
+            worker = threading.Thread(target=self.worker, name=self.id + "-write-" + str(i), daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def stop(self):
+        """
+        stop worker threads after all queued images have been written
+        """
+        self._running = False
+        for worker in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=10)
+        self.workers = []
+        self.logging.info("Stopped IMAGE WRITER for '" + self.id + "'.")
+
+    def worker(self):
+        """
+        worker thread: encode and write images from the queue
+        """
+        while True:
+            job = self.queue.get()
+            if job is None:
+                self.queue.task_done()
+                break
+
+            files, profile, callback = job
+            start_time = time.time()
+            written = 0
+            for filename, image in files:
+                if self.write(filename, image, profile):
+                    written += 1
+            duration = time.time() - start_time
+
+            with self._lock:
+                self.latency.append(duration)
+                if len(self.latency) > 50:
+                    self.latency.pop(0)
+                self.latency_max = max(self.latency_max, duration)
+                self.written += written
+                self.failed += len(files) - written
+            self.config.set_processing_performance("image_write", self.id, start_time)
+
+            if written == len(files) and callback is not None:
+                try:
+                    callback(files[0][0])
+                except Exception as e:
+                    self.raise_error("Error in callback after writing '" + files[0][0] + "': " + str(e))
+
+            del files, image, job
+            self.queue.task_done()
+
+    def write(self, filename, image, profile="archive"):
+        """
+        encode image (if raw data) and write to a temporary file, then rename atomically
+
+        Args:
+            filename (str): complete path and filename
+            image (Any): raw image (numpy.ndarray), encoded image (bytes) or function returning the encoded image
+            profile (str): encode profile for raw images (see presets.birdhouse_encode_profiles)
+        Returns:
+            bool: status if successfully
+        """
+        filename_temp = filename + ".tmp"
+        try:
+            if callable(image):
+                image = image()
+            if not isinstance(image, bytes):
+                image = self.encoder.encode(image, profile)
+            with open(filename_temp, "wb") as image_file:
+                image_file.write(image)
+                if self.settings["fsync"]:
+                    image_file.flush()
+                    os.fsync(image_file.fileno())
+            os.replace(filename_temp, filename)
+            return True
+
+        except Exception as e:
+            self.raise_error("Could not write image '" + filename + "': " + str(e))
+            if os.path.exists(filename_temp):
+                try:
+                    os.remove(filename_temp)
+                except Exception as e:
+                    self.logging.debug("Could not remove temp file: " + str(e))
+            return False
+
+    def add(self, filename, image, profile="archive", callback=None):
+        """
+        add image to the write queue without blocking (except put_timeout defined in presets)
+
+        Args:
+            filename (str): complete path and filename
+            image (Any): raw image (numpy.ndarray, must not be changed afterward), encoded image (bytes) or
+                         function returning the encoded image, e.g., from a modules.image.BirdhouseFrameBundle
+            profile (str): encode profile for raw images
+            callback (Any): function to be called with the filename once the image has been written
+        Returns:
+            bool: True if queued, False if rejected because the queue is full
+        """
+        return self.add_group([(filename, image)], profile, callback)
+
+    def add_group(self, files, profile="archive", callback=None):
+        """
+        add several images as one job to the write queue, e.g., hires and lowres image of a recording, so either
+        all or none of them are written (without blocking, except put_timeout defined in presets)
+
+        Args:
+            files (list): list of (filename, image), image as described in add()
+            profile (str): encode profile for raw images
+            callback (Any): function to be called with the first filename once all images have been written
+        Returns:
+            bool: True if queued, False if rejected because the queue is full
+        """
+        if not self._running:
+            return False
+        try:
+            if self.settings["put_timeout"] > 0:
+                self.queue.put((files, profile, callback), timeout=self.settings["put_timeout"])
+            else:
+                self.queue.put_nowait((files, profile, callback))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += len(files)
+            self.raise_warning("Image write queue full, dropped '" + os.path.basename(files[0][0]) + "'.")
+            return False
+
+    def if_backpressure(self):
+        """
+        check if the queue is filled above the backpressure level, callers should skip new recordings
+
+        Returns:
+            bool: backpressure status
+        """
+        level = self.queue.qsize() / self.queue.maxsize
+        if not self._backpressure and level >= self.settings["backpressure"]:
+            self._backpressure = True
+            self.raise_warning("Storage too slow, skip recordings until write queue is below " +
+                               str(round(self.settings["backpressure"] * 50)) + "% ...")
+        elif self._backpressure and level < self.settings["backpressure"] / 2:
+            self._backpressure = False
+            self.logging.info("Write queue for '" + self.id + "' recovered.")
+        return self._backpressure
+
+    def get_queue_size(self):
+        """
+        return amount of images waiting to be written
+
+        Returns:
+            int: queue depth
+        """
+        return self.queue.qsize()
+
+    def get_latency(self):
+        """
+        return average write latency of the last images
+
+        Returns:
+            float: latency in seconds
+        """
+        with self._lock:
+            if len(self.latency) == 0:
+                return 0
+            return round(sum(self.latency) / len(self.latency), 3)
+
+    def get_status(self):
+        """
+        return status information for the API
+
+        Returns:
+            dict: status of the writer pool
+        """
+        return {
+            "workers": len(self.workers),
+            "queue": self.queue.qsize(),
+            "queue_max": self.queue.maxsize,
+            "backpressure": self._backpressure,
+            "latency": self.get_latency(),
+            "latency_max": round(self.latency_max, 3),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
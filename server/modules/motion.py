@@ -0,0 +1,201 @@
+import time
+import threading
+
+import numpy as np
+import cv2
+
+from modules.presets import *
+from modules.bh_class import BirdhouseCameraClass
+
+
+class BirdhouseMotionDetection(threading.Thread, BirdhouseCameraClass):
+    """
+    Running background model per camera on a small grayscale version of the raw stream: provides a motion mask
+    and an activity score at any time (exponential moving average or OpenCV MOG2 subtractor).
+    """
+
+    def __init__(self, camera_id, config, camera):
+        """
+        Constructor method for initializing the class.
+
+        Args:
+            camera_id (str): id string to identify the camera from which this class is embedded
+            config (modules.config.BirdhouseConfig): reference to main config object
+            camera (modules.camera.BirdhouseCamera): reference to camera handler providing the raw stream
+        """
+        threading.Thread.__init__(self)
+        BirdhouseCameraClass.__init__(self, class_id=camera_id + "-motion", class_log="cam-motion",
+                                      camera_id=camera_id, config=config)
+
+        self.camera = camera
+        self.settings = birdhouse_motion
+        self.active = self.settings["active"]
+        self.method = self.settings["method"]
+
+        self.activity = 0
+        self.mask = None
+        self.motion = False
+        self.motion_last = 0
+        self.fps = 0
+
+        self._background = None
+        self._subtractor = None
+        self._image_id = None
+        self._frames = 0
+        self._lock = threading.Lock()
+        self._fps_start = time.time()
+        self._fps_count = 0
+
+    def run(self):
+        """
+        update background model with the current image of the raw stream at the configured framerate
+        """
+        if not self.active:
+            self.logging.info("Do not start MOTION DETECTION for '" + self.id + "', can be changed in presets.")
+            return
+
+        self.logging.info("Starting MOTION DETECTION for '" + self.id + "' (" + self.method + ") ...")
+        while self._running:
+            start_time = time.time()
+            stream_raw = self.camera.camera_stream_raw
+
+            if (not self._paused and self.camera.active and not self.camera.error
+                    and stream_raw is not None and stream_raw.if_connected()):
+                stream_raw.set_activity("motion")
+                image_id = stream_raw.read_stream_image_id()
+                if image_id != 0 and image_id != self._image_id:
+                    raw = stream_raw.read_stream(stream_id="motion", wait=False)
+                    if raw is not None and len(raw) > 0:
+                        self._image_id = image_id
+                        try:
+                            self.update(raw)
+                            self.config.set_processing_performance("camera_motion", self.id, start_time)
+                        except Exception as e:
+                            self.raise_error("Error updating background model: " + str(e))
+                    del raw
+
+            self.thread_control()
+            self.thread_wait(wait_time=max(1 / self.settings["fps"] - (time.time() - start_time), 0.01))
+
+        self.logging.info("Stopped MOTION DETECTION for '" + self.id + "'.")
+
+    def update(self, raw):
+        """
+        update background model with a new image and calculate motion mask and activity
+
+        Args:
+            raw (numpy.ndarray): raw image (color or gray scale, read-only is OK)
+        """
+        if len(raw.shape) == 3:
+            gray = cv2.cvtColor(raw, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = raw
+
+        height, width = gray.shape[:2]
+        size = (int(self.settings["width"]), max(int(height * self.settings["width"] / width), 1))
+        small = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        small = cv2.GaussianBlur(small, (5, 5), 0)
+
+        area = self.param["similarity"]["detection_area"]
+        small = small[int(area[1] * size[1]):int(area[3] * size[1]), int(area[0] * size[0]):int(area[2] * size[0])]
+
+        if self.method == "mog2":
+            if self._subtractor is None:
+                self._subtractor = cv2.createBackgroundSubtractorMOG2(history=int(self.settings["mog2_history"]),
+                                                                      varThreshold=self.settings["mog2_var_threshold"],
+                                                                      detectShadows=False)
+            mask = self._subtractor.apply(small)
+
+        else:
+            small_float = small.astype(np.float32)
+            if self._background is None or self._background.shape != small_float.shape:
+                self._background = small_float
+                self._frames = 0
+            diff = cv2.absdiff(small_float, self._background)
+            mask = np.where(diff > self.settings["pixel_threshold"], 255, 0).astype(np.uint8)
+            cv2.accumulateWeighted(small_float, self._background, self.settings["alpha"])
+
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+        self._frames += 1
+
+        if self._frames <= self.settings["warmup_frames"]:
+            activity = 0
+        else:
+            activity = round(cv2.countNonZero(mask) * 100 / mask.size, 2)
+
+        with self._lock:
+            self.mask = mask
+            self.activity = activity
+            self.motion = activity >= self.settings["motion_threshold"]
+            if self.motion:
+                self.motion_last = time.time()
+
+        self._fps_count += 1
+        if time.time() - self._fps_start >= 5:
+            self.fps = round(self._fps_count / (time.time() - self._fps_start), 1)
+            self._fps_start = time.time()
+            self._fps_count = 0
+
+    def reset(self):
+        """
+        reset background model, e.g. after a reconnect or changed camera settings
+        """
+        with self._lock:
+            self._background = None
+            self._subtractor = None
+            self._frames = 0
+            self.mask = None
+            self.activity = 0
+            self.motion = False
+
+    def get_activity(self):
+        """
+        return current activity
+
+        Returns:
+            float: share of pixels with motion in the detection area in percent
+        """
+        return self.activity
+
+    def get_mask(self):
+        """
+        return current motion mask
+
+        Returns:
+            numpy.ndarray: binary mask (0/255) in the size of the downsampled detection area, None if not available
+        """
+        with self._lock:
+            if self.mask is None:
+                return None
+            return self.mask.copy()
+
+    def if_motion(self, within=0):
+        """
+        check if motion is detected
+
+        Args:
+            within (float): also True if motion was detected within the last x seconds
+        Returns:
+            bool: motion status
+        """
+        if not self.active:
+            return False
+        if within > 0:
+            return self.motion or self.motion_last + within >= time.time()
+        return self.motion
+
+    def get_status(self):
+        """
+        return status information for the API
+
+        Returns:
+            dict: status of the background model
+        """
+        return {
+            "active": self.active,
+            "method": self.method,
+            "activity": self.activity,
+            "motion": self.motion,
+            "motion_last": self.motion_last,
+            "fps": self.fps
+        }
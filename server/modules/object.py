@@ -4,7 +4,7 @@ import threading
 
 from modules.presets import *
 from modules.bh_class import BirdhouseCameraClass
-from modules.image import BirdhouseImageProcessing
+from modules.image import BirdhouseImageProcessing, BirdhouseFrameBundle
 
 
 class BirdhouseObjectDetection(threading.Thread, BirdhouseCameraClass):
@@ -181,7 +181,8 @@ class BirdhouseObjectDetection(threading.Thread, BirdhouseCameraClass):
         Args:
             stamp (str): entry key which is the recording time in the format HHMMSS
             path_hires (str): complete path to the hires image file
-            image_hires (numpy.ndarray): hires images, e.g., directly from the camera or read via cv2.imread()
+            image_hires (Any): hires images (numpy.ndarray), e.g., directly from the camera or read via cv2.imread(),
+                               or frame bundle (modules.image.BirdhouseFrameBundle) from the recording
             image_info (dict): complete entry for the image
         Returns:
             None
@@ -260,7 +261,8 @@ class BirdhouseObjectDetection(threading.Thread, BirdhouseCameraClass):
         Args:
             stamp (str): entry key which is the recording time in the format HHMMSS
             path_hires (str): complete path to the hires image file
-            image_hires (numpy.ndarray): hires images, e.g., directly from the camera or read via cv2.imread()
+            image_hires (Any): hires images (numpy.ndarray), e.g., directly from the camera or read via cv2.imread(),
+                               or frame bundle (modules.image.BirdhouseFrameBundle) from the recording
             image_info (dict): complete entry for the image
         Returns:
             None
@@ -276,7 +278,13 @@ class BirdhouseObjectDetection(threading.Thread, BirdhouseCameraClass):
             path_hires_temp = path_hires.replace(".jpeg", "_temp.jpeg")
             if os.path.exists(path_hires_temp):
                 os.remove(path_hires_temp)
-            self.image.write(path_hires_temp, image_hires, scale_percent=self.image_size_object_detection)
+            if isinstance(image_hires, BirdhouseFrameBundle):
+                with open(path_hires_temp, "wb") as image_file:
+                    image_file.write(image_hires.get_encoded("detection", "detection_temp",
+                                                             self.image_size_object_detection))
+                image_hires = image_hires.get_hires()
+            else:
+                self.image.write(path_hires_temp, image_hires, scale_percent=self.image_size_object_detection)
             img, detect_info = self.detect_objects.analyze(file_path=path_hires_temp,
                                                            threshold=self.detect_settings["threshold"],
                                                            return_image=False)
@@ -51,6 +51,7 @@ def set_global_configuration():
         "dir_logging": "BIRDHOUSE_DIR_LOGGING",
         "http_server": "BIRDHOUSE_HTTP_SERVER",
         "installation_type": "BIRDHOUSE_INSTALLATION_TYPE",
+        "jpeg_encoder": "BIRDHOUSE_JPEG_ENCODER",
         "restart_server": "RESTART_SERVER",
         "log_level": "BIRDHOUSE_LOG_LEVEL",
         "log_level_debug": "BIRDHOUSE_LOG_DEBUG",
@@ -65,6 +66,7 @@ def set_global_configuration():
         "rpi_active": "RPI_ACTIVE",
         "rpi_64bit": "RPI_64BIT",
         "server_audio": "BIRDHOUSE_AUDIO_SERVER",
+        "server_mode": "BIRDHOUSE_SERVER_MODE",
         "test_instance": "BIRDHOUSE_INSTANCE",
         "test_video_devices": "BIRDHOUSE_VIDEO_DEVICE_TEST",
         "which_instance": "BIRDHOUSE_INSTANCE",
@@ -334,6 +336,125 @@ birdhouse_error_images = {
     "lowres": "camera_error_lowres.png"
 }
 
+# ------------------------------------
+# image encoding (quality 0..100, subsampling: None (library default), "444", "422", "420")
+# optimize: Huffman table optimization, only supported by OpenCV - profiles with optimize=True always use OpenCV
+# ------------------------------------
+birdhouse_encode_profiles = {
+    "default":        {"quality": 100, "subsampling": None, "optimize": False},
+    "hires_live":     {"quality": 80, "subsampling": "420", "optimize": False},
+    "lowres_live":    {"quality": 75, "subsampling": "420", "optimize": False},
+    "archive":        {"quality": 95, "subsampling": "444", "optimize": True},
+    "detection_temp": {"quality": 85, "subsampling": "420", "optimize": False},
+    "snapshot":       {"quality": 95, "subsampling": None, "optimize": False}
+}
+
+# ------------------------------------
+# similarity of recorded images (engine: fast, opencv, skimage)
+# ------------------------------------
+birdhouse_similarity = {
+    "engine": "fast",               # fast: skip SSIM for identical images, opencv: always SSIM
+    "identical_mad": 0.1            # mean absolute difference (0..255) below which images are identical
+}
+
+# ------------------------------------
+# motion detection with a running background model on the raw stream (keeps the camera stream active)
+# ------------------------------------
+birdhouse_motion = {
+    "active": False,                # start background model for each camera
+    "method": "ema",                # ema: exponential moving average, mog2: OpenCV MOG2 subtractor
+    "fps": 4,                       # update rate of the background model
+    "width": 160,                   # width in pixel of the downsampled grayscale image
+    "alpha": 0.05,                  # ema: learning rate of the background
+    "pixel_threshold": 25,          # ema: min. difference (0..255) of a pixel to count as motion
+    "mog2_history": 100,            # mog2: amount of frames for the background
+    "mog2_var_threshold": 16,       # mog2: threshold of the squared Mahalanobis distance
+    "warmup_frames": 10,            # frames to learn the background before activity is reported
+    "motion_threshold": 1.0         # activity in % of the detection area from which motion is detected
+}
+
+# ------------------------------------
+# capture engine of the raw stream (grab at sensor rate, decode only on demand)
+# ------------------------------------
+birdhouse_capture = {
+    "grab": True,                   # use grab() and retrieve() if supported by the camera (USB cameras)
+    "grab_idle": True,              # grab also without active streams to keep the camera buffer fresh
+    "mjpeg_passthrough": True,      # keep JPEG images of MJPG cameras, stream unedited images without re-encoding
+    "still_timeout": 5,             # seconds to wait for an image in still (max) resolution
+    "still_skip_frames": 2          # frames to skip after switching to still resolution (exposure)
+}
+
+# ------------------------------------
+# exposure statistics on the raw stream and light control (camera_light:mode = brightness)
+# ------------------------------------
+birdhouse_exposure = {
+    "active": False,                # calculate statistics and control the light at stream rate
+    "fps": 2,                       # updates per second
+    "stride": 8,                    # use every n-th pixel in both dimensions
+    "clip_low": 5,                  # luminance up to this value counts as clipped dark (0..255)
+    "clip_high": 250,               # luminance from this value counts as clipped bright (0..255)
+    "kp": 1.0,                      # light controller: proportional gain
+    "ki": 0.02,                     # light controller: integral gain
+    "kd": 0.0,                      # light controller: derivative gain
+    "integral_max": 200,            # light controller: limit of the integral term
+    "hysteresis": 5,                # switch on if output > hysteresis, off if output < -hysteresis
+    "min_switch_interval": 60,      # seconds between two switching operations
+    "settle_time": 3                # seconds after switching until the contribution of the light is measured
+}
+
+# ------------------------------------
+# motion triggered burst recording (requires birdhouse_motion["active"], replaces the rhythm of image_save)
+# ------------------------------------
+birdhouse_burst = {
+    "active": False,                # record bursts on motion and sparse images in quiet periods
+    "pre_trigger": 3,               # images (one per second) kept in memory and recorded when motion starts
+    "post_trigger": 10,             # seconds to continue the burst after the last motion
+    "interval": 1,                  # seconds between images of a burst (min. 1, file names contain seconds)
+    "sparse_rhythm": 60             # seconds between images in quiet periods
+}
+
+# ------------------------------------
+# asynchronous writer pool for recorded images (per camera)
+# ------------------------------------
+birdhouse_image_writer = {
+    "workers": 2,                   # threads encoding and writing images
+    "queue_size": 20,               # max. images waiting to be written
+    "backpressure": 0.8,            # skip new recordings if the queue is filled above this level (0..1)
+    "put_timeout": 0,               # seconds to wait for a free slot if the queue is full (0 = don't block)
+    "fsync": False                  # force writing to storage before renaming (slower, more SD card writes)
+}
+
+# ------------------------------------
+# in-memory snapshots (/image.jpg, /compare/.../image.jpg)
+# ------------------------------------
+birdhouse_snapshot_cache = {
+    "max_age": 2,                   # max. age in seconds of a cached snapshot / comparison image
+    "compare_entries": 10           # max. amount of cached comparison images per camera
+}
+
+# ------------------------------------
+# stream clients (adaptive frame rate for slow clients)
+# ------------------------------------
+birdhouse_stream_client = {
+    "send_buffer": 262144,          # socket send buffer in bytes, limits frames queued for slow clients
+    "latency_threshold": 0.05,      # send latency in seconds, above this frames are skipped
+    "latency_factor": 1.5,          # min. interval between frames = send latency * factor
+    "fps_interval": 5,              # interval in seconds to measure the effective framerate
+    "downgrade_lowres": False,      # switch slow clients from hires to lowres stream
+    "downgrade_fps": 2,             # ... if effective framerate is below this value
+    "downgrade_time": 15            # ... for more than this time in seconds
+}
+
+# ------------------------------------
+# asyncio server (BIRDHOUSE_SERVER_MODE=asyncio)
+# ------------------------------------
+birdhouse_server_async = {
+    "workers": 8,                   # max. threads for blocking requests (API, views, DB, files)
+    "stream_workers": 4,            # max. threads to get encoded stream frames, separate from workers
+    "write_buffer": 262144,         # max. bytes buffered per client before a stream waits for the client
+    "request_timeout": 30           # max. time in seconds to receive the request header
+}
+
 # ------------------------------------
 # git sub modules
 # ------------------------------------
@@ -352,9 +473,10 @@ birdhouse_loglevel_module = {}
 birdhouse_loglevel_modules_all = [
     'root', 'backup', 'bu-dwnld', 'server', 'srv-info', 'srv-health',
     'cam-main', 'cam-img', 'cam-pi', 'cam-ffmpg', 'cam-video', 'cam-out', 'cam-other', 'cam-object', 'cam-stream',
+    'cam-motion', 'cam-expo', 'img-write',
     'cam-handl', 'cam-info', 'statistics',
     'config', 'config-Q',
-    'DB-text', 'DB-json', 'DB-couch', 'DB-handler', 'image', 'mic-main', 'sensors', 'relay',
+    'DB-text', 'DB-json', 'DB-couch', 'DB-sqlite', 'DB-handler', 'image', 'mic-main', 'sensors', 'relay',
     'video', 'video-srv', "img-eval",
     'views', 'view-head', 'view-chart', 'view-fav', 'view-arch', 'view-obj',
     'weather', 'weather-py', 'weather-om']
@@ -396,6 +518,73 @@ if birdhouse_env["installation_type"].upper() != "DOCKER":
     birdhouse_couchdb["db_server"] = birdhouse_env["couchdb_server"]
     birdhouse_couchdb["db_basedir"] = birdhouse_env["dir_project"] + "data/"
 
+# CouchDB write path: coalesce writes to the same database, compact only if required
+birdhouse_couchdb_write = {
+    "coalesce_window": 3,           # seconds to collect writes to the same database (0 = write immediately)
+    "compact_writes": 200,          # check compaction of a database after this amount of writes
+    "compact_interval": 60 * 60,    # ... or after this time in seconds if written since the last check
+    "compact_ratio": 2.0            # compact if the file size exceeds the active data size by this factor
+}
+
+# CouchDB schema: "main" = one document per database (and date), "entries" = one document per image / video
+# entry in the databases below (prefix + name), written via _bulk_docs and read via the views; start the server
+# once with '--couch-migrate' to migrate all existing data, else databases are migrated when read the first time
+birdhouse_couchdb_schema = {
+    "mode": "main",
+    "prefix": "entries_",
+    "views_version": 1,
+    "databases": {
+        "today_images":     {"date": False, "section": ""},
+        "archive_images":   {"date": True,  "section": "files"},
+        "archive_videos":   {"date": False, "section": ""}
+    }
+}
+birdhouse_couchdb_views = {
+    "by_date": {
+        "map": "function(doc) { if (doc.doc_type == 'entry') { emit([doc.date, doc.camera], null); } }"
+    },
+    "favorites": {
+        "map": "function(doc) { if (doc.doc_type == 'entry' && doc.data && doc.data.favorit == 1) { "
+               "emit([doc.date, doc.key], null); } }"
+    },
+    "labels": {
+        "map": "function(doc) { if (doc.doc_type == 'entry' && doc.data && doc.data.detections) { "
+               "doc.data.detections.forEach(function(detection) { if (detection.label) { "
+               "emit([detection.label, doc.date, doc.key], null); } }); } }"
+    },
+    "dates": {
+        "map": "function(doc) { if (doc.doc_type == 'meta') { emit(doc.date, null); } }"
+    }
+}
+
+# local SQLite database (DATABASE_TYPE=sqlite): one row per entry, config.json remains a JSON file
+birdhouse_sqlite = {
+    "filename": "birdhouse.db",     # database file in the data directory
+    "timeout": 10,                  # seconds to wait for a locked database
+    "sections": {                   # databases with entries in a sub dict, other keys are stored as single rows
+        "archive_images": "files",
+        "favorites": "entries"
+    }
+}
+
+# cache for database content per database and date: least recently used archive dates are removed if the estimated
+# size exceeds the limit; data without a date (today, videos, favorites, ...) stays in the cache
+birdhouse_db_cache = {
+    "size_max": 20 * 1024 * 1024,   # maximum estimated size of the cache in Byte
+    "size_factor": 3.0,             # ratio of memory size to JSON size used for the estimate
+    "sample": 20,                   # amount of entries serialized to estimate the size of large databases
+    "lfu_protect": 3                # entries used more often get a second chance before removal
+}
+
+# append-only journal for JSON databases: changed entries are appended as JSON lines (<file>.journal),
+# read replays the journal over the last snapshot, compaction writes a new snapshot
+birdhouse_journal = {
+    "active": False,                # use journal for the configs below (db_type json or both)
+    "configs": ["images"],          # databases without date that are changed entry by entry
+    "compact_entries": 1000,        # write a new snapshot after this amount of journal lines
+    "compact_interval": 60 * 30     # ... or after this time in seconds since the last snapshot
+}
+
 birdhouse_pages = {
     "backup":           ["ARCHIVE"],
     "cam_info":         ["SETTINGS"],
@@ -530,7 +719,7 @@ birdhouse_default_cam = {
     "camera_light": {
         "switch": "relay1",
         "mode": "auto",
-        "mode_values": ["on", "off", "auto", "manual"],
+        "mode_values": ["on", "off", "auto", "manual", "brightness"],
         "threshold": 25
     },
     "name": "NAME",
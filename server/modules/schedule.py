@@ -0,0 +1,180 @@
+import bisect
+
+
+def recording_window(record_from, record_to, sunrise=None, sunset=None, weather_active=False):
+    """
+    calculate start and end of the recording window from the camera settings (image_save:record_from/record_to)
+
+    Args:
+        record_from (str): start hour or sunrise-1, sunrise-0, sunrise+0, sunrise, sunrise+1
+        record_to (str): end hour or sunset-1, sunset-0, sunset+0, sunset, sunset+1
+        sunrise (str): time of sunrise in the format HH:MM, None if not available
+        sunset (str): time of sunset in the format HH:MM, None if not available
+        weather_active (bool): if weather information shall be used for sunrise and sunset
+    Returns:
+        tuple: (from_hour, from_minute, to_hour, to_minute)
+    """
+    record_from = str(record_from)
+    record_to = str(record_to)
+    sun_available = weather_active and sunrise is not None and sunset is not None
+
+    if "sun" in record_from and sun_available:
+        from_hour, from_minute = [int(value) for value in sunrise.split(":")[:2]]
+        if "-1" in record_from:
+            from_hour -= 1
+        elif "+1" in record_from:
+            from_hour += 1
+    elif "sun" in record_from:
+        from_hour, from_minute = 8, 0
+    else:
+        from_hour, from_minute = int(record_from), 0
+
+    if "sun" in record_to and sun_available:
+        to_hour, to_minute = [int(value) for value in sunset.split(":")[:2]]
+        if "-1" in record_to:
+            to_hour -= 1
+        elif "+1" in record_to:
+            to_hour += 1
+    elif "sun" in record_to:
+        to_hour, to_minute = 20, 0
+    else:
+        to_hour, to_minute = int(record_to), 0
+
+    return from_hour, from_minute, to_hour, to_minute
+
+
+def recording_seconds(rhythm, rhythm_offset):
+    """
+    calculate the seconds within a minute when images shall be recorded
+
+    Args:
+        rhythm (str|int): seconds between two images
+        rhythm_offset (str|int): seconds after the full minute to start
+    Returns:
+        list: sorted list of seconds (0..59)
+    """
+    rhythm = max(int(rhythm), 1)
+    return list(range(int(rhythm_offset) % 60, 60, rhythm))
+
+
+class BirdhouseRecordSchedule(object):
+    """
+    Recording schedule compiled from the camera settings and the daily sun times into a sorted list of capture
+    times (seconds of the day) and lookup tables, so a check per tick is a single index operation. Compiled again
+    only if the date, the settings or the sun times change.
+    """
+
+    def __init__(self):
+        """
+        Constructor method for initializing the class.
+        """
+        self.key = None
+        self.mode = ""
+        self.times = []
+        self.window = (-1, -1, -1, -1)
+        self._seconds = bytearray(24 * 60 * 60)
+        self._minutes = bytearray(24 * 60)
+
+    def update(self, image_save, sunrise=None, sunset=None, weather_active=False, date=""):
+        """
+        compile the schedule if settings, sun times or date have changed
+
+        Args:
+            image_save (dict): camera settings image_save
+            sunrise (str): time of sunrise in the format HH:MM
+            sunset (str): time of sunset in the format HH:MM
+            weather_active (bool): if weather information shall be used for sunrise and sunset
+            date (str): current date, triggers a daily update
+        Returns:
+            bool: True if compiled again
+        """
+        key = (date, sunrise, sunset, weather_active, str(image_save.get("record_from")),
+               str(image_save.get("record_to")), str(image_save.get("rhythm")), str(image_save.get("rhythm_offset")),
+               str(image_save.get("seconds")), str(image_save.get("hours")))
+        if key == self.key:
+            return False
+
+        self.compile(image_save, sunrise, sunset, weather_active)
+        self.key = key
+        return True
+
+    def compile(self, image_save, sunrise=None, sunset=None, weather_active=False):
+        """
+        compile schedule: with record_from and record_to use rhythm and rhythm_offset within the recording window
+        (end is inclusive, a full hour as end means until HH-1:59), else use the lists of seconds and hours
+
+        Args:
+            image_save (dict): camera settings image_save
+            sunrise (str): time of sunrise in the format HH:MM
+            sunset (str): time of sunset in the format HH:MM
+            weather_active (bool): if weather information shall be used for sunrise and sunset
+        """
+        seconds = bytearray(24 * 60 * 60)
+        minutes = bytearray(24 * 60)
+        times = []
+
+        if "record_from" in image_save and "record_to" in image_save:
+            self.mode = "window"
+            self.window = recording_window(image_save["record_from"], image_save["record_to"],
+                                           sunrise, sunset, weather_active)
+            from_hour, from_minute, to_hour, to_minute = self.window
+            if to_minute == 0:
+                to_hour, to_minute = to_hour - 1, 59
+            minute_list = range(max(from_hour * 60 + from_minute, 0), min(to_hour * 60 + to_minute, 24 * 60 - 1) + 1)
+            second_list = recording_seconds(image_save["rhythm"], image_save["rhythm_offset"])
+
+        else:
+            self.mode = "list"
+            hours = sorted(set(int(hour) for hour in image_save["hours"]))
+            minute_list = [hour * 60 + minute for hour in hours for minute in range(60)]
+            second_list = sorted(set(int(second) for second in image_save["seconds"]))
+            if len(hours) > 0:
+                self.window = (hours[0], 0, hours[-1] + 1, 0)
+            else:
+                self.window = (-1, -1, -1, -1)
+
+        for minute in minute_list:
+            minutes[minute] = 1
+            for second in second_list:
+                times.append(minute * 60 + second)
+                seconds[minute * 60 + second] = 1
+
+        self.times = times
+        self._seconds = seconds
+        self._minutes = minutes
+
+    def is_active(self, seconds_of_day):
+        """
+        check if an image shall be recorded at the given time
+
+        Args:
+            seconds_of_day (int): hour * 3600 + minute * 60 + second
+        Returns:
+            bool: recording time
+        """
+        return self._seconds[seconds_of_day % 86400] == 1
+
+    def in_window(self, seconds_of_day):
+        """
+        check if the given time is within the recording window (independent of the rhythm)
+
+        Args:
+            seconds_of_day (int): hour * 3600 + minute * 60 + second
+        Returns:
+            bool: within recording window
+        """
+        return self._minutes[(seconds_of_day % 86400) // 60] == 1
+
+    def next_capture(self, seconds_of_day):
+        """
+        return the next recording time of the day
+
+        Args:
+            seconds_of_day (int): hour * 3600 + minute * 60 + second
+        Returns:
+            int: seconds of the day of the next recording, -1 if no more recordings today
+        """
+        position = bisect.bisect_left(self.times, seconds_of_day)
+        if position < len(self.times):
+            return self.times[position]
+        return -1
@@ -1,4 +1,5 @@
 import threading
+import socket
 import time
 import psutil
 import subprocess
@@ -590,3 +591,118 @@ class ServerInformation(threading.Thread, BirdhouseClass):
             self.logging.error(f"Error connecting to WebDAV: {e}")
             return False
 
+
+
+class ServerStreamClient(BirdhouseClass):
+    """
+    Control frame rate of a single MJPEG stream client: measure send latency, skip frames if the client falls
+    behind (the newest frame is sent next), optionally downgrade to lowres and publish the effective framerate.
+    """
+
+    def __init__(self, camera_id, stream_resolution, statistics=None):
+        """
+        Constructor to initialize class.
+
+        Args:
+            camera_id (str): camera id
+            stream_resolution (str): requested resolution: hires, lowres
+            statistics (modules.statistics.BirdhouseStatistics): reference to statistics handler
+        """
+        BirdhouseClass.__init__(self, class_id="srv-client", class_log="server", device_id=camera_id)
+        self.statistics = statistics
+        self.settings = birdhouse_stream_client
+        self.resolution = stream_resolution
+
+        self.send_latency = 0
+        self.send_next = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.fps = None
+
+        self._fps_start = time.time()
+        self._fps_count = 0
+        self._slow_since = None
+
+    def set_socket(self, connection):
+        """
+        limit socket send buffer, so that only a few frames are queued for slow clients
+
+        Args:
+            connection (socket.socket): client connection
+        """
+        try:
+            connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, int(self.settings["send_buffer"]))
+        except Exception as e:
+            self.logging.debug("Could not set send buffer for stream client: " + str(e))
+
+    def if_send(self):
+        """
+        check if the client is ready for the next frame
+
+        Returns:
+            bool: True if frame shall be sent, False if frame shall be skipped
+        """
+        if time.time() >= self.send_next:
+            return True
+        self.frames_skipped += 1
+        return False
+
+    def get_wait_time(self):
+        """
+        return time until the client is ready for the next frame
+
+        Returns:
+            float: waiting time in seconds
+        """
+        return max(self.send_next - time.time(), 0)
+
+    def set_sent(self, start_time):
+        """
+        register sent frame, calculate send latency and minimal interval until next frame
+
+        Args:
+            start_time (float): time when sending the frame started
+        """
+        end_time = time.time()
+        latency = end_time - start_time
+        if self.frames_sent == 0:
+            self.send_latency = latency
+        else:
+            self.send_latency = 0.8 * self.send_latency + 0.2 * latency
+        self.frames_sent += 1
+        self._fps_count += 1
+
+        if self.send_latency > self.settings["latency_threshold"]:
+            self.send_next = end_time + self.send_latency * self.settings["latency_factor"]
+        else:
+            self.send_next = 0
+
+        if end_time - self._fps_start >= self.settings["fps_interval"]:
+            self.fps = round(self._fps_count / (end_time - self._fps_start), 1)
+            self._fps_start = end_time
+            self._fps_count = 0
+            if self.statistics is not None:
+                # one aggregate over all clients of the camera: framerate of the slowest client
+                self.statistics.set(self.id.lower() + "_client_fps_min", self.fps, value_type="min")
+
+            if self.fps < self.settings["downgrade_fps"] and self.send_latency > self.settings["latency_threshold"]:
+                if self._slow_since is None:
+                    self._slow_since = end_time
+            else:
+                self._slow_since = None
+
+    def if_downgrade(self):
+        """
+        check if client should be switched from hires to lowres stream
+
+        Returns:
+            bool: True if client has been too slow for a while and downgrade is activated
+        """
+        if (self.settings["downgrade_lowres"] and self.resolution == "hires" and self._slow_since is not None
+                and time.time() - self._slow_since > self.settings["downgrade_time"]):
+            self.resolution = "lowres"
+            self._slow_since = None
+            self.logging.info("Downgrade stream client for '" + self.id + "' to lowres (" + str(self.fps) +
+                              "fps, send latency " + str(round(self.send_latency, 3)) + "s)")
+            return True
+        return False
@@ -1642,6 +1642,8 @@ class BirdhouseViewArchive(BirdhouseClass):
             database_ok = True
         elif database_type == "json" and config_available:
             database_ok = True
+        elif database_type == "sqlite" and database_available:
+            database_ok = True
         if not database_ok:
             self.logging.warning("        -> DB Check for '" + date + "': JSON=" + str(config_available) + ", COUCH=" +
                                  str(database_available) + ", DB-TYPE=" + database_type)
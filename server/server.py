@@ -9,9 +9,13 @@ import secrets
 import string
 
 import socket
-import math
 import urllib.parse
 import socketserver
+import asyncio
+import functools
+import io
+
+from concurrent.futures import ThreadPoolExecutor
 
 from http import server
 from datetime import datetime
@@ -20,6 +24,7 @@ from urllib.parse import unquote
 if len(sys.argv) == 0 or ("--help" not in sys.argv and "--shutdown" not in sys.argv):
     from modules.backup import BirdhouseArchive
     from modules.camera import BirdhouseCamera
+    from modules.image import encode_profile_live
     from modules.micro import BirdhouseMicrophone
     from modules.config import BirdhouseConfig
     from modules.presets import srv_logging
@@ -31,7 +36,7 @@ from modules.presets import *
 from modules.relay import BirdhouseRelay
 from modules.bh_class import BirdhouseClass
 from modules.bh_database import BirdhouseTEXT
-from modules.srv_support import ServerInformation, ServerHealthCheck
+from modules.srv_support import ServerInformation, ServerHealthCheck, ServerStreamClient
 from modules.statistics import BirdhouseStatistics
 import faulthandler
 faulthandler.enable()
@@ -222,6 +227,92 @@ def check_pwd(password):
         return False
 
 
+def stream_system_info(which_cam, stream_type, stream_id):
+    """
+    burn information onto the video stream if recording or processing
+
+    Args:
+        which_cam (str): camera id
+        stream_type (str): stream type: camera, setting
+        stream_id (str): stream id, e.g. camera_hires
+    """
+    if stream_type == "camera" \
+            and not camera[which_cam].if_error() \
+            and not camera[which_cam].image.if_error() \
+            and not camera[which_cam].camera_streams[stream_id].if_error():
+
+        if camera[which_cam].video.recording:
+            srv_logging.debug("VIDEO RECORDING")
+            record_info = camera[which_cam].video.record_info()
+            #length = str(round(record_info["length"], 1)) + "s"
+            framerate = str(round(record_info["framerate"], 1)) + "fps"
+            time_s = int(record_info["length"]) % 60
+            time_m = round((int(record_info["length"]) - time_s) / 60)
+            time_l = str(time_m).zfill(2) + ":" + str(time_s).zfill(2)
+            line1 = "Recording"
+            line2 = time_l + " / " + framerate + " (max " + str(camera[which_cam].video.max_length) + "s)"
+            camera[which_cam].set_system_info(True, line1, line2, (0, 0, 100))
+            camera[which_cam].set_system_info_lowres(True, "R", (0, 0, 100))
+
+        elif camera[which_cam].video.processing:
+            srv_logging.debug("VIDEO PROCESSING")
+            record_info = camera[which_cam].video.record_info()
+            #length = str(round(record_info["length"], 1)) + "s"
+            #framerate = str(round(record_info["framerate"], 1)) + "fps"
+            progress = str(round(float(record_info["percent"]), 1)) + "%"
+            time_s = int(record_info["elapsed"]) % 60
+            time_m = round((int(record_info["elapsed"]) - time_s) / 60)
+            time_e = str(time_m).zfill(2) + ":" + str(time_s).zfill(2)
+            line1 = "Processing"
+            line2 = time_e + " / " + progress
+            camera[which_cam].set_system_info(True, line1, line2, (0, 255, 255))
+            camera[which_cam].set_system_info_lowres(True, "P", (0, 255, 255))
+
+        else:
+            camera[which_cam].set_system_info(False)
+            camera[which_cam].set_system_info_lowres(False)
+
+
+def stream_frame_encoded(which_cam, stream_type, stream_resolution, stream_id, which_cam2="", cam2_pos=4):
+    """
+    update camera if requested, get the current encoded frame from the broadcaster or PiP stage and set system info
+    (blocking, used by the asyncio server in its worker threads)
+
+    Args:
+        which_cam (str): camera id
+        stream_type (str): stream type: camera, setting
+        stream_resolution (str): stream resolution: hires, lowres
+        stream_id (str): internal id of the streaming client
+        which_cam2 (str): camera id of the PiP inset, empty if no PiP
+        cam2_pos (int): position of the PiP inset
+    Returns:
+        (int, bytes): frame id and encoded frame
+    """
+    if config.update["camera_" + which_cam]:
+        camera[which_cam].reconnect()
+
+    if config.update_config["camera_" + which_cam]:
+        camera[which_cam].update_main_config(reload=False)
+
+    if which_cam2 != "" and which_cam2 in camera:
+        frame_id, frame = camera[which_cam].get_stream_pip(stream_id=stream_id,
+                                                           camera2=camera[which_cam2],
+                                                           position=int(cam2_pos),
+                                                           stream_type=stream_type,
+                                                           stream_resolution=stream_resolution,
+                                                           system_info=True)
+    else:
+        frame_id, frame = camera[which_cam].get_stream_encoded(stream_id=stream_id,
+                                                               stream_type=stream_type,
+                                                               stream_resolution=stream_resolution,
+                                                               system_info=True)
+    if frame is None:
+        frame_id = camera[which_cam].get_stream_image_id()
+
+    stream_system_info(which_cam, stream_type, stream_type + "_" + stream_resolution)
+    return frame_id, frame
+
+
 class StreamingServer(socketserver.ThreadingMixIn, server.HTTPServer):
     """
     configure server.HTTPServer
@@ -247,6 +338,360 @@ class StreamingServerIPv6(socketserver.ThreadingMixIn, server.HTTPServer):
         super().server_bind()
 
 
+class StreamingConnectionAsync(object):
+    """
+    socket replacement to run a StreamingHandler in a worker thread of the asyncio server: the request is read
+    from a buffer, the response is passed to the asyncio stream writer incl. back pressure of the client
+    """
+
+    def __init__(self, request, writer, loop):
+        """
+        Args:
+            request (bytes): complete request (header and body)
+            writer (asyncio.StreamWriter): stream writer of the client connection
+            loop (asyncio.AbstractEventLoop): event loop of the asyncio server
+        """
+        self.request = request
+        self.writer = writer
+        self.loop = loop
+        self.socket = writer.get_extra_info("socket")
+
+    def makefile(self, mode="rb", buffering=-1):
+        """
+        return request as file object (StreamRequestHandler.setup)
+        """
+        return io.BytesIO(self.request)
+
+    def sendall(self, data):
+        """
+        send data via event loop and wait until it has been buffered or sent
+        """
+        asyncio.run_coroutine_threadsafe(self._send(data), self.loop).result()
+
+    async def _send(self, data):
+        if self.writer.is_closing():
+            raise ConnectionResetError("[Errno 104] Connection closed by client")
+        self.writer.write(data)
+        await self.writer.drain()
+
+    def setsockopt(self, *args):
+        """
+        set socket options of the client connection
+        """
+        if self.socket is not None:
+            self.socket.setsockopt(*args)
+
+    def settimeout(self, timeout):
+        pass
+
+    def close(self):
+        pass
+
+
+class StreamingServerAsync(object):
+    """
+    asyncio based HTTP server (BIRDHOUSE_SERVER_MODE=asyncio): MJPEG streams are coroutines fed by the camera
+    broadcasters, all other requests are handled by the StreamingHandler in a bounded pool of worker threads;
+    stream frames are fetched in a separate pool, so slow API requests can't stall the streams (and vice versa)
+    """
+
+    def __init__(self, server_address, handler_class):
+        """
+        Args:
+            server_address (tuple): address and port to bind the server to
+            handler_class (Any): request handler class, same as for StreamingServerIPv6
+        """
+        self.server_address = server_address
+        self.RequestHandlerClass = handler_class
+        self.settings = birdhouse_server_async
+        self.executor = ThreadPoolExecutor(max_workers=int(self.settings["workers"]), thread_name_prefix="srv-async")
+        self.executor_stream = ThreadPoolExecutor(max_workers=int(self.settings["stream_workers"]),
+                                                  thread_name_prefix="srv-stream")
+        self.loop = None
+        self.clients = 0
+        self.streams = 0
+
+        self._server = None
+        self._stop = None
+        self._frame_events = {}
+
+    def serve_forever(self):
+        """
+        run event loop until shutdown
+        """
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        """
+        bind dual stack socket (IPv4 and IPv6) and serve clients until shutdown
+        """
+        self.loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+
+        server_socket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server_socket.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+        server_socket.bind(self.server_address)
+
+        self._server = await asyncio.start_server(self.handle_client, sock=server_socket)
+        await self._stop.wait()
+        self._server.close()
+
+    def shutdown(self):
+        """
+        stop event loop (can be called from other threads)
+        """
+        if self.loop is not None and self._stop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._stop.set)
+
+    def server_close(self):
+        """
+        stop server and worker threads
+        """
+        self.shutdown()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor_stream.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_client(self, reader, writer):
+        """
+        read request and decide how to handle it: MJPEG streams from broadcaster as coroutine, other streams
+        in a dedicated thread, all other requests via the StreamingHandler in the worker pool
+
+        Args:
+            reader (asyncio.StreamReader): stream reader of the client connection
+            writer (asyncio.StreamWriter): stream writer of the client connection
+        """
+        self.clients += 1
+        client_address = writer.get_extra_info("peername")
+        writer.transport.set_write_buffer_limits(high=int(self.settings["write_buffer"]))
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=self.settings["request_timeout"])
+            request_line = request.split(b"\r\n", 1)[0].decode("iso-8859-1").split()
+            if len(request_line) < 2:
+                return
+            method, path = request_line[0], request_line[1]
+
+            length = 0
+            for line in request.split(b"\r\n")[1:]:
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1].strip())
+            if length > 0:
+                request += await asyncio.wait_for(reader.readexactly(length), timeout=self.settings["request_timeout"])
+
+            if method == "GET" and "/stream.mjpg" in path and "/object/" not in path:
+                await self.stream_video(path, client_address, writer)
+
+            elif method == "GET" and ("/stream.mjpg" in path or "/audio.wav" in path or "/audio.mp3" in path):
+                finished = self.loop.create_future()
+
+                def handle_stream():
+                    try:
+                        self.handle_request(request, client_address, writer)
+                    finally:
+                        self.loop.call_soon_threadsafe(lambda: finished.done() or finished.set_result(True))
+
+                threading.Thread(target=handle_stream, name="srv-async-stream", daemon=True).start()
+                await finished
+
+            else:
+                await self.loop.run_in_executor(self.executor, self.handle_request, request, client_address, writer)
+
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        except Exception as e:
+            srv_logging.warning("Error handling request from " + str(client_address) + ": " + str(e))
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    def handle_request(self, request, client_address, writer):
+        """
+        handle request with the StreamingHandler (blocking, runs in a worker thread)
+
+        Args:
+            request (bytes): complete request (header and body)
+            client_address (tuple): address of the client
+            writer (asyncio.StreamWriter): stream writer of the client connection
+        """
+        try:
+            self.RequestHandlerClass(StreamingConnectionAsync(request, writer, self.loop), client_address, self)
+        except Exception as e:
+            if "Errno 104" in str(e) or "Errno 32" in str(e):
+                srv_logging.debug("Closed connection " + str(client_address) + ": " + str(e))
+            else:
+                srv_logging.warning("Error handling request from " + str(client_address) + ": " + str(e))
+
+    async def wait_for_frame(self, which_cam, image_id, timeout):
+        """
+        wait without blocking the event loop until the camera delivers a new image or timeout is reached
+
+        Args:
+            which_cam (str): camera id
+            image_id (int): last image id known by the caller
+            timeout (float): max. waiting time in seconds
+        """
+        if which_cam not in self._frame_events:
+            self._frame_events[which_cam] = asyncio.Event()
+            threading.Thread(target=self.frame_watcher, args=(which_cam,),
+                             name="srv-async-" + which_cam, daemon=True).start()
+
+        if image_id != camera[which_cam].get_stream_image_id():
+            return
+        try:
+            await asyncio.wait_for(self._frame_events[which_cam].wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def frame_watcher(self, which_cam):
+        """
+        one thread per camera that waits for new images and wakes up all streams of the camera
+
+        Args:
+            which_cam (str): camera id
+        """
+        image_id = None
+        while not config.thread_ctrl["shutdown"] and not self.loop.is_closed():
+            new_image_id = camera[which_cam].wait_for_stream_image_id(image_id, 1)
+            if new_image_id != image_id:
+                image_id = new_image_id
+                try:
+                    self.loop.call_soon_threadsafe(self.frame_notify, which_cam)
+                except RuntimeError:
+                    break
+            else:
+                time.sleep(0.1)
+
+    def frame_notify(self, which_cam):
+        """
+        wake up all streams waiting for a new image of the camera (runs in event loop)
+
+        Args:
+            which_cam (str): camera id
+        """
+        event = self._frame_events[which_cam]
+        self._frame_events[which_cam] = asyncio.Event()
+        event.set()
+
+    async def stream_video(self, path, client_address, writer):
+        """
+        MJPEG stream as coroutine, same behavior as StreamingHandler.do_GET_stream_video without object detection:
+        frames are encoded once per camera image by the broadcaster or PiP stage and shared by all clients
+
+        Args:
+            path (str): requested path
+            client_address (tuple): address of the client
+            writer (asyncio.StreamWriter): stream writer of the client connection
+        """
+        handler = self.RequestHandlerClass.__new__(self.RequestHandlerClass)
+        handler.path = path
+        handler.client_address = client_address
+        param = handler.path_split(check_allowed=False)
+        config.user_activity("set")
+
+        which_cam = param["which_cam"]
+        which_cam2 = param["other_cam"]
+        if ":" in which_cam and "+" in which_cam:
+            pip_cam, cam2_pos = which_cam.split(":")
+            which_cam, which_cam2 = pip_cam.split("+")
+        else:
+            cam2_pos = 4
+
+        if '/pip/stream.mjpg' not in path:
+            which_cam2 = ""
+
+        srv_logging.debug("VIDEO " + which_cam + ": GET API request '" + path + "' - Session-ID: " +
+                          param["session_id"] + " (asyncio)")
+
+        if which_cam not in camera:
+            writer.write(b"HTTP/1.0 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return
+
+        stream_id_int = datetime.now().timestamp()
+        stream_id_ext = param["session_id"]
+
+        stream_wait_while_error = 0.5
+        stream_wait_while_recording = 1
+        stream_wait_for_next_frame = 1
+
+        if "/detection/" in path:
+            stream_type = "setting"
+        else:
+            stream_type = "camera"
+
+        if '/lowres/' in path:
+            stream_resolution = "lowres"
+        else:
+            stream_resolution = "hires"
+
+        stream_client = ServerStreamClient(which_cam, stream_resolution, statistics)
+        stream_client.set_socket(writer.get_extra_info("socket"))
+        frame_id = None
+
+        writer.write(b"HTTP/1.0 200 OK\r\n"
+                     b"Age: 0\r\n"
+                     b"Cache-Control: no-cache, private\r\n"
+                     b"Pragma: no-cache\r\n"
+                     b"Content-Type: multipart/x-mixed-replace; boundary=FRAME\r\n"
+                     b"Access-Control-Allow-Origin: *\r\n"
+                     b"Access-Control-Allow-Headers: *\r\n"
+                     b"Access-Control-Allow-Methods: *\r\n\r\n")
+
+        self.streams += 1
+        config.camera_capture_active = False
+        try:
+            while True:
+                config.video_frame_count += 1
+
+                if camera[which_cam].get_stream_kill(stream_id_ext, stream_id_int) or config.thread_ctrl["shutdown"]:
+                    srv_logging.info("Closed streaming client: " + stream_id_ext)
+                    break
+
+                while config.camera_capture_active:
+                    await asyncio.sleep(0.1)
+
+                if stream_client.if_downgrade():
+                    stream_resolution = "lowres"
+
+                if (frame_id != camera[which_cam].get_stream_image_id()
+                        or camera[which_cam].if_error() or camera[which_cam].camera_stream_raw.if_error()) \
+                        and stream_client.if_send():
+
+                    frame_id, frame = await self.loop.run_in_executor(
+                        self.executor_stream, functools.partial(stream_frame_encoded, which_cam, stream_type,
+                                                         stream_resolution, str(stream_id_int),
+                                                         which_cam2, cam2_pos))
+
+                    if frame is None or len(frame) == 0:
+                        srv_logging.warning("Stream: Got an empty frame for '" + which_cam + "' ...")
+
+                    else:
+                        send_start = time.time()
+                        writer.write(b"--FRAME\r\nContent-Type: image/jpeg\r\nContent-Length: " +
+                                     str(len(frame)).encode() + b"\r\n\r\n")
+                        writer.write(frame)
+                        writer.write(b"\r\n")
+                        await writer.drain()
+                        stream_client.set_sent(send_start)
+
+                if camera[which_cam].error or camera[which_cam].image.error:
+                    await asyncio.sleep(stream_wait_while_error)
+                elif stream_client.get_wait_time() > 0:
+                    await asyncio.sleep(stream_client.get_wait_time())
+                else:
+                    await self.wait_for_frame(which_cam, frame_id, stream_wait_for_next_frame)
+                    for key in camera:
+                        if not camera[key].error and camera[key].video:
+                            if camera[key].video.processing or camera[key].video.recording:
+                                await asyncio.sleep(stream_wait_while_recording)
+                                break
+
+        except (ConnectionError, OSError) as error_msg:
+            srv_logging.debug('Removed streaming client %s: %s', client_address, str(error_msg))
+        finally:
+            self.streams -= 1
+
+
 class StreamingHandler(server.BaseHTTPRequestHandler):
     """
     stream requested files or create API response
@@ -355,7 +800,7 @@ class StreamingHandler(server.BaseHTTPRequestHandler):
         # try:
         self.wfile.write(b'--FRAME\r\n')
         self.send_header('Content-Type', 'image/jpeg')
-        self.send_header('Content-Length', str(len(str(frame))))
+        self.send_header('Content-Length', str(len(frame)))
         self.end_headers()
         self.wfile.write(frame)
         self.wfile.write(b'\r\n')
@@ -1384,43 +1829,17 @@ class StreamingHandler(server.BaseHTTPRequestHandler):
         # show compared images
         if '/compare/' in self.path and '/image.jpg' in self.path:
             srv_logging.debug("Compare: Create and return image that shows differences to the former image ...")
-            filename = os.path.join(config.db_handler.directory("images"), "_image_diff_" + which_cam + ".jpg")
             param = self.path.split("?")
             param = param[0].split("/")
             srv_logging.debug("---->" + param[2])
             srv_logging.debug("---->" + param[3])
 
-            filename_1st = "image_" + which_cam + "_big_" + param[2] + ".jpeg"
-            filename_2nd = "image_" + which_cam + "_big_" + param[3] + ".jpeg"
-            filename_diff = "_image_diff_" + which_cam + ".jpg"
-            path_1st = os.path.join(config.db_handler.directory("images"), filename_1st)
-            path_2nd = os.path.join(config.db_handler.directory("images"), filename_2nd)
-            path_diff = os.path.join(config.db_handler.directory("images"), filename_diff)
-
-            image_1st = camera[which_cam].image.read(path_1st)
-            image_2nd = camera[which_cam].image.read(path_2nd)
-            image_diff = camera[which_cam].image.compare_raw_show(image_1st, image_2nd)
-            image_diff = camera[which_cam].image.draw_text_raw(image_diff, "-> " + param[2] + ":" + param[3] + ":" +
-                                                               param[4], position=(10, 20), scale=0.5, thickness=1)
-            camera[which_cam].image.write(path_diff, image_diff)
-            srv_logging.debug("---->" + str(path_diff))
-            srv_logging.debug("---->" + str(config.db_handler.directory("images", "", False)))
-
-            time.sleep(0.5)
             self.stream_file(filetype='image/jpeg',
-                             content=read_image(file_directory="../data/"+config.db_handler.directory("images", "", False),
-                                                filename=filename_diff))
+                             content=camera[which_cam].get_image_compare(param[2], param[3], param[4]))
 
-        # extract and show single image (creates images with a longer delay ?)
+        # extract and show single image (from memory, encoded once per frame)
         elif '/image.jpg' in self.path:
-            filename = "_image_temp_" + which_cam + ".jpg"
-            img_path = os.path.join(config.db_handler.directory("images"), filename)
-            camera[which_cam].image.write(img_path, camera[which_cam].get_stream(stream_id="file",
-                                                                                 stream_type="camera",
-                                                                                 stream_resolution="hires"))
-            time.sleep(2)
-            self.stream_file(filetype='image/jpeg',
-                             content=read_image(file_directory="../data/images/", filename=filename))
+            self.stream_file(filetype='image/jpeg', content=camera[which_cam].get_image_snapshot())
 
     def do_GET_stream_video(self, which_cam, which_cam2, param):
         """
@@ -1454,7 +1873,7 @@ class StreamingHandler(server.BaseHTTPRequestHandler):
 
         stream_wait_while_error = 0.5
         stream_wait_while_recording = 1
-        stream_wait_while_streaming = 0.01
+        stream_wait_for_next_frame = 1
 
         if '/pip/stream.mjpg' in self.path:
             stream_pip = True
@@ -1470,7 +1889,9 @@ class StreamingHandler(server.BaseHTTPRequestHandler):
             stream_resolution = "hires"
 
         stream_id = stream_type + "_" + stream_resolution
-        frame_id = frame_raw = frame_raw_pip = None
+        stream_client = ServerStreamClient(which_cam, stream_resolution, statistics)
+        stream_client.set_socket(self.connection)
+        frame_id = frame_raw = None
 
         self.stream_video_header()
         config.camera_capture_active = False
@@ -1490,88 +1911,44 @@ class StreamingHandler(server.BaseHTTPRequestHandler):
             if config.update_config["camera_" + which_cam]:
                 camera[which_cam].update_main_config(reload=False)
 
-            if frame_id != camera[which_cam].get_stream_image_id() \
-                    or camera[which_cam].if_error() or camera[which_cam].camera_stream_raw.if_error():
+            if stream_client.if_downgrade():
+                stream_resolution = "lowres"
+                stream_id = stream_type + "_" + stream_resolution
+
+            if (frame_id != camera[which_cam].get_stream_image_id()
+                    or camera[which_cam].if_error() or camera[which_cam].camera_stream_raw.if_error()) \
+                    and stream_client.if_send():
 
+                frame = None
                 if stream_object:
                     frame_raw = camera[which_cam].get_stream_object_detection(stream_id=str(stream_id_int),
                                                                               stream_type=stream_type,
                                                                               stream_resolution=stream_resolution,
                                                                               system_info=True)
+                elif stream_pip and which_cam2 != "" and which_cam2 in camera:
+                    frame_id, frame = camera[which_cam].get_stream_pip(stream_id=str(stream_id_int),
+                                                                       camera2=camera[which_cam2],
+                                                                       position=int(cam2_pos),
+                                                                       stream_type=stream_type,
+                                                                       stream_resolution=stream_resolution,
+                                                                       system_info=True)
+                    frame_raw = frame
                 else:
-                    frame_raw = camera[which_cam].get_stream(stream_id=str(stream_id_int),
-                                                             stream_type=stream_type,
-                                                             stream_resolution=stream_resolution,
-                                                             system_info=True)
-                frame_id = camera[which_cam].get_stream_image_id()
-
-                if frame_raw is not None and len(frame_raw) > 0:
-                    if stream_pip and which_cam2 != "" and which_cam2 in camera:
-                        frame_raw_pip = camera[which_cam2].get_stream(stream_id=str(stream_id_int),
-                                                                      stream_type=stream_type,
-                                                                      stream_resolution="hires",  # hires
-                                                                      system_info=False,
-                                                                      wait=False)
-
-                        if frame_raw_pip is not None and len(frame_raw_pip) > 0:
-
-                            total_pixels_cam1 = frame_raw.shape[0] * frame_raw.shape[1]
-                            total_pixels_cam2 = frame_raw_pip.shape[0] * frame_raw_pip.shape[1]
-                            desired_total_pixels_cam2 = total_pixels_cam1 / 9
-                            scale_factor = math.sqrt(desired_total_pixels_cam2 / total_pixels_cam2) * 100
-                            if frame_raw.shape[1] > 1000:
-                                distance = 50
-                            else:
-                                distance = 30
-                            srv_logging.debug(" PiP ... size %: " + str(scale_factor) + " / distance: " + str(distance))
-
-                            frame_raw_pip = camera[which_cam2].image.resize_raw(frame_raw_pip, scale_factor)
-                            frame_raw = camera[which_cam].image.image_in_image_raw(raw=frame_raw,
-                                                                                   raw2=frame_raw_pip,
-                                                                                   position=int(cam2_pos),
-                                                                                   distance=distance)
+                    frame_id, frame = camera[which_cam].get_stream_encoded(stream_id=str(stream_id_int),
+                                                                           stream_type=stream_type,
+                                                                           stream_resolution=stream_resolution,
+                                                                           system_info=True)
+                    frame_raw = frame
+                if frame is None:
+                    frame_id = camera[which_cam].get_stream_image_id()
 
                 # burn addition information onto the video image if recording or processing
-                if stream_type == "camera" \
-                        and not camera[which_cam].if_error() \
-                        and not camera[which_cam].image.if_error() \
-                        and not camera[which_cam].camera_streams[stream_id].if_error():
-
-                    if camera[which_cam].video.recording:
-                        srv_logging.debug("VIDEO RECORDING")
-                        record_info = camera[which_cam].video.record_info()
-                        #length = str(round(record_info["length"], 1)) + "s"
-                        framerate = str(round(record_info["framerate"], 1)) + "fps"
-                        time_s = int(record_info["length"]) % 60
-                        time_m = round((int(record_info["length"]) - time_s) / 60)
-                        time_l = str(time_m).zfill(2) + ":" + str(time_s).zfill(2)
-                        line1 = "Recording"
-                        line2 = time_l + " / " + framerate + " (max " + str(camera[which_cam].video.max_length) + "s)"
-                        camera[which_cam].set_system_info(True, line1, line2, (0, 0, 100))
-                        camera[which_cam].set_system_info_lowres(True, "R", (0, 0, 100))
-
-                    elif camera[which_cam].video.processing:
-                        srv_logging.debug("VIDEO PROCESSING")
-                        record_info = camera[which_cam].video.record_info()
-                        #length = str(round(record_info["length"], 1)) + "s"
-                        #framerate = str(round(record_info["framerate"], 1)) + "fps"
-                        progress = str(round(float(record_info["percent"]), 1)) + "%"
-                        time_s = int(record_info["elapsed"]) % 60
-                        time_m = round((int(record_info["elapsed"]) - time_s) / 60)
-                        time_e = str(time_m).zfill(2) + ":" + str(time_s).zfill(2)
-                        line1 = "Processing"
-                        line2 = time_e + " / " + progress
-                        camera[which_cam].set_system_info(True, line1, line2, (0, 255, 255))
-                        camera[which_cam].set_system_info_lowres(True, "P", (0, 255, 255))
-
-                    else:
-                        camera[which_cam].set_system_info(False)
-                        camera[which_cam].set_system_info_lowres(False)
+                stream_system_info(which_cam, stream_type, stream_id)
 
                 if not stream_active:
                     srv_logging.info("Closed streaming client: " + stream_id_ext)
                     self.stream_video_end()
-                    frame_id = frame_raw = frame_raw_pip = None
+                    frame_id = frame_raw = None
                     break
 
                 elif frame_raw is None or len(frame_raw) == 0:
@@ -1579,11 +1956,16 @@ class StreamingHandler(server.BaseHTTPRequestHandler):
 
                 else:
                     try:
-                        frame = camera[which_cam].image.convert_from_raw(frame_raw)
+                        if frame is None:
+                            frame = camera[which_cam].image.convert_from_raw(frame_raw,
+                                                                             profile=encode_profile_live(
+                                                                                 stream_resolution))
+                        send_start = time.time()
                         self.stream_video_frame(frame)
+                        stream_client.set_sent(send_start)
                     except Exception as error_msg:
                         stream_active = False
-                        frame_id = frame_raw = frame_raw_pip = None
+                        frame_id = frame_raw = None
                         if "Errno 104" in str(error_msg) or "Errno 32" in str(error_msg):
                             srv_logging.debug('Removed streaming client %s: %s', self.client_address, str(error_msg))
                         else:
@@ -1592,8 +1974,10 @@ class StreamingHandler(server.BaseHTTPRequestHandler):
 
             if camera[which_cam].error or camera[which_cam].image.error:
                 time.sleep(stream_wait_while_error)
+            elif stream_client.get_wait_time() > 0:
+                time.sleep(stream_client.get_wait_time())
             else:
-                time.sleep(stream_wait_while_streaming)
+                camera[which_cam].wait_for_stream_image_id(frame_id, stream_wait_for_next_frame)
                 for key in camera:
                     if not camera[key].error and camera[key].video:
                         if camera[key].video.processing:
@@ -1711,6 +2095,7 @@ if __name__ == "__main__":
         print("--shutdown        Send shutdown signal")
         print("--restart         Send restart signal")
         print("--check-if-start  Start if restart requested (-> request via crontab)")
+        print("--couch-migrate   Migrate CouchDB to one document per entry (presets.birdhouse_couchdb_schema)")
         exit()
 
     elif len(sys.argv) > 0 and "--shutdown" in sys.argv:
@@ -1773,6 +2158,13 @@ if __name__ == "__main__":
     config.db_handler.directory_create("images")
     config.db_handler.directory_create("videos")
     config.db_handler.directory_create("videos_temp")
+    if len(sys.argv) > 0 and "--couch-migrate" in sys.argv:
+        if config.db_handler.couch is None or not config.db_handler.couch.connected:
+            srv_logging.warning("CouchDB not connected, could not migrate to entry documents.")
+        elif birdhouse_couchdb_schema["mode"] != "entries":
+            srv_logging.warning("Set birdhouse_couchdb_schema['mode'] = 'entries' to migrate to entry documents.")
+        else:
+            config.db_handler.couch.migrate_entries(force=True)
     time.sleep(0.5)
 
     # start statistics
@@ -1860,13 +2252,17 @@ if __name__ == "__main__":
     try:
         # start API
         address = ('', int(birdhouse_env["port_api"]))
-        server = StreamingServerIPv6(address, StreamingHandler)
+        if birdhouse_env["server_mode"] is not None and birdhouse_env["server_mode"].lower() == "asyncio":
+            server = StreamingServerAsync(address, StreamingHandler)
+        else:
+            server = StreamingServerIPv6(address, StreamingHandler)
 
         # start health check
         health_check = ServerHealthCheck(config, server)
         health_check.start()
 
-        srv_logging.info("Starting REST API on port " + str(birdhouse_env["port_api"]) + " ...")
+        srv_logging.info("Starting REST API on port " + str(birdhouse_env["port_api"]) +
+                         " (" + server.__class__.__name__ + ") ...")
         srv_logging.info("WebServer running on port " + str(birdhouse_env["port_http"]) + " ...")
         srv_logging.info(" -----------------------------> GO!\n")
         config.set_processing_performance("server", "boot", api_start_tc)
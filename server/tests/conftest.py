@@ -0,0 +1,9 @@
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# modules read their settings from the .env file of the installation, use the sample values if not available
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../.env"))
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../sample.env"))
@@ -0,0 +1,56 @@
+import gc
+
+import numpy as np
+
+from modules.camera import BirdhouseFrameRing
+
+
+def frame(value, shape=(6, 8, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_held_frame_survives_full_turn():
+    ring = BirdhouseFrameRing(size=3)
+    held = ring.write(frame(1))
+    for value in range(2, 2 + ring.size * 2):
+        ring.write(frame(value))
+
+    assert (held == 1).all()
+    assert ring.get_statistics()["leased"] >= 1
+
+
+def test_derived_view_keeps_buffer_leased():
+    ring = BirdhouseFrameRing(size=2)
+    held = ring.write(frame(1))[1:4, ::2]
+    gc.collect()
+    for value in range(2, 2 + ring.size * 2):
+        ring.write(frame(value))
+
+    assert (held == 1).all()
+
+
+def test_released_buffer_is_reused():
+    ring = BirdhouseFrameRing(size=2)
+    for value in range(ring.size * 4):
+        current = ring.write(frame(value))
+        assert (current == value).all()
+        del current
+        gc.collect()
+
+    statistics = ring.get_statistics()
+    assert statistics["fallback"] == 0
+    assert statistics["leased"] == 0
+
+
+def test_all_buffers_leased_uses_fallback():
+    ring = BirdhouseFrameRing(size=2)
+    held = [ring.write(frame(value)) for value in range(ring.size + 1)]
+
+    assert [int(image[0, 0, 0]) for image in held] == list(range(ring.size + 1))
+    assert ring.get_statistics()["fallback"] == 1
+
+
+def test_frames_are_read_only():
+    ring = BirdhouseFrameRing(size=2)
+    image = ring.write(frame(1))
+    assert not image.flags.writeable
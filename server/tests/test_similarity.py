@@ -0,0 +1,64 @@
+from unittest import mock
+
+import cv2
+import numpy as np
+import pytest
+
+import modules.image
+from modules.image import BirdhouseImageProcessing
+
+
+@pytest.fixture
+def image():
+    image = BirdhouseImageProcessing(camera_id="cam1", config=mock.MagicMock())
+    image.param = {"similarity": {"threshold": 90}}
+    return image
+
+
+def scene(width=640, height=427):
+    rng = np.random.default_rng(1)
+    raw = cv2.resize(rng.integers(0, 256, (height // 16, width // 16, 3), dtype=np.uint8), (width, height),
+                     interpolation=cv2.INTER_CUBIC)
+    cv2.circle(raw, (width // 3, height // 2), height // 5, (40, 160, 220), -1)
+    return raw
+
+
+def noisy(raw, sigma, seed):
+    rng = np.random.default_rng(seed)
+    return np.clip(raw + rng.normal(0, sigma, raw.shape), 0, 255).astype(np.uint8)
+
+
+def compare(image, monkeypatch, engine, image_1st, image_2nd):
+    monkeypatch.setitem(modules.image.birdhouse_similarity, "engine", engine)
+    return image.compare_raw(image_1st, image_2nd)
+
+
+@pytest.mark.parametrize("sigma", [2, 3, 5, 8])
+def test_fast_and_full_agree_on_noisy_frames(image, monkeypatch, sigma):
+    raw = scene()
+    image_1st, image_2nd = noisy(raw, sigma, seed=2), noisy(raw, sigma, seed=3)
+
+    fast = compare(image, monkeypatch, "fast", image_1st, image_2nd)
+    full = compare(image, monkeypatch, "opencv", image_1st, image_2nd)
+    assert fast == full
+    assert full < 100
+
+
+def test_fast_and_full_agree_on_moved_object(image, monkeypatch):
+    image_1st = noisy(scene(), 3, seed=2)
+    image_2nd = image_1st.copy()
+    cv2.rectangle(image_2nd, (400, 100), (520, 260), (30, 30, 30), -1)
+
+    fast = compare(image, monkeypatch, "fast", image_1st, image_2nd)
+    full = compare(image, monkeypatch, "opencv", image_1st, image_2nd)
+    assert fast == full
+
+
+def test_fast_identical_frames(image, monkeypatch):
+    image_1st = noisy(scene(), 5, seed=2)
+    image_2nd = image_1st.copy()
+    image_2nd[0, :20] = image_2nd[0, :20] // 2
+
+    assert compare(image, monkeypatch, "fast", image_1st, image_1st.copy()) == 100
+    assert compare(image, monkeypatch, "fast", image_1st, image_2nd) == \
+           pytest.approx(compare(image, monkeypatch, "opencv", image_1st, image_2nd), abs=0.1)
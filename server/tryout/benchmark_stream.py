@@ -0,0 +1,385 @@
+#!/usr/bin/python3
+# -----------------------------------------------------------------------------------------
+# Benchmark of the streaming pipeline without camera hardware:
+# synthetic camera -> BirdhouseCameraStreamRaw -> BirdhouseCameraStreamEdit -> encoding -> N MJPEG clients
+#
+# Usage (from the server directory, .env must exist as for the server):
+#   python3 tryout/benchmark_stream.py --resolution 1920x1080 --fps 15 --clients 5 --duration 30
+#   python3 tryout/benchmark_stream.py --stream camera_lowres --per-client-encode --json /tmp/result.json
+# -----------------------------------------------------------------------------------------
+
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+import threading
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import psutil
+import numpy as np
+import cv2
+
+from datetime import datetime
+from modules.presets import *
+from modules.bh_class import BirdhouseCameraClass
+from modules.camera import (BirdhouseCameraStreamRaw, BirdhouseCameraStreamEdit, BirdhouseCameraStreamStages,
+                            BirdhouseCameraStreamBroadcast)
+from modules.image import encode_profile_live
+
+
+class BenchmarkConfig(object):
+    """
+    Minimal replacement of modules.config.BirdhouseConfig with the attributes used by the stream classes,
+    collects all performance values (not only the last 20) for the report.
+    """
+
+    def __init__(self, camera_id, resolution, fps):
+        """
+        Args:
+            camera_id (str): camera id
+            resolution (str): resolution in the format '800x600'
+            fps (float): max. framerate of the camera
+        """
+        self.param = copy.deepcopy(birdhouse_preset)
+        self.param["devices"]["cameras"] = {camera_id: copy.deepcopy(birdhouse_default_cam)}
+        self.param["devices"]["cameras"][camera_id]["image"]["resolution"] = resolution
+        self.param["devices"]["cameras"][camera_id]["image"]["framerate"] = fps
+        self.param["views"]["index"]["lowres_pos_" + camera_id] = 1
+        self.main_directory = birdhouse_main_directories["server"]
+        self.directories = birdhouse_directories
+        self.timezone = 0
+        self.thread_status = {}
+        self.thread_ctrl = {"shutdown": False, "priority": {"process": False, "pid": ""}}
+        self.thread_ids = {}
+        self.processing_performance = {}
+        self._lock = threading.Lock()
+
+    def local_time(self):
+        return datetime.now()
+
+    def set_thread_id(self, thread_id, name):
+        self.thread_ids[thread_id] = name
+
+    def set_processing_performance(self, category, object_id, start, end=None):
+        if not end:
+            end = time.time()
+        with self._lock:
+            if category not in self.processing_performance:
+                self.processing_performance[category] = {}
+            if object_id not in self.processing_performance[category]:
+                self.processing_performance[category][object_id] = []
+            self.processing_performance[category][object_id].append(end - start)
+
+
+class BenchmarkCameraHandler(BirdhouseCameraClass):
+    """
+    Synthetic camera with the same interface as BirdhouseCameraHandler.read(): delivers a new frame (moving
+    object and frame counter on a noisy background) at the configured framerate.
+    """
+
+    def __init__(self, camera_id, config, width, height, fps):
+        BirdhouseCameraClass.__init__(self, class_id=camera_id + "-bench", class_log="cam-handl",
+                                      camera_id=camera_id, config=config)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames = 0
+        self.source = "synthetic"
+
+        self._background = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+        self._background = cv2.GaussianBlur(self._background, (15, 15), 0)
+        self._next_frame = time.time()
+
+    def read(self, stream="not set"):
+        """
+        create next image, wait until it is due (like a real camera)
+
+        Args:
+            stream (str): stream name
+        Returns:
+            numpy.ndarray: raw image
+        """
+        wait = self._next_frame - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        self._next_frame = max(self._next_frame + 1 / self.fps, time.time())
+
+        raw = self._background.copy()
+        size = int(self.height / 6)
+        x = int((self.frames * 7) % max(self.width - size, 1))
+        y = int((self.height - size) / 2)
+        cv2.rectangle(raw, (x, y), (x + size, y + size), (30, 120, 200), -1)
+        cv2.putText(raw, str(self.frames), (20, self.height - 20), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.frames += 1
+        return raw
+
+    def if_connected(self):
+        return True
+
+
+class BenchmarkCamera(object):
+    """
+    Methods of modules.camera.BirdhouseCamera used by BirdhouseCameraStreamBroadcast.
+    """
+
+    def __init__(self, camera_id, stream_raw, streams):
+        self.id = camera_id
+        self.camera_stream_raw = stream_raw
+        self.camera_streams = streams
+        self.image = stream_raw.image
+
+    def if_error(self):
+        return False
+
+    def get_stream_image_id(self):
+        return self.camera_stream_raw.read_stream_image_id()
+
+    def get_stream(self, stream_id, stream_type, stream_resolution="", system_info=False, wait=True):
+        return self.camera_streams[stream_type + "_" + stream_resolution].read_stream(stream_id, system_info, wait)
+
+
+class BenchmarkClient(threading.Thread):
+    """
+    Simulated MJPEG client, same loop as StreamingHandler.do_GET_stream_video without network.
+    """
+
+    def __init__(self, client_id, camera, stream_type, stream_resolution, broadcast, delay=0):
+        threading.Thread.__init__(self, name="bench-client-" + str(client_id), daemon=True)
+        self.client_id = client_id
+        self.camera = camera
+        self.type = stream_type
+        self.resolution = stream_resolution
+        self.broadcast = broadcast
+        self.delay = delay
+        self.running = True
+        self.frames = 0
+        self.frame_age = []
+        self.frame_bytes = 0
+
+    def run(self):
+        frame_id = None
+        stream_id = "bench_" + str(self.client_id)
+        while self.running:
+            if frame_id != self.camera.get_stream_image_id():
+                if self.broadcast is not None:
+                    frame_id, frame = self.broadcast.read_frame(stream_id, system_info=True)
+                else:
+                    frame_id = self.camera.get_stream_image_id()
+                    frame_raw = self.camera.get_stream(stream_id, self.type, self.resolution, system_info=True)
+                    frame = None
+                    if frame_raw is not None:
+                        frame = self.camera.image.convert_from_raw(frame_raw,
+                                                                   profile=encode_profile_live(self.resolution))
+
+                if frame is not None and len(frame) > 0:
+                    self.frames += 1
+                    self.frame_bytes += len(frame)
+                    self.frame_age.append(time.time() - self.camera.camera_stream_raw._stream_last_time)
+                    if self.delay > 0:
+                        time.sleep(self.delay)
+
+            self.camera.camera_stream_raw.wait_for_frame(frame_id, 1)
+
+
+def statistics_values(values):
+    """
+    Args:
+        values (list): measured durations in seconds
+    Returns:
+        dict: count, average, p95 and max in milliseconds
+    """
+    if len(values) == 0:
+        return {"count": 0, "avg_ms": 0, "p95_ms": 0, "max_ms": 0}
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "avg_ms": round(sum(values) / len(values) * 1000, 2),
+        "p95_ms": round(values[min(int(len(values) * 0.95), len(values) - 1)] * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2)
+    }
+
+
+def benchmark(args):
+    """
+    run the pipeline for the given duration and return the results
+
+    Args:
+        args (argparse.Namespace): command line arguments
+    Returns:
+        dict: benchmark results
+    """
+    camera_id = "cam1"
+    width, height = [int(value) for value in args.resolution.split("x")]
+    stream_type, stream_resolution = args.stream.split("_")
+
+    set_error_images()
+    config = BenchmarkConfig(camera_id, args.resolution, args.fps)
+    camera_handler = BenchmarkCameraHandler(camera_id, config, width, height, args.fps)
+
+    stream_raw = BirdhouseCameraStreamRaw(camera_id=camera_id, config=config)
+    param = config.param["devices"]["cameras"][camera_id]
+    param["image"]["resolution_current"] = [width, height]
+    param["image"]["crop_area"] = stream_raw.image.crop_area_pixel(resolution=[width, height],
+                                                                   area=param["image"]["crop"], dimension=False)
+    stream_raw.set_camera_handler(camera_handler)
+
+    stream_stages = BirdhouseCameraStreamStages(camera_id=camera_id, config=config)
+    streams = {}
+    for stream in ["camera_hires", "camera_lowres", "setting_hires", "setting_lowres"]:
+        streams[stream] = BirdhouseCameraStreamEdit(camera_id=camera_id, config=config, stream_raw=stream_raw,
+                                                    stream_type=stream.split("_")[0],
+                                                    stream_resolution=stream.split("_")[1],
+                                                    stream_stages=stream_stages)
+        streams[stream].active = True
+
+    camera = BenchmarkCamera(camera_id, stream_raw, streams)
+    broadcast = None
+    if not args.per_client_encode:
+        broadcast = BirdhouseCameraStreamBroadcast(camera_id=camera_id, config=config, camera=camera,
+                                                   stream_type=stream_type, stream_resolution=stream_resolution)
+
+    stream_raw.start()
+    for stream in streams:
+        streams[stream].start()
+
+    clients = []
+    for client_id in range(args.clients):
+        delay = args.slow_client_delay if client_id < args.slow_clients else 0
+        clients.append(BenchmarkClient(client_id, camera, stream_type, stream_resolution, broadcast, delay))
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    process = psutil.Process(os.getpid())
+    process.cpu_percent(None)
+    for client in clients:
+        client.start()
+
+    time.sleep(args.warmup)
+    config.processing_performance = {}
+    frames_start = camera_handler.frames
+    raw_start = stream_raw.read_stream_image_id()
+    ring_start = stream_raw.get_buffer_statistics()
+    clients_start = [client.frames for client in clients]
+    for client in clients:
+        client.frame_age = []
+    if args.tracemalloc:
+        tracemalloc.reset_peak()
+    process.cpu_percent(None)
+    start_time = time.time()
+
+    time.sleep(args.duration)
+
+    duration = time.time() - start_time
+    cpu_percent = process.cpu_percent(None)
+    raw_frames = stream_raw.read_stream_image_id() - raw_start
+    ring = stream_raw.get_buffer_statistics()
+    memory_peak = 0
+    if args.tracemalloc:
+        memory_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    for client in clients:
+        client.running = False
+    config.thread_ctrl["shutdown"] = True
+    stream_raw.stop()
+    for stream in streams:
+        streams[stream].stop()
+
+    raw_frames = max(raw_frames, 1)
+    performance = config.processing_performance
+    stages = stream_stages.get_statistics()
+    results = {
+        "setup": {
+            "resolution": args.resolution, "fps": args.fps, "stream": args.stream, "clients": args.clients,
+            "slow_clients": args.slow_clients, "per_client_encode": args.per_client_encode,
+            "encoder": stream_raw.image.encoder.backend, "duration": round(duration, 1)
+        },
+        "camera_fps": round((camera_handler.frames - frames_start) / duration, 2),
+        "raw_fps": round(raw_frames / duration, 2),
+        "cpu_percent": cpu_percent,
+        "per_frame": {
+            "ring_writes": round((ring["writes"] - ring_start["writes"]) / raw_frames, 2),
+            "ring_fallback_copies": round((ring["fallback"] - ring_start["fallback"]) / raw_frames, 2),
+            "stage_results": round(sum([len(v) for v in performance.get("camera_stream_stage", {}).values()]) /
+                                   raw_frames, 2),
+            "encodes": round(sum([len(v) for v in performance.get("image_encode", {}).values()]) / raw_frames, 2),
+            "memory_peak_mb": round(memory_peak / 1024 / 1024, 1) if args.tracemalloc else None
+        },
+        "stages": {},
+        "encode": {},
+        "clients": []
+    }
+    for stage in performance.get("camera_stream_stage", {}):
+        results["stages"][stage.replace(camera_id + "_", "")] = statistics_values(
+            performance["camera_stream_stage"][stage])
+    for stage in stages:
+        if stage.replace(camera_id + "_", "") in results["stages"]:
+            results["stages"][stage.replace(camera_id + "_", "")]["reused"] = stages[stage]["reused"]
+    for category in ["image_encode", "camera_stream_encode"]:
+        for object_id in performance.get(category, {}):
+            results["encode"][category + "/" + object_id] = statistics_values(performance[category][object_id])
+    for index, client in enumerate(clients):
+        results["clients"].append({
+            "client": client.client_id,
+            "fps": round((client.frames - clients_start[index]) / duration, 2),
+            "frame_age": statistics_values(client.frame_age),
+            "kbyte_per_frame": round(client.frame_bytes / max(client.frames, 1) / 1024, 1)
+        })
+    return results
+
+
+def print_results(results):
+    """
+    print benchmark results as table
+
+    Args:
+        results (dict): results from benchmark()
+    """
+    print("\nSetup:       " + str(results["setup"]))
+    print("Camera fps:  " + str(results["camera_fps"]) + "  |  raw stream fps: " + str(results["raw_fps"]) +
+          "  |  CPU: " + str(results["cpu_percent"]) + "%")
+    print("Per frame:   " + str(results["per_frame"]))
+    print("\n%-28s %8s %8s %8s %8s %8s" % ("stage", "count", "reused", "avg ms", "p95 ms", "max ms"))
+    for stage in results["stages"]:
+        values = results["stages"][stage]
+        print("%-28s %8s %8s %8s %8s %8s" % (stage, values["count"], values.get("reused", "-"), values["avg_ms"],
+                                              values["p95_ms"], values["max_ms"]))
+    for key in results["encode"]:
+        values = results["encode"][key]
+        print("%-28s %8s %8s %8s %8s %8s" % (key[:28], values["count"], "-", values["avg_ms"], values["p95_ms"],
+                                              values["max_ms"]))
+    print("\n%-8s %8s %14s %14s %10s" % ("client", "fps", "age avg ms", "age p95 ms", "kB/frame"))
+    for client in results["clients"]:
+        print("%-8s %8s %14s %14s %10s" % (client["client"], client["fps"], client["frame_age"]["avg_ms"],
+                                            client["frame_age"]["p95_ms"], client["kbyte_per_frame"]))
+    print("")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="jc://birdhouse/ - benchmark of the streaming pipeline")
+    parser.add_argument("--resolution", default="1280x720", help="camera resolution, e.g. 1920x1080")
+    parser.add_argument("--fps", type=float, default=15, help="framerate of the synthetic camera")
+    parser.add_argument("--stream", default="camera_hires",
+                        choices=["camera_hires", "camera_lowres", "setting_hires", "setting_lowres"])
+    parser.add_argument("--clients", type=int, default=3, help="amount of simulated MJPEG clients")
+    parser.add_argument("--slow-clients", type=int, default=0, help="amount of clients with a delay per frame")
+    parser.add_argument("--slow-client-delay", type=float, default=0.3, help="delay per frame of slow clients")
+    parser.add_argument("--per-client-encode", action="store_true", help="encode per client (no broadcaster)")
+    parser.add_argument("--duration", type=float, default=20, help="measuring time in seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="time in seconds before measuring starts")
+    parser.add_argument("--tracemalloc", action="store_true", help="measure peak memory (slows down processing)")
+    parser.add_argument("--json", default="", help="write results to this JSON file")
+    arguments = parser.parse_args()
+
+    benchmark_results = benchmark(arguments)
+    print_results(benchmark_results)
+    if arguments.json != "":
+        with open(arguments.json, "w") as json_file:
+            json.dump(benchmark_results, json_file, indent=2)
+        print("Results written to " + arguments.json)
+    os._exit(0)